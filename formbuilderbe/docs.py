@@ -0,0 +1,53 @@
+"""
+Swagger/ReDoc routes that import drf_yasg and build the schema view on the
+first docs request instead of at URLConf load.
+"""
+
+from functools import lru_cache
+
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import permissions
+
+
+@lru_cache(maxsize=None)
+def get_schema_view():
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view
+
+    from jsonformapp import swagger
+
+    swagger.install()
+    return get_schema_view(
+        openapi.Info(
+            title="Form Builder API",
+            default_version="v1",
+            description="API documentation for the Form Builder project",
+            terms_of_service="https://www.example.com/terms/",
+            contact=openapi.Contact(email="contact@example.com"),
+            license=openapi.License(name="BSD License"),
+        ),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+
+@lru_cache(maxsize=None)
+def _view(renderer):
+    if renderer is None:
+        return get_schema_view().without_ui(cache_timeout=0)
+    return get_schema_view().with_ui(renderer, cache_timeout=0)
+
+
+@csrf_exempt
+def schema_json(request, *args, **kwargs):
+    return _view(None)(request, *args, **kwargs)
+
+
+@csrf_exempt
+def swagger_ui(request, *args, **kwargs):
+    return _view("swagger")(request, *args, **kwargs)
+
+
+@csrf_exempt
+def redoc_ui(request, *args, **kwargs):
+    return _view("redoc")(request, *args, **kwargs)
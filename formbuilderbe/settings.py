@@ -53,10 +53,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "jsonformapp.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "jsonformapp.middleware.TenantMiddleware",
+    "jsonformapp.middleware.InvalidationMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -64,6 +67,9 @@ MIDDLEWARE = [
     "whitenoise.middleware.WhiteNoiseMiddleware",
 ]
 
+# Responses smaller than this many bytes are not gzipped.
+GZIP_MIN_LENGTH = int(os.getenv("GZIP_MIN_LENGTH", "1024"))
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOWED_ORIGINS = [
@@ -161,14 +167,115 @@ STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Background job results are stored under MEDIA_ROOT/jobs/.
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
+MEDIA_URL = "/media/"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "jsonformapp.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# Fill the schema catalog and option caches in the background on boot.
+WARM_CACHES_ON_STARTUP = os.getenv("WARM_CACHES_ON_STARTUP", "False") == "True"
+
+# Seconds the introspected table/column catalog and aggregate results are cached.
+SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", "300"))
+AGGREGATE_CACHE_TTL = int(os.getenv("AGGREGATE_CACHE_TTL", "30"))
+
+# Seconds a form skeleton/section tree stays cached (keys embed Form.version).
+FORM_CACHE_TTL = int(os.getenv("FORM_CACHE_TTL", "3600"))
+
+# Dropdown option sources served by tables/<table>/options/<field>/.
+OPTION_SOURCES = {
+    "product_product": ["currency", "product_family", "product_code"],
+    "wording_wording": ["currency", "product"],
+}
+OPTIONS_CACHE_TTL = int(os.getenv("OPTIONS_CACHE_TTL", "300"))
+
+# Tables whose writes are appended to the change feed served at
+# tables/<table>/changes/.
+CHANGE_FEED_TABLES = ["product_product", "wording_wording"]
+# Seconds a gap in the change ids may take to fill (a transaction that has
+# not committed yet) before the feed moves past it.
+CHANGE_FEED_SETTLE = float(os.getenv("CHANGE_FEED_SETTLE", "2"))
+
+# Default number of `manage.py run_workers` processes.
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+# Seconds without a heartbeat after which a running job's worker is presumed
+# dead; the job is requeued, or failed after JOB_MAX_ATTEMPTS runs.
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Rows per bulk_create chunk for tables/<table>/import/.
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+# max-age for tables/ and tables/<table>/fields/. Their ETags follow the
+# schema fingerprint (applied migrations + table list), so clients
+# revalidate cheaply once it expires.
+INTROSPECTION_MAX_AGE = int(os.getenv("INTROSPECTION_MAX_AGE", "60"))
+
+# Seconds a row fetched through tables/<table>/records/ stays cached; 0
+# disables the cache. Saves and deletes through the ORM (including
+# DynamicTableRecordView.put) evict the record.
+RECORD_CACHE_TTL = int(os.getenv("RECORD_CACHE_TTL", "0"))
+
+# Tenants selected by the TENANT_HEADER request header. Each entry may limit
+# the dynamic tables the tenant can see ("tables") and route its cached
+# results to a dedicated CACHES alias ("cache"). Empty means single-tenant.
+# Example: {"acme": {"tables": ["product_product"], "cache": "default"}}
+TENANT_HEADER = os.getenv("TENANT_HEADER", "X-Tenant")
+TENANTS = {}
+# Path prefixes served without a tenant (admin, API docs, static files).
+TENANT_EXEMPT_PATHS = ["/admin/", "/swagger", "/redoc/", STATIC_URL]
+
+# Buffered DynamicTableRecordView submissions, drained by
+# `manage.py drain_submissions`. See jsonformapp/outbox.py for all keys.
+SUBMISSION_QUEUE = {
+    "BATCH_SIZE": int(os.getenv("SUBMISSION_QUEUE_BATCH_SIZE", "500")),
+    "RATE_LIMITS": {},
+}
+
+# Cross-worker invalidation of in-process caches (see jsonformapp/bus.py):
+# "db" polls the jsonformapp_cachegeneration table, "file" tails PATH (an
+# append-only file shared by the workers of one host), "" disables it.
+# Workers apply invalidations at most INTERVAL seconds late.
+INVALIDATION_BUS = {
+    "BACKEND": os.getenv("INVALIDATION_BUS_BACKEND", "db"),
+    "PATH": os.getenv("INVALIDATION_BUS_PATH", str(BASE_DIR / "invalidation.log")),
+    "INTERVAL": float(os.getenv("INVALIDATION_BUS_INTERVAL", "1.0")),
+}
+
+# Query budgets for the raw-SQL views: TIMEOUT in seconds per request
+# (MAX_EXECUTION_TIME on MySQL, a progress handler on SQLite; 503 when hit)
+# and MAX_ROWS for tables/<table>/data/ (413 when exceeded). See
+# jsonformapp/budgets.py.
+QUERY_BUDGETS = {
+    "table_data": {
+        "TIMEOUT": float(os.getenv("TABLE_DATA_TIMEOUT", "5")),
+        "MAX_ROWS": int(os.getenv("TABLE_DATA_MAX_ROWS", "10000")),
+    },
+    "empty_tables": {"TIMEOUT": float(os.getenv("EMPTY_TABLES_TIMEOUT", "10"))},
+    "aggregate": {"TIMEOUT": float(os.getenv("AGGREGATE_TIMEOUT", "10"))},
+}
+
+# Forwarding of submissions to Form.submit_api_route by
+# `manage.py dispatch_submissions`. See jsonformapp/dispatch.py for all keys.
+SUBMISSION_DISPATCH = {
+    "ENABLED": os.getenv("SUBMISSION_DISPATCH_ENABLED", "1") == "1",
+    "CONCURRENCY": int(os.getenv("SUBMISSION_DISPATCH_CONCURRENCY", "8")),
+    "MAX_ATTEMPTS": int(os.getenv("SUBMISSION_DISPATCH_MAX_ATTEMPTS", "8")),
+}
+
 SWAGGER_SETTINGS = {
-    "DEFAULT_INFO": "formbuilderbe.urls.schema_view",  # dotted path to your schema_view (optional)
     "SECURITY_DEFINITIONS": {
         "Basic": {"type": "basic"},
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"},
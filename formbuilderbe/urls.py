@@ -14,39 +14,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
 from django.contrib import admin
 from django.urls import path, include, re_path
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-# import jsonformapp
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Form Builder API",
-        default_version="v1",
-        description="API documentation for the Form Builder project",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from . import docs
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("jsonformapp.urls")),
-    # Swagger endpoints:
+    path("api/v1/product/", include("product.urls")),
+    # Swagger endpoints (drf_yasg is loaded on the first hit, see docs.py):
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
+        docs.schema_json,
         name="schema-json",
     ),
-    path(
-        "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("swagger/", docs.swagger_ui, name="schema-swagger-ui"),
+    path("redoc/", docs.redoc_ui, name="schema-redoc"),
 ]
@@ -0,0 +1,132 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import connection
+
+from .queries import (
+    QueryError,
+    check_column,
+    check_table,
+    compile_filters,
+    parse_filters,
+    where_sql,
+)
+from .schema import NUMERIC_TYPES
+from .tenancy import DEFAULT_TENANT, table_allowed, tenant_cache, tenant_key
+
+FUNCTIONS = {"count": "COUNT", "sum": "SUM", "avg": "AVG", "min": "MIN", "max": "MAX"}
+NUMERIC_FUNCTIONS = {"sum", "avg"}
+
+MAX_GROUPS = 10000
+
+
+class AggregateError(QueryError):
+    pass
+
+
+def parse_spec(params):
+    """
+    Build an aggregation spec from query parameters::
+
+        group_by=product_family,currency
+        metrics=count,sum:platform_fee,max:admin_fee
+        f.is_active=1&f.platform_fee__gte=10&f.currency__in=INR,USD
+        limit=100
+    """
+    group_by = [c for c in params.get("group_by", "").split(",") if c]
+    metrics = []
+    for item in (params.get("metrics") or "count").split(","):
+        if not item:
+            continue
+        function, _, column = item.partition(":")
+        metrics.append((function.lower(), column or None))
+
+    try:
+        limit = max(1, min(int(params.get("limit", MAX_GROUPS)), MAX_GROUPS))
+    except ValueError:
+        raise AggregateError("'limit' must be an integer.")
+    return {
+        "group_by": group_by,
+        "metrics": metrics,
+        "filters": parse_filters(params),
+        "limit": limit,
+    }
+
+
+def compile_aggregate(table_name, spec, tenant=DEFAULT_TENANT):
+    """
+    Compile a spec to ``(sql, params, aliases)``. Tables, columns and filters
+    are checked and compiled by queries.py, as for the data view: every
+    identifier is checked against the introspected columns and quoted, and
+    every value is a parameter.
+    """
+    if not table_allowed(tenant, table_name):
+        raise AggregateError(f"Table '{table_name}' is not available.")
+    columns = check_table(table_name)
+
+    qn = connection.ops.quote_name
+
+    def column(name):
+        return qn(check_column(columns, name))
+
+    select, aliases = [], []
+    for name in spec["group_by"]:
+        if name in aliases:
+            raise AggregateError(f"Duplicate output column '{name}'.")
+        select.append(column(name))
+        aliases.append(name)
+
+    if not spec["metrics"]:
+        raise AggregateError("At least one metric is required.")
+    for function, name in spec["metrics"]:
+        if function not in FUNCTIONS:
+            raise AggregateError(f"Unknown metric '{function}'.")
+        if name is None:
+            if function != "count":
+                raise AggregateError(f"Metric '{function}' needs a column.")
+            expression, alias = "COUNT(*)", "count"
+        else:
+            expression = f"{FUNCTIONS[function]}({column(name)})"
+            if (
+                function in NUMERIC_FUNCTIONS
+                and columns[name]["type"] not in NUMERIC_TYPES
+            ):
+                raise AggregateError(f"Column '{name}' is not numeric.")
+            alias = f"{function}_{name}"
+        if alias in aliases:
+            raise AggregateError(f"Duplicate output column '{alias}'.")
+        select.append(f"{expression} AS {qn(alias)}")
+        aliases.append(alias)
+
+    shape, params = compile_filters(columns, spec["filters"])
+
+    sql = f"SELECT {', '.join(select)} FROM {qn(table_name)}"
+    if shape:
+        sql += f" WHERE {where_sql(shape)}"
+    if spec["group_by"]:
+        group = ", ".join(qn(name) for name in spec["group_by"])
+        sql += f" GROUP BY {group} ORDER BY {group}"
+    sql += f" LIMIT {int(spec['limit'])}"
+    return sql, params, aliases
+
+
+def aggregate(table_name, spec, tenant=DEFAULT_TENANT):
+    """
+    Run an aggregation, caching the result for AGGREGATE_CACHE_TTL seconds.
+    Returns ``(rows, cached)``.
+    """
+    sql, params, aliases = compile_aggregate(table_name, spec, tenant)
+    digest = hashlib.sha1(json.dumps([sql, params], default=str).encode()).hexdigest()
+    key = tenant_key(tenant, f"jsonformapp:aggregate:{table_name}:{digest}")
+
+    cache = tenant_cache(tenant)
+    rows = cache.get(key)
+    if rows is not None:
+        return rows, True
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = [dict(zip(aliases, row)) for row in cursor.fetchall()]
+    cache.set(key, rows, getattr(settings, "AGGREGATE_CACHE_TTL", 30))
+    return rows, False
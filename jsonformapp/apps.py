@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class JsonformappConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'jsonformapp'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jsonformapp"
+
+    def ready(self):
+        from .bus import form_written
+        from .caching import model_written
+        from .changefeed import record_model_change
+        from .models import Form
+        from .schema import clear_schema_cache
+
+        post_migrate.connect(clear_schema_cache, dispatch_uid="jsonformapp_schema")
+        post_save.connect(model_written, dispatch_uid="jsonformapp_generation")
+        post_delete.connect(model_written, dispatch_uid="jsonformapp_generation")
+        post_save.connect(record_model_change, dispatch_uid="jsonformapp_changes")
+        post_delete.connect(record_model_change, dispatch_uid="jsonformapp_changes")
+        post_save.connect(form_written, sender=Form, dispatch_uid="jsonformapp_bus")
+        post_delete.connect(form_written, sender=Form, dispatch_uid="jsonformapp_bus")
+
+        if getattr(settings, "WARM_CACHES_ON_STARTUP", False):
+            from .warmup import warm_caches_in_background
+
+            warm_caches_in_background()
@@ -0,0 +1,135 @@
+"""
+Time and row budgets for the raw-SQL views, so one expensive request cannot
+hold a worker and a database connection for minutes.
+
+``query_budget(endpoint)`` bounds every statement run inside it by the
+endpoint's TIMEOUT (seconds, for the whole block):
+
+* MySQL: session ``max_execution_time`` (``max_statement_time`` on
+  MariaDB), so the server aborts the SELECT itself;
+* SQLite: a progress handler that interrupts the statement at the deadline;
+* other backends: only the deadline check between statements.
+
+Timeouts raise QueryTimeout (answered with 503) and are counted in metrics,
+in total and per endpoint. MAX_ROWS caps result sizes (413 when exceeded).
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from . import metrics
+from .queries import MAX_ROWS
+
+DEFAULTS = {
+    "table_data": {"TIMEOUT": 5.0, "MAX_ROWS": MAX_ROWS},
+    "empty_tables": {"TIMEOUT": 10.0},
+    "aggregate": {"TIMEOUT": 10.0},
+}
+# ER_QUERY_TIMEOUT (MySQL) and ER_STATEMENT_TIMEOUT (MariaDB).
+MYSQL_TIMEOUT_ERRORS = (3024, 1969)
+# SQLite VM instructions between deadline checks.
+SQLITE_PROGRESS_STEPS = 10000
+
+TIMEOUTS = metrics.counter("queries.timeouts")
+ROW_LIMITS = metrics.counter("queries.row_limit_exceeded")
+ENDPOINT_TIMEOUTS = {
+    endpoint: metrics.counter(f"queries.timeouts.{endpoint}") for endpoint in DEFAULTS
+}
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class RowLimitExceeded(Exception):
+    pass
+
+
+def budget(endpoint):
+    overrides = getattr(settings, "QUERY_BUDGETS", {}).get(endpoint, {})
+    return {**DEFAULTS.get(endpoint, {}), **overrides}
+
+
+def check_row_count(endpoint, count):
+    """RowLimitExceeded when ``count`` rows would exceed the endpoint's MAX_ROWS."""
+    max_rows = budget(endpoint).get("MAX_ROWS")
+    if max_rows is not None and count > max_rows:
+        metrics.incr(ROW_LIMITS)
+        raise RowLimitExceeded(
+            f"Result exceeds {max_rows} rows; add filters or a 'limit'."
+        )
+
+
+def _count_timeout(endpoint):
+    metrics.incr(TIMEOUTS)
+    if endpoint in ENDPOINT_TIMEOUTS:
+        metrics.incr(ENDPOINT_TIMEOUTS[endpoint])
+
+
+def is_timeout(error):
+    """Whether a database error is a statement cut off by its budget."""
+    if connection.vendor == "sqlite":
+        return str(error) == "interrupted"
+    if connection.vendor == "mysql":
+        return bool(error.args) and error.args[0] in MYSQL_TIMEOUT_ERRORS
+    return False
+
+
+def _server_timeout(timeout):
+    """``(set, reset)`` statements for a server-side statement timeout."""
+    if connection.vendor != "mysql":
+        return None, None
+    if connection.mysql_is_mariadb:
+        return (
+            f"SET SESSION max_statement_time = {timeout:.3f}",
+            "SET SESSION max_statement_time = DEFAULT",
+        )
+    return (
+        f"SET SESSION max_execution_time = {max(1, int(timeout * 1000))}",
+        "SET SESSION max_execution_time = DEFAULT",
+    )
+
+
+@contextmanager
+def query_budget(endpoint):
+    timeout = budget(endpoint).get("TIMEOUT")
+    if not timeout:
+        yield
+        return
+
+    deadline = time.monotonic() + timeout
+
+    def check_deadline(execute, sql, params, many, context):
+        if time.monotonic() >= deadline:
+            raise QueryTimeout(f"Query budget of {timeout:g}s exceeded.")
+        return execute(sql, params, many, context)
+
+    connection.ensure_connection()
+    set_sql, reset_sql = _server_timeout(timeout)
+    if set_sql:
+        with connection.cursor() as cursor:
+            cursor.execute(set_sql)
+    elif connection.vendor == "sqlite":
+        connection.connection.set_progress_handler(
+            lambda: time.monotonic() >= deadline, SQLITE_PROGRESS_STEPS
+        )
+    try:
+        with connection.execute_wrapper(check_deadline):
+            yield
+    except DatabaseError as e:
+        if not is_timeout(e):
+            raise
+        _count_timeout(endpoint)
+        raise QueryTimeout(f"Query budget of {timeout:g}s exceeded.") from e
+    except QueryTimeout:
+        _count_timeout(endpoint)
+        raise
+    finally:
+        if reset_sql:
+            with connection.cursor() as cursor:
+                cursor.execute(reset_sql)
+        elif connection.vendor == "sqlite":
+            connection.connection.set_progress_handler(None, 0)
@@ -0,0 +1,241 @@
+"""
+Cross-worker invalidation of in-process caches.
+
+Each worker keeps compiled rules, form schemas, model classes and the fee
+table in its own memory (and, with the default local-memory cache backend,
+its own Django cache). A write in one worker publishes ``(topic, key)``;
+every worker polls the bus at most every INVALIDATION_BUS["INTERVAL"]
+seconds, from InvalidationMiddleware before it serves a request, and runs
+the handlers subscribed to that topic for just that key. A worker therefore
+never serves a cache entry invalidated more than INTERVAL seconds before
+the request started. The publishing worker runs its handlers immediately;
+model receivers publish once the write commits.
+
+Backends:
+
+* ``"db"``: the CacheGeneration table. Publishing deletes and re-inserts
+  the (topic, key) row, so the table holds one row per key and its
+  auto-increment id is a global generation; a poll is a primary-key range
+  scan past the last id seen. Ids skipped by that scan may belong to
+  transactions that have not committed yet, so they are looked up again on
+  later polls, for up to GAP_TIMEOUT seconds and within the last LOOKBACK
+  ids, so that rows committed out of id order are not missed.
+* ``"file"``: an append-only file of JSON lines, for workers on one host.
+  A poll is an ``os.stat`` unless the file grew.
+* ``""``: disabled; handlers only run in the publishing process.
+
+Topics in use: ``form`` (form id), ``table`` (table name; its structure
+changed), ``rows`` (``<table>`` or ``<table>:<record id>``; rows were
+written, see caching.bump_table_generation) and ``product`` (product code).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+
+from . import metrics
+from .models import CacheGeneration
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {"BACKEND": "db", "PATH": "", "INTERVAL": 1.0}
+LOOKBACK = 1000
+GAP_TIMEOUT = 60
+
+PUBLISHED = metrics.counter("bus.published")
+RECEIVED = metrics.counter("bus.received")
+
+_handlers = defaultdict(list)
+
+
+def bus_settings():
+    return {**DEFAULTS, **getattr(settings, "INVALIDATION_BUS", {})}
+
+
+def subscribe(topic, handler):
+    """Call ``handler(key)`` whenever ``(topic, key)`` is invalidated."""
+    if handler not in _handlers[topic]:
+        _handlers[topic].append(handler)
+
+
+def _dispatch(topic, key):
+    for handler in _handlers.get(topic, ()):
+        try:
+            handler(key)
+        except Exception:
+            logger.exception("Invalidation handler for %s:%s failed", topic, key)
+
+
+class DatabaseBackend:
+    def __init__(self, config):
+        self.last_id = None
+        # Skipped ids -> when first skipped; own published ids.
+        self.gaps = {}
+        self.own = set()
+
+    def publish(self, topic, key):
+        try:
+            with transaction.atomic():
+                CacheGeneration.objects.filter(topic=topic, key=key).delete()
+                row = CacheGeneration.objects.create(topic=topic, key=key)
+        except IntegrityError:
+            # A concurrent publisher inserted a newer row for the same key.
+            return
+        except DatabaseError:
+            # E.g. a deadlock with a concurrent publisher. The write itself has
+            # committed, so only other workers' caches are left stale.
+            logger.warning("Invalidation bus publish failed", exc_info=True)
+            return
+        self.own.add(row.id)
+
+    def poll(self):
+        if self.last_id is None:
+            # A new worker has nothing cached yet, so it starts from the present.
+            self.last_id = (
+                CacheGeneration.objects.order_by("-id")
+                .values_list("id", flat=True)
+                .first()
+            ) or 0
+            return []
+        rows = CacheGeneration.objects.filter(id__gt=self.last_id)
+        if self.gaps:
+            rows |= CacheGeneration.objects.filter(id__in=list(self.gaps))
+        now = time.monotonic()
+        events = []
+        for row_id, topic, key in rows.order_by("id").values_list("id", "topic", "key"):
+            if row_id > self.last_id:
+                for skipped in range(max(self.last_id, row_id - LOOKBACK) + 1, row_id):
+                    self.gaps[skipped] = now
+                self.last_id = row_id
+            else:
+                del self.gaps[row_id]
+            if row_id in self.own:
+                self.own.discard(row_id)
+            else:
+                events.append((topic, key))
+        floor = self.last_id - LOOKBACK
+        self.gaps = {
+            i: since
+            for i, since in self.gaps.items()
+            if i > floor and now - since < GAP_TIMEOUT
+        }
+        self.own = {i for i in self.own if i > floor}
+        return events
+
+
+class FileBackend:
+    def __init__(self, config):
+        self.path = config["PATH"] or os.path.join(
+            str(settings.BASE_DIR), "invalidation.log"
+        )
+        self.offset = None
+        self.own = set()
+
+    def _size(self):
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def publish(self, topic, key):
+        line = (json.dumps([topic, key]) + "\n").encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # O_APPEND writes of one short line are not interleaved.
+            os.write(fd, line)
+            self.own.add(os.lseek(fd, 0, os.SEEK_CUR))
+        finally:
+            os.close(fd)
+
+    def poll(self):
+        size = self._size()
+        if self.offset is None or size < self.offset:
+            # First poll, or the file was truncated or rotated.
+            self.offset = size
+            return []
+        if size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        events, end = [], self.offset
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            if end in self.own:
+                self.own.discard(end)
+                continue
+            topic, key = json.loads(line)
+            events.append((topic, key))
+        self.offset = end
+        return events
+
+
+BACKENDS = {"db": DatabaseBackend, "file": FileBackend}
+
+
+class InvalidationBus:
+    def __init__(self, config):
+        self.config = config
+        backend = BACKENDS.get(config["BACKEND"])
+        self.backend = backend(config) if backend else None
+        self.next_poll = 0.0
+        self.lock = threading.Lock()
+
+    def publish(self, topic, key):
+        key = str(key)
+        _dispatch(topic, key)
+        if self.backend is not None:
+            self.backend.publish(topic, key)
+            metrics.incr(PUBLISHED)
+
+    def poll(self, force=False):
+        """Run the handlers for events published by other workers."""
+        if self.backend is None:
+            return 0
+        now = time.monotonic()
+        if not force and now < self.next_poll:
+            return 0
+        with self.lock:
+            self.next_poll = now + self.config["INTERVAL"]
+            try:
+                events = self.backend.poll()
+            except (DatabaseError, OSError):
+                logger.warning("Invalidation bus poll failed", exc_info=True)
+                return 0
+        for topic, key in events:
+            _dispatch(topic, key)
+        metrics.incr(RECEIVED, len(events))
+        return len(events)
+
+
+_bus = None
+
+
+def get_bus():
+    global _bus
+    config = bus_settings()
+    if _bus is None or _bus.config != config:
+        _bus = InvalidationBus(config)
+    return _bus
+
+
+def publish(topic, key):
+    get_bus().publish(topic, key)
+
+
+def poll(force=False):
+    return get_bus().poll(force)
+
+
+def form_written(sender, instance, **kwargs):
+    """post_save/post_delete receiver for Form; publishes on commit."""
+    pk = instance.pk
+    transaction.on_commit(lambda: publish("form", pk))
@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import bus
+from .schema import is_user_table
+
+GENERATION_KEY = "jsonformapp:generation:{}"
+RECORD_KEY = "jsonformapp:record:{}:{}"
+
+
+def table_generation(table_name):
+    """
+    Current write generation of a table. Cache keys that embed it become
+    unreachable as soon as the table is written to.
+    """
+    return cache.get_or_set(GENERATION_KEY.format(table_name), 1, None)
+
+
+def _advance(table_name):
+    key = GENERATION_KEY.format(table_name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+        return cache.incr(key)
+
+
+def bump_table_generation(table_name, record_id=None):
+    """
+    Advance the table's generation, and drop ``record_id`` from the record
+    cache, in this worker now and in every worker through the invalidation
+    bus once the write commits.
+    """
+    key = table_name if record_id is None else f"{table_name}:{record_id}"
+    forget_rows(key)
+    transaction.on_commit(lambda: bus.publish("rows", key))
+
+
+def forget_rows(key):
+    """Bus handler: ``<table>`` or ``<table>:<record id>`` was written."""
+    # Table names never contain a colon; record ids may.
+    table_name, _, record_id = key.partition(":")
+    _advance(table_name)
+    if record_id:
+        invalidate_record(table_name, record_id)
+
+
+bus.subscribe("rows", forget_rows)
+
+
+FORM_TABLE = "jsonformapp_form"
+
+
+def model_written(sender, **kwargs):
+    """
+    post_save/post_delete receiver bumping the sender's table generation.
+    Forms are tracked too, since they decide which tables count as in use.
+    """
+    table_name = sender._meta.db_table
+    if is_user_table(table_name) or table_name == FORM_TABLE:
+        bump_table_generation(table_name, kwargs["instance"].pk)
+
+
+def invalidate_record(table_name, record_id):
+    """Drop a record from the per-record cache of tables/<table>/records/."""
+    cache.delete(RECORD_KEY.format(table_name, record_id))
+
+
+_form_caches = []
+
+
+class FormVersionCache:
+    """
+    Bounded LRU of objects compiled per ``(form id, version)``, such as the
+    rules and schemas, shared by the threads of a worker.
+    """
+
+    def __init__(self, size=256):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        _form_caches.append(self)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get_or_build(self, form, build):
+        """The entry for ``form``, calling ``build()`` on a miss."""
+        key = (form.id, form.version)
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                return value
+        # Built outside the lock: it queries the database.
+        value = build()
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return value
+
+    def forget(self, form_id):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == form_id]:
+                del self.entries[key]
+
+
+def forget_form(form_id):
+    """Bus handler: drop every compiled version of the form."""
+    for form_cache in _form_caches:
+        form_cache.forget(int(form_id))
+
+
+bus.subscribe("form", forget_form)
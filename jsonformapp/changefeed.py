@@ -0,0 +1,148 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TableChange
+
+POLL_INTERVAL = 0.5
+MAX_WAIT = 30
+MAX_LIMIT = 1000
+KEEP_ALIVE = 10
+
+
+def feed_tables():
+    return getattr(settings, "CHANGE_FEED_TABLES", [])
+
+
+def snapshot(instance):
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+    }
+
+
+def record_model_change(sender, instance, created=None, **kwargs):
+    """
+    post_save/post_delete receiver. The change row is written on the same
+    connection as the data write, so it commits or rolls back with it.
+    """
+    table_name = sender._meta.db_table
+    if table_name not in feed_tables():
+        return
+    if created is None:
+        # Only post_save passes ``created``.
+        op = TableChange.OP_DELETE
+    else:
+        op = TableChange.OP_INSERT if created else TableChange.OP_UPDATE
+    TableChange.objects.create(
+        table_name=table_name,
+        record_id="" if instance.pk is None else str(instance.pk),
+        op=op,
+        data=None if op == TableChange.OP_DELETE else snapshot(instance),
+    )
+
+
+def record_bulk_insert(table_name, objs):
+    """Log rows written with bulk_create, which sends no post_save."""
+    if table_name not in feed_tables():
+        return
+    TableChange.objects.bulk_create(
+        [
+            TableChange(
+                table_name=table_name,
+                record_id="" if obj.pk is None else str(obj.pk),
+                op=TableChange.OP_INSERT,
+                data=snapshot(obj),
+            )
+            for obj in objs
+        ],
+        batch_size=500,
+    )
+
+
+def settled_seq():
+    """
+    The highest id up to which every change is visible.
+
+    Ids are assigned at insert but rows become visible at commit, so a
+    transaction can commit id 12 while id 11 is still in flight; a client
+    that moved its cursor to 12 would never see 11. Changes are therefore
+    only served up to the first gap in the ids written within the last
+    CHANGE_FEED_SETTLE seconds. Older gaps are rolled-back transactions.
+    """
+    horizon = timezone.now() - timedelta(
+        seconds=getattr(settings, "CHANGE_FEED_SETTLE", 2.0)
+    )
+    seq = (
+        TableChange.objects.filter(created_at__lte=horizon)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+    for change_id in (
+        TableChange.objects.filter(id__gt=seq)
+        .order_by("id")
+        .values_list("id", flat=True)
+    ):
+        if change_id != seq + 1:
+            break
+        seq = change_id
+    return seq
+
+
+def changes_since(table_name, since, limit=MAX_LIMIT):
+    limit = max(1, min(limit, MAX_LIMIT))
+    return list(
+        TableChange.objects.filter(
+            table_name=table_name, id__gt=since, id__lte=settled_seq()
+        )
+        .order_by("id")
+        .values("id", "op", "record_id", "data", "created_at")[:limit]
+    )
+
+
+def wait_for_changes(table_name, since, wait, limit=MAX_LIMIT):
+    """
+    Long-poll: return as soon as there are changes after ``since`` or once
+    ``wait`` seconds have passed. Each poll is one indexed range query.
+    """
+    deadline = time.monotonic() + max(0, min(wait, MAX_WAIT))
+    while True:
+        changes = changes_since(table_name, since, limit)
+        if changes or time.monotonic() >= deadline:
+            return changes
+        time.sleep(POLL_INTERVAL)
+
+
+def latest_seq(table_name):
+    last = (
+        TableChange.objects.filter(table_name=table_name, id__lte=settled_seq())
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    )
+    return last or 0
+
+
+def event_stream(table_name, since, wait, render):
+    """
+    Server-sent events for up to ``wait`` seconds; clients reconnect with
+    the Last-Event-ID header to resume.
+    """
+    deadline = time.monotonic() + max(0, min(wait, MAX_WAIT))
+    last_sent = time.monotonic()
+    yield "retry: 1000\n\n"
+    while time.monotonic() < deadline:
+        changes = changes_since(table_name, since)
+        for change in changes:
+            since = change["id"]
+            yield f"id: {since}\nevent: change\ndata: {render(change)}\n\n"
+        if changes:
+            last_sent = time.monotonic()
+            continue
+        if time.monotonic() - last_sent >= KEEP_ALIVE:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,322 @@
+"""
+Forward submissions to their form's ``submit_api_route``.
+
+Requests only enqueue a Delivery row. ``manage.py dispatch_submissions``
+claims due deliveries in batches and sends them with a thread pool, one task
+per route, so routes are served concurrently while each route sees its
+submissions in order. Connections are pooled per host and kept alive across
+requests and passes. Failures are retried with exponential backoff and
+jitter; permanent rejections (4xx) and deliveries out of attempts move to
+DeliveryDeadLetter. Delivery is at-least-once: routes should tolerate an
+occasional duplicate.
+"""
+
+import http.client
+import json
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework.utils import encoders
+
+from . import metrics
+from .models import Delivery, DeliveryDeadLetter
+
+DEFAULTS = {
+    "ENABLED": True,
+    # Deliveries claimed per pass.
+    "BATCH_SIZE": 200,
+    # Routes sent to in parallel.
+    "CONCURRENCY": 8,
+    # Idle keep-alive connections kept per host.
+    "MAX_IDLE_PER_HOST": 4,
+    "TIMEOUT": 10.0,
+    "MAX_ATTEMPTS": 8,
+    "BACKOFF_BASE": 2.0,
+    "BACKOFF_MAX": 600.0,
+    # Seconds a claimed delivery is hidden from other dispatchers.
+    "LEASE": 120,
+    "POLL_INTERVAL": 1.0,
+    # Routes that accept a JSON array of submissions in one request.
+    "BATCH_ROUTES": [],
+    "BATCH_ROUTE_SIZE": 50,
+    "HEADERS": {},
+}
+RETRY_STATUSES = {408, 425, 429}
+# send_route's error for deliveries held back behind a failed one.
+HELD = object()
+
+REQUESTS = metrics.counter("dispatch.requests")
+DELIVERED = metrics.counter("dispatch.delivered")
+RETRIED = metrics.counter("dispatch.retried")
+DEAD = metrics.counter("dispatch.dead_lettered")
+OPENED = metrics.counter("dispatch.connections_opened")
+REUSED = metrics.counter("dispatch.connections_reused")
+
+
+def dispatch_settings():
+    return {**DEFAULTS, **getattr(settings, "SUBMISSION_DISPATCH", {})}
+
+
+def enqueue_delivery(form, payload):
+    """Queue ``payload`` for the form's route; None when dispatch is off."""
+    if not dispatch_settings()["ENABLED"] or not form.submit_api_route:
+        return None
+    return Delivery.objects.create(
+        form=form, route=form.submit_api_route, payload=payload
+    )
+
+
+def forward_submission(form, table_name, field_values, **ids):
+    """Queue a written submission for the form's submit_api_route."""
+    return enqueue_delivery(
+        form,
+        {
+            "form_id": form.id,
+            "form_version": form.version,
+            "table_name": table_name,
+            **ids,
+            "field_values": field_values,
+        },
+    )
+
+
+class DeliveryFailed(Exception):
+    def __init__(self, message, retry=True):
+        super().__init__(message)
+        self.retry = retry
+
+
+class ConnectionPool:
+    """Idle HTTP/1.1 connections per (scheme, host, port), thread-safe."""
+
+    def __init__(self, max_idle_per_host=4, timeout=10.0):
+        self.max_idle = max_idle_per_host
+        self.timeout = timeout
+        self.idle = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def _connect(self, key):
+        scheme, netloc = key
+        metrics.incr(OPENED)
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def acquire(self, key):
+        with self.lock:
+            if self.idle[key]:
+                metrics.incr(REUSED)
+                return self.idle[key].pop(), True
+        return self._connect(key), False
+
+    def release(self, key, conn):
+        with self.lock:
+            if len(self.idle[key]) < self.max_idle:
+                self.idle[key].append(conn)
+                return
+        conn.close()
+
+    def post(self, url, body, headers):
+        """POST ``body``; returns ``(status, response body)``."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise DeliveryFailed(f"Unsupported route '{url}'.", retry=False)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        while True:
+            conn, reused = self.acquire(key)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                # The server may have dropped an idle keep-alive connection.
+                if reused:
+                    continue
+                raise DeliveryFailed(f"{type(e).__name__}: {e}")
+            if response.will_close:
+                conn.close()
+            else:
+                self.release(key, conn)
+            return response.status, data
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for conn in connections:
+                    conn.close()
+            self.idle.clear()
+
+
+def backoff(attempts, config):
+    delay = min(config["BACKOFF_MAX"], config["BACKOFF_BASE"] * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim(config):
+    """
+    Lease up to BATCH_SIZE due deliveries to this dispatcher. A delivery
+    waits while an earlier one to its route is leased or backing off, so
+    each route receives its submissions in order.
+    """
+    now = timezone.now()
+    waiting = Delivery.objects.filter(
+        status=Delivery.STATUS_PENDING,
+        next_attempt_at__gt=now,
+        route=OuterRef("route"),
+        id__lt=OuterRef("id"),
+    )
+    with transaction.atomic():
+        deliveries = list(
+            Delivery.objects.select_for_update(skip_locked=True)
+            .filter(status=Delivery.STATUS_PENDING, next_attempt_at__lte=now)
+            .exclude(Exists(waiting))
+            .order_by("id")[: config["BATCH_SIZE"]]
+        )
+        Delivery.objects.filter(id__in=[d.id for d in deliveries]).update(
+            next_attempt_at=now + timedelta(seconds=config["LEASE"])
+        )
+    return deliveries
+
+
+def send_route(pool, route, deliveries, config):
+    """
+    Send one route's deliveries in order, stopping at the first failure so
+    that later submissions never overtake it. Runs in a worker thread and
+    does no database work; returns ``[(delivery, error or None, retry)]``
+    with error HELD for the deliveries not attempted.
+    """
+    headers = {"Content-Type": "application/json", **config["HEADERS"]}
+    batched = route in config["BATCH_ROUTES"]
+    size = config["BATCH_ROUTE_SIZE"] if batched else 1
+    chunks = [deliveries[i : i + size] for i in range(0, len(deliveries), size)]
+
+    results = []
+    for position, chunk in enumerate(chunks):
+        payload = [d.payload for d in chunk] if batched else chunk[0].payload
+        body = json.dumps(payload, cls=encoders.JSONEncoder).encode()
+        try:
+            metrics.incr(REQUESTS)
+            status, data = pool.post(route, body, headers)
+            if status >= 300:
+                retry = status >= 500 or status in RETRY_STATUSES
+                raise DeliveryFailed(
+                    f"HTTP {status}: {data[:200].decode(errors='replace')}", retry
+                )
+        except DeliveryFailed as e:
+            results.extend((d, str(e), e.retry) for d in chunk)
+            for rest in chunks[position + 1 :]:
+                results.extend((d, HELD, True) for d in rest)
+            break
+        else:
+            results.extend((d, None, False) for d in chunk)
+    return results
+
+
+def record_results(results, config):
+    now = timezone.now()
+    delivered, retried, dead, held = [], [], [], []
+    for delivery, error, retry in results:
+        if error is HELD:
+            # Due again at once; claim() keeps it behind the failed one.
+            delivery.next_attempt_at = now
+            held.append(delivery)
+            continue
+        if error is None:
+            delivery.status = Delivery.STATUS_DELIVERED
+            delivery.delivered_at = now
+            delivered.append(delivery)
+            continue
+        delivery.attempts += 1
+        delivery.last_error = error
+        if retry and delivery.attempts < config["MAX_ATTEMPTS"]:
+            delivery.next_attempt_at = now + timedelta(
+                seconds=backoff(delivery.attempts, config)
+            )
+            retried.append(delivery)
+        else:
+            dead.append(delivery)
+
+    with transaction.atomic():
+        Delivery.objects.bulk_update(delivered, ["status", "delivered_at"])
+        Delivery.objects.bulk_update(
+            retried, ["attempts", "last_error", "next_attempt_at"]
+        )
+        Delivery.objects.bulk_update(held, ["next_attempt_at"])
+        DeliveryDeadLetter.objects.bulk_create(
+            DeliveryDeadLetter(
+                form_id=d.form_id,
+                route=d.route,
+                payload=d.payload,
+                attempts=d.attempts,
+                error=d.last_error,
+                created_at=d.created_at,
+            )
+            for d in dead
+        )
+        Delivery.objects.filter(id__in=[d.id for d in dead]).delete()
+
+    metrics.incr(DELIVERED, len(delivered))
+    metrics.incr(RETRIED, len(retried))
+    metrics.incr(DEAD, len(dead))
+    return len(delivered), len(retried), len(dead)
+
+
+def dispatch_once(pool, executor, config=None):
+    """
+    One claim-and-send pass. Returns ``(delivered, retried, dead)``, or None
+    when nothing was due.
+    """
+    config = config or dispatch_settings()
+    deliveries = claim(config)
+    if not deliveries:
+        return None
+    by_route = defaultdict(list)
+    for delivery in deliveries:
+        by_route[delivery.route].append(delivery)
+    futures = [
+        executor.submit(send_route, pool, route, items, config)
+        for route, items in by_route.items()
+    ]
+    results = [result for future in futures for result in future.result()]
+    return record_results(results, config)
+
+
+def has_due():
+    return Delivery.objects.filter(
+        status=Delivery.STATUS_PENDING, next_attempt_at__lte=timezone.now()
+    ).exists()
+
+
+def dispatcher(config=None):
+    """``(pool, executor)`` sized from SUBMISSION_DISPATCH."""
+    config = config or dispatch_settings()
+    pool = ConnectionPool(config["MAX_IDLE_PER_HOST"], config["TIMEOUT"])
+    executor = ThreadPoolExecutor(
+        max_workers=config["CONCURRENCY"], thread_name_prefix="dispatch"
+    )
+    return pool, executor
+
+
+def queue_stats():
+    pending = Delivery.objects.filter(status=Delivery.STATUS_PENDING)
+    oldest = pending.order_by("id").values_list("created_at", flat=True).first()
+    return {
+        "pending": pending.count(),
+        "dead_letters": DeliveryDeadLetter.objects.count(),
+        "oldest_pending_age": (
+            (timezone.now() - oldest).total_seconds() if oldest else None
+        ),
+    }
@@ -0,0 +1,350 @@
+"""
+JSON Schema (draft 2020-12) documents compiled from a form's fields, so
+clients can validate locally against exactly what the server checks.
+
+Each Field becomes a property built from ``data_type``, ``max_length`` and
+``config`` (``label``, ``description``, ``options``, ``min``, ``max``,
+``min_length``, ``pattern``, ``default``). Fields that are ``is_Required``
+and carry no rules are listed in ``required``; conditional visibility and
+requirement stay with the rules (rules.py), which are included verbatim
+under ``x-rules`` for clients that evaluate them.
+
+A form's schema is compiled once per ``Form.version`` together with the
+validator the server runs on submissions, and identified by an ETag over
+its canonical JSON.
+"""
+
+import hashlib
+import json
+import math
+import re
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.core.validators import EmailValidator, URLValidator
+from django.utils.dateparse import parse_datetime, parse_time
+
+from .caching import FormVersionCache
+from .models import Field
+from .rules import EMPTY_VALUES, RULE_KEYS
+
+DIALECT = "https://json-schema.org/draft/2020-12/schema"
+DECIMAL_PATTERN = r"^-?\d+(\.\d+)?$"
+TYPES = {
+    "string": {"type": "string"},
+    "char": {"type": "string"},
+    "text": {"type": "string"},
+    "textarea": {"type": "string"},
+    "integer": {"type": "integer"},
+    "int": {"type": "integer"},
+    # Decimals may arrive as strings, as DRF renders them.
+    "number": {"type": ["number", "string"], "pattern": DECIMAL_PATTERN},
+    "decimal": {"type": ["number", "string"], "pattern": DECIMAL_PATTERN},
+    "float": {"type": "number"},
+    "boolean": {"type": "boolean"},
+    "bool": {"type": "boolean"},
+    "checkbox": {"type": "boolean"},
+    "date": {"type": "string", "format": "date"},
+    "datetime": {"type": "string", "format": "date-time"},
+    "time": {"type": "string", "format": "time"},
+    "email": {"type": "string", "format": "email"},
+    "url": {"type": "string", "format": "uri"},
+    "json": {},
+}
+CONFIG_KEYWORDS = {
+    "label": "title",
+    "description": "description",
+    "min": "minimum",
+    "max": "maximum",
+    "min_length": "minLength",
+    "pattern": "pattern",
+    "default": "default",
+}
+CACHE_SIZE = 256
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _is_date(value):
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _passes(validator):
+    def check(value):
+        try:
+            validator(value)
+        except ValidationError:
+            return False
+        return True
+
+    return check
+
+
+FORMATS = {
+    "date": _is_date,
+    "date-time": lambda value: parse_datetime(value) is not None,
+    "time": lambda value: parse_time(value) is not None,
+    "email": _passes(EmailValidator()),
+    "uri": _passes(URLValidator()),
+}
+
+
+def _is_number(value):
+    # Decimal covers values computed by the rules or read from the database.
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    if isinstance(value, float):
+        return value.is_integer()
+    if isinstance(value, Decimal):
+        return value.is_finite() and value == value.to_integral_value()
+    return _is_number(value)
+
+
+JSON_TYPES = {
+    "string": lambda v: isinstance(v, str),
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+}
+
+
+def _config_number(key, value):
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+    if not _is_number(value) or not math.isfinite(value):
+        raise SchemaError(f"'{key}' must be a number.")
+    return value
+
+
+def _config_value(key, value):
+    """
+    A config keyword checked and coerced as the validator needs it, so a
+    bad form definition fails when compiled rather than on a submission.
+    """
+    if key in ("min", "max"):
+        return _config_number(key, value)
+    if key == "min_length":
+        value = _config_number(key, value)
+        if value < 0 or value != int(value):
+            raise SchemaError("'min_length' must be a non-negative integer.")
+        return int(value)
+    if key == "pattern":
+        if not isinstance(value, str):
+            raise SchemaError("'pattern' must be a string.")
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise SchemaError(f"'pattern' is not a valid regular expression: {e}")
+    return value
+
+
+def field_schema(data_type, is_required, max_length, config):
+    """The JSON Schema of one field; SchemaError for an invalid config."""
+    schema = dict(TYPES.get((data_type or "").strip().lower(), TYPES["string"]))
+    config = config if isinstance(config, dict) else {}
+    is_string = schema.get("type") == "string"
+    if is_string and max_length:
+        schema["maxLength"] = max_length
+    for key, keyword in CONFIG_KEYWORDS.items():
+        if key in config:
+            schema[keyword] = _config_value(key, config[key])
+    options = config.get("options")
+    if isinstance(options, list) and options:
+        schema["enum"] = [
+            option.get("value") if isinstance(option, dict) else option
+            for option in options
+        ]
+    if "compute" in config:
+        schema["readOnly"] = True
+    if is_required and is_string and "minLength" not in schema:
+        schema["minLength"] = 1
+    if not is_required and "type" in schema:
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        schema["type"] = types + ["null"]
+        if "enum" in schema:
+            schema["enum"] = schema["enum"] + [None]
+    return schema
+
+
+def compile_schema(form, fields):
+    """
+    ``fields`` is an iterable of ``(db_column_name, data_type, is_Required,
+    max_length, config)`` in display order.
+    """
+    properties, required, rules = {}, [], {}
+    for name, data_type, is_required, max_length, config in fields:
+        if not name:
+            continue
+        try:
+            properties[name] = field_schema(data_type, is_required, max_length, config)
+        except SchemaError as e:
+            raise SchemaError(f"Field '{name}': {e}")
+        field_rules = {
+            key: config[key]
+            for key in RULE_KEYS
+            if isinstance(config, dict) and key in config
+        }
+        if field_rules:
+            rules[name] = field_rules
+        elif is_required:
+            required.append(name)
+    schema = {
+        "$schema": DIALECT,
+        "$id": f"form/{form.id}/schema/v{form.version}",
+        "title": form.form_name,
+        "type": "object",
+        "properties": properties,
+        "required": required,
+    }
+    if rules:
+        schema["x-rules"] = rules
+    return schema
+
+
+def _property_validator(schema):
+    types = schema.get("type")
+    types = [types] if isinstance(types, str) else types
+    checks = []
+    if types:
+        names = " or ".join(types)
+        checks.append(
+            (
+                lambda v: any(JSON_TYPES[t](v) for t in types),
+                f"Must be of type {names}.",
+            )
+        )
+    if "enum" in schema:
+        allowed = schema["enum"]
+        checks.append((lambda v: v in allowed, "Not one of the allowed options."))
+    if "maxLength" in schema:
+        limit = schema["maxLength"]
+        checks.append(
+            (
+                lambda v: not isinstance(v, str) or len(v) <= limit,
+                f"Ensure this value has at most {limit} characters.",
+            )
+        )
+    if "minLength" in schema:
+        low = schema["minLength"]
+        checks.append(
+            (
+                lambda v: not isinstance(v, str) or len(v) >= low,
+                f"Ensure this value has at least {low} characters.",
+            )
+        )
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+        checks.append(
+            (
+                lambda v: not isinstance(v, str) or pattern.search(v) is not None,
+                "Invalid format.",
+            )
+        )
+    if "format" in schema and schema["format"] in FORMATS:
+        valid, kind = FORMATS[schema["format"]], schema["format"]
+        checks.append(
+            (
+                lambda v: not isinstance(v, str) or valid(v),
+                f"Enter a valid {kind}.",
+            )
+        )
+    number = JSON_TYPES["number"]
+    if "minimum" in schema:
+        low = schema["minimum"]
+        checks.append(
+            (
+                lambda v: not number(v) or v >= low,
+                f"Ensure this value is greater than or equal to {low}.",
+            )
+        )
+    if "maximum" in schema:
+        high = schema["maximum"]
+        checks.append(
+            (
+                lambda v: not number(v) or v <= high,
+                f"Ensure this value is less than or equal to {high}.",
+            )
+        )
+
+    def validate(value):
+        if value is None and (not types or "null" in types):
+            return []
+        for check, message in checks:
+            if not check(value):
+                return [message]
+        return []
+
+    return validate
+
+
+class FormSchema:
+    """A compiled schema, its ETag and the matching validator."""
+
+    def __init__(self, form, fields):
+        self.schema = compile_schema(form, fields)
+        body = json.dumps(self.schema, sort_keys=True, separators=(",", ":"))
+        self.etag = '"%s"' % hashlib.sha1(body.encode()).hexdigest()
+        self.required = self.schema["required"]
+        self.validators = {
+            name: _property_validator(schema)
+            for name, schema in self.schema["properties"].items()
+        }
+
+    def validate(self, values):
+        """Errors as ``{field: [messages]}``, like FormRules.evaluate."""
+        errors = {
+            name: ["This field is required."]
+            for name in self.required
+            if values.get(name) in EMPTY_VALUES
+        }
+        for name, value in values.items():
+            validator = self.validators.get(name)
+            if validator is None or name in errors:
+                continue
+            messages = validator(value)
+            if messages:
+                errors[name] = messages
+        return errors
+
+
+_compiled = FormVersionCache(CACHE_SIZE)
+
+
+def form_schema(form):
+    """Compiled schema for ``form``, cached per (form id, version)."""
+
+    def build():
+        fields = (
+            Field.objects.filter(column__row__section__form=form)
+            .order_by(
+                "column__row__section__section_order",
+                "column__row__row_order",
+                "column__column_order",
+                "field_order",
+                "id",
+            )
+            .values_list(
+                "db_column_name", "data_type", "is_Required", "max_length", "config"
+            )
+        )
+        return FormSchema(form, fields)
+
+    return _compiled.get_or_build(form, build)
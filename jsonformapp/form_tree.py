@@ -0,0 +1,203 @@
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Prefetch, Value, When
+
+from .models import Column, Field, Form, Row, Section
+from .serializers import (
+    ColumnSerializer,
+    FieldSerializer,
+    FormSerializer,
+    FormSkeletonSerializer,
+    RowSerializer,
+    SectionSerializer,
+)
+from .tenancy import DEFAULT_TENANT, tenant_cache, tenant_key
+
+# level -> (model, order field, parent, lookup to the form, max children).
+# The 1-3 bounds mirror the Row/Column order validators.
+REORDER_LEVELS = {
+    "sections": (Section, "section_order", "form", "form", None),
+    "rows": (Row, "row_order", "section", "section__form", 3),
+    "columns": (Column, "column_order", "row", "row__section__form", 3),
+    "fields": (Field, "field_order", "column", "column__row__section__form", None),
+}
+
+SKELETON_KEY = "jsonformapp:form:{}:v{}:skeleton"
+SECTION_KEY = "jsonformapp:form:{}:v{}:section:{}"
+
+
+def _ttl():
+    return getattr(settings, "FORM_CACHE_TTL", 3600)
+
+
+# (model, serializer, parent foreign key, order field) per level of the form
+# tree. The serializers only define the output keys; values are read with
+# .values_list. Siblings are listed in their display order, ties by id.
+LEVELS = [
+    (Form, FormSerializer, None, "id"),
+    (Section, SectionSerializer, "form", "section_order"),
+    (Row, RowSerializer, "section", "row_order"),
+    (Column, ColumnSerializer, "row", "column_order"),
+    (Field, FieldSerializer, "column", "field_order"),
+]
+
+
+@lru_cache(maxsize=None)
+def _layout(depth):
+    """
+    ``(keys, attnames)`` for a level: the serializer's output keys in order
+    and the column each one is read from (None for the nested children).
+    """
+    model, serializer_class, _, _ = LEVELS[depth]
+    keys, attnames = [], []
+    for key in serializer_class().fields:
+        try:
+            field = model._meta.get_field(key)
+        except FieldDoesNotExist:
+            field = None
+        keys.append(key)
+        attnames.append(field.attname if field and field.concrete else None)
+    return keys, attnames
+
+
+def serialize_tree(depth, ids):
+    """
+    Same output as the nested read serializers for the objects at level
+    ``depth`` (0 = forms, 1 = sections) with the given ids, a list or a
+    ``.values("id")`` queryset used as a subquery. Each level is
+    read with one ``values_list`` query and stitched to its parent with dict
+    lookups, skipping per-attribute serializer field calls.
+    """
+    roots = []
+    by_parent = defaultdict(lambda: defaultdict(list))
+    path = []
+    for level in range(depth, len(LEVELS)):
+        model, _, parent, order_field = LEVELS[level]
+        if level == depth:
+            lookup = "id"
+        else:
+            path.insert(0, parent)
+            lookup = "__".join(path)
+
+        keys, attnames = _layout(level)
+        columns = [attname for attname in attnames if attname is not None]
+        slots = [None if a is None else columns.index(a) for a in attnames]
+        id_index = columns.index("id")
+        parent_index = columns.index(f"{parent}_id") if level > depth else None
+        children = by_parent[level + 1]
+        siblings = by_parent[level]
+
+        rows = (
+            model.objects.filter(**{f"{lookup}__in": ids})
+            .order_by(order_field, "id")
+            .values_list(*columns)
+        )
+        for row in rows:
+            item = {
+                key: children[row[id_index]] if slot is None else row[slot]
+                for key, slot in zip(keys, slots)
+            }
+            if parent_index is None:
+                roots.append(item)
+            else:
+                siblings[row[parent_index]].append(item)
+    return roots
+
+
+def form_version(form_id, tenant=DEFAULT_TENANT):
+    """
+    Version of a live form, or None if it does not exist or is deleted.
+    Cache keys embed the version, so a form update never serves stale trees.
+    """
+    return (
+        Form.objects.filter(tenant=tenant, is_deleted=False, id=form_id)
+        .values_list("version", flat=True)
+        .first()
+    )
+
+
+def get_form_skeleton(form_id, tenant=DEFAULT_TENANT):
+    """Form attributes plus section headers, ordered by section_order."""
+    version = form_version(form_id, tenant)
+    if version is None:
+        return None
+
+    cache = tenant_cache(tenant)
+    key = tenant_key(tenant, SKELETON_KEY.format(form_id, version))
+    data = cache.get(key)
+    if data is None:
+        form = Form.objects.prefetch_related(
+            Prefetch("sections", queryset=Section.objects.order_by("section_order"))
+        ).get(id=form_id)
+        data = FormSkeletonSerializer(form).data
+        cache.set(key, data, _ttl())
+    return data
+
+
+def get_form_section(form_id, section_id, tenant=DEFAULT_TENANT):
+    """A single section with its rows, columns and fields."""
+    version = form_version(form_id, tenant)
+    if version is None:
+        return None
+
+    cache = tenant_cache(tenant)
+    key = tenant_key(tenant, SECTION_KEY.format(form_id, version, section_id))
+    data = cache.get(key)
+    if data is None:
+        if not Section.objects.filter(id=section_id, form_id=form_id).exists():
+            return None
+        data = serialize_tree(1, [section_id])[0]
+        cache.set(key, data, _ttl())
+    return data
+
+
+class ReorderError(ValueError):
+    pass
+
+
+def _is_id(value):
+    # bool is a subclass of int, but true/false are not ids.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def reorder(form, level, parent_id, ids):
+    """
+    Set the order of ``parent_id``'s children at ``level`` to the position
+    of their id in ``ids`` (1-based) with a single CASE update, and bump the
+    form version. ``ids`` must list every child exactly once.
+    """
+    if level not in REORDER_LEVELS:
+        raise ReorderError(f"'level' must be one of {', '.join(REORDER_LEVELS)}.")
+    model, order_field, parent, form_lookup, limit = REORDER_LEVELS[level]
+    if not isinstance(ids, list) or not all(_is_id(i) for i in ids):
+        raise ReorderError("'ids' must be a list of integers.")
+    if level != "sections" and not _is_id(parent_id):
+        raise ReorderError("'parent_id' must be an integer.")
+    if len(set(ids)) != len(ids):
+        raise ReorderError("'ids' contains duplicates.")
+    if limit is not None and len(ids) > limit:
+        raise ReorderError(f"{order_field} must be between 1 and {limit}.")
+
+    if level == "sections":
+        parent_id = form.id
+    children = model.objects.filter(**{f"{parent}_id": parent_id, form_lookup: form})
+
+    with transaction.atomic():
+        existing = set(children.values_list("id", flat=True))
+        if existing != set(ids):
+            raise ReorderError(
+                f"'ids' must list exactly the {level} of {parent} {parent_id}."
+            )
+        children.update(
+            **{
+                order_field: Case(
+                    *[When(id=pk, then=Value(i)) for i, pk in enumerate(ids, 1)],
+                    output_field=IntegerField(),
+                )
+            }
+        )
+        Form.objects.filter(id=form.id).update(version=F("version") + 1)
@@ -0,0 +1,82 @@
+"""
+Conditional responses for the table introspection endpoints. The ETag is
+derived from the schema fingerprint (plus table write generations for views
+that depend on table contents), so an ``If-None-Match`` hit is answered from
+the cache without touching the database. Rendered payloads are shared
+between clients in a server-side cache keyed on the same ETag.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import GENERATION_KEY
+from .schema import schema_fingerprint
+from .tenancy import get_tenant, tenant_cache, tenant_key
+
+RESPONSE_CACHE_KEY = "jsonformapp:response:{}"
+
+
+def _generations(table_names):
+    keys = [GENERATION_KEY.format(name) for name in table_names]
+    values = cache.get_many(keys)
+    return [f"{key}={values.get(key, 1)}" for key in keys]
+
+
+def introspection_etag(request, variant, tables=()):
+    """
+    Strong ETag for an introspection view. ``tables`` lists the tables whose
+    contents the response depends on.
+    """
+    digest, last_modified = schema_fingerprint()
+    parts = [digest, variant, get_tenant(request)] + _generations(tables)
+    etag = hashlib.sha1("|".join(parts).encode()).hexdigest()[:32]
+    return f'"{etag}"', last_modified
+
+
+def _not_modified(request, etag, last_modified, data_dependent):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return etag in if_none_match or if_none_match.strip() == "*"
+    if data_dependent or last_modified is None:
+        return False
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def cached_introspection(request, variant, build, tables=()):
+    """
+    Serve ``build()`` (a Response) with ETag, Last-Modified and Cache-Control,
+    answering 304 when the client's copy is current and reusing the cached
+    payload of any earlier 200 for the same ETag.
+    """
+    etag, last_modified = introspection_etag(request, variant, tables)
+    max_age = getattr(settings, "INTROSPECTION_MAX_AGE", 60)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache" if tables else f"max-age={max_age}",
+    }
+    if last_modified is not None and not tables:
+        headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+    if _not_modified(request, etag, last_modified, bool(tables)):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    tenant = get_tenant(request)
+    store = tenant_cache(tenant)
+    key = tenant_key(tenant, RESPONSE_CACHE_KEY.format(etag.strip('"')))
+    data = store.get(key)
+    if data is not None:
+        return Response(data, status=status.HTTP_200_OK, headers=headers)
+
+    response = build()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    store.set(key, response.data, getattr(settings, "SCHEMA_CACHE_TTL", 300))
+    for name, value in headers.items():
+        response[name] = value
+    return response
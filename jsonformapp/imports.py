@@ -0,0 +1,199 @@
+import csv
+import io
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .caching import bump_table_generation
+from .changefeed import record_bulk_insert
+from .models import Field
+
+try:
+    import openpyxl
+except ImportError:  # pragma: no cover - XLSX support is optional
+    openpyxl = None
+
+MAX_REPORTED_ERRORS = 100
+BOOLEAN_VALUES = {
+    "true": True,
+    "yes": True,
+    "y": True,
+    "false": False,
+    "no": False,
+    "n": False,
+}
+
+
+class TableImportError(ValueError):
+    pass
+
+
+def iter_rows(uploaded):
+    """Yield rows of an uploaded CSV or XLSX file one at a time."""
+    name = (uploaded.name or "").lower()
+    if name.endswith(".xlsx"):
+        if openpyxl is None:
+            raise TableImportError("XLSX import requires the openpyxl package.")
+        workbook = openpyxl.load_workbook(uploaded, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield ["" if value is None else value for value in row]
+        finally:
+            workbook.close()
+        return
+
+    text = io.TextIOWrapper(uploaded.file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise TableImportError(f"Malformed CSV at line {reader.line_num}: {e}")
+    finally:
+        text.detach()
+
+
+def header_mapping(model, headers, form=None):
+    """
+    Map header positions to model fields. Headers match a field's name,
+    column or verbose name; with a form, its fields' config labels are
+    accepted as aliases for their db_column_name.
+    """
+    fields = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        for alias in (field.name, field.attname, str(field.verbose_name)):
+            fields[alias.strip().lower()] = field
+
+    if form is not None:
+        for db_column_name, config in Field.objects.filter(
+            column__row__section__form=form
+        ).values_list("db_column_name", "config"):
+            field = fields.get(db_column_name.lower())
+            label = config.get("label") if isinstance(config, dict) else None
+            if field is not None and label:
+                fields.setdefault(str(label).strip().lower(), field)
+
+    mapping, ignored, seen = {}, [], set()
+    for position, header in enumerate(headers):
+        field = fields.get(str(header).strip().lower())
+        if field is None or field.name in seen:
+            ignored.append(header)
+            continue
+        mapping[position] = field
+        seen.add(field.name)
+    if not mapping:
+        raise TableImportError("No header matches a column of the table.")
+    return mapping, ignored
+
+
+def coerce(field, raw):
+    if raw == "" or raw is None:
+        if field.null:
+            return None
+        if field.has_default():
+            return field.get_default()
+        raw = ""
+    if isinstance(raw, str) and field.get_internal_type() == "BooleanField":
+        raw = BOOLEAN_VALUES.get(raw.strip().lower(), raw)
+    return field.clean(raw, None)
+
+
+def _build(model, mapping, row):
+    values, errors = {}, {}
+    for position, field in mapping.items():
+        raw = row[position] if position < len(row) else ""
+        try:
+            values[field.attname] = coerce(field, raw)
+        except ValidationError as e:
+            errors[field.name] = e.messages
+    return values, errors
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _insert_rows(chunk, report):
+    for line, obj in chunk:
+        try:
+            with transaction.atomic():
+                obj.pk = None
+                obj.save(force_insert=True)
+            report.inserted += 1
+        except Exception as e:
+            report.error(line, {"__all__": getattr(e, "messages", [str(e)])})
+
+
+def _flush(model, chunk, report):
+    if not chunk:
+        return
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # bulk_create would leave the primary keys unset (e.g. on MySQL), and
+        # the change feed needs them to tell the rows apart.
+        _insert_rows(chunk, report)
+        bump_table_generation(model._meta.db_table)
+        return
+    objs = [obj for _, obj in chunk]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objs)
+            record_bulk_insert(model._meta.db_table, objs)
+        report.inserted += len(objs)
+    except Exception:
+        # Retry row by row so only the offending rows are rejected.
+        _insert_rows(chunk, report)
+    bump_table_generation(model._meta.db_table)
+
+
+def import_file(model, uploaded, form=None, chunk_size=None):
+    """
+    Stream ``uploaded`` into ``model`` in bulk_create chunks of
+    ``chunk_size`` rows, one transaction per chunk. Memory use is bounded by
+    the chunk size and the capped error list, not by the file size.
+    """
+    chunk_size = chunk_size or getattr(settings, "IMPORT_CHUNK_SIZE", 1000)
+    if chunk_size < 1:
+        raise TableImportError("'chunk_size' must be a positive integer.")
+    rows = iter_rows(uploaded)
+    try:
+        headers = next(rows)
+    except StopIteration:
+        raise TableImportError("The file is empty.")
+    mapping, ignored = header_mapping(model, headers, form)
+
+    report = ImportReport()
+    chunk = []
+    for line, row in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in row):
+            continue
+        values, errors = _build(model, mapping, row)
+        if errors:
+            report.error(line, errors)
+            continue
+        chunk.append((line, model(**values)))
+        if len(chunk) >= chunk_size:
+            _flush(model, chunk, report)
+            chunk = []
+    _flush(model, chunk, report)
+
+    result = report.as_dict()
+    result["ignored_columns"] = ignored
+    return result
@@ -0,0 +1,293 @@
+import csv
+import io
+import json
+import logging
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.utils import encoders
+
+from .models import Form, Job
+from .submissions import iter_submissions
+from .schema import is_user_table, table_columns, table_names
+from .tenancy import DEFAULT_TENANT, filter_tables, table_allowed
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+PROGRESS_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 10
+FETCH_SIZE = 2000
+
+
+class JobError(Exception):
+    pass
+
+
+def register(kind):
+    def decorator(handler):
+        HANDLERS[kind] = handler
+        return handler
+
+    return decorator
+
+
+class Progress:
+    """Throttled progress reporter; writes at most every PROGRESS_INTERVAL s."""
+
+    def __init__(self, job):
+        self.job = job
+        self.last = 0.0
+
+    def __call__(self, done, total=None, force=False):
+        now = time.monotonic()
+        if not force and now - self.last < PROGRESS_INTERVAL:
+            return
+        self.last = now
+        fields = {"progress": done}
+        if total is not None:
+            fields["total"] = total
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+
+
+def submit(kind, params, tenant=DEFAULT_TENANT):
+    if kind not in HANDLERS:
+        raise JobError(f"Unknown job kind '{kind}'.")
+    return Job.objects.create(kind=kind, params=params or {}, tenant=tenant)
+
+
+class Heartbeat(threading.Thread):
+    """Touches ``Job.heartbeat_at`` every HEARTBEAT_INTERVAL s while running."""
+
+    def __init__(self, job, interval=HEARTBEAT_INTERVAL):
+        super().__init__(daemon=True)
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    Job.objects.filter(
+                        pk=self.job.pk, status=Job.STATUS_RUNNING
+                    ).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.warning("Heartbeat of job %s failed", self.job.pk)
+        finally:
+            # The thread has its own connection.
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def reclaim_stale_jobs():
+    """
+    Requeue running jobs whose worker stopped sending heartbeats (killed,
+    or the host went away), failing those already tried JOB_MAX_ATTEMPTS
+    times. Returns ``(requeued, failed)``.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=getattr(settings, "JOB_STALE_AFTER", 120))
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    max_attempts = getattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=Job.STATUS_FAILED,
+        error="The worker running this job stopped responding.",
+        finished_at=now,
+    )
+    requeued = stale.filter(attempts__lt=max_attempts).update(
+        status=Job.STATUS_QUEUED, started_at=None, heartbeat_at=None, progress=0
+    )
+    if requeued or failed:
+        logger.warning("Reclaimed stale jobs: %s requeued, %s failed", requeued, failed)
+    return requeued, failed
+
+
+def claim_job():
+    """Atomically take the oldest queued job, or return None."""
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED)
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "attempts"])
+    return job
+
+
+def run_job(job):
+    progress = Progress(job)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        with tempfile.TemporaryFile("w+b") as out:
+            filename = HANDLERS[job.kind](job, out, progress)
+            out.seek(0)
+            job.result_file.save(f"{job.id}-{filename}", File(out), save=False)
+        job.status = Job.STATUS_DONE
+    except JobError as e:
+        job.status = Job.STATUS_FAILED
+        job.error = str(e)
+    except Exception as e:
+        logger.exception("Job %s failed", job.id)
+        job.status = Job.STATUS_FAILED
+        job.error = str(e)
+    finally:
+        heartbeat.stop()
+
+    job.refresh_from_db(fields=["progress", "total"])
+    if job.status == Job.STATUS_DONE and job.total is not None:
+        job.progress = job.total
+    job.finished_at = timezone.now()
+    # Only the run that still owns the job records its outcome.
+    finished = Job.objects.filter(
+        pk=job.pk, status=Job.STATUS_RUNNING, attempts=job.attempts
+    ).update(
+        status=job.status,
+        error=job.error,
+        result_file=job.result_file.name,
+        progress=job.progress,
+        finished_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning("Job %s was reclaimed while running; result dropped", job.id)
+        if job.result_file:
+            job.result_file.delete(save=False)
+    return job
+
+
+def _user_table(table_name, tenant):
+    if (
+        not table_name
+        or not is_user_table(table_name)
+        or not table_allowed(tenant, table_name)
+    ):
+        raise JobError(f"Table '{table_name}' is not available.")
+    columns = table_columns(table_name)
+    if columns is None:
+        raise JobError(f"Table '{table_name}' does not exist.")
+    return columns
+
+
+@register("export_table")
+def export_table(job, out, progress):
+    """Full table export as CSV (default) or JSON lines."""
+    table_name = job.params.get("table_name")
+    columns = list(_user_table(table_name, job.tenant))
+    export_format = job.params.get("format", "csv")
+    if export_format not in ("csv", "jsonl"):
+        raise JobError("'format' must be 'csv' or 'jsonl'.")
+
+    qn = connection.ops.quote_name
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {qn(table_name)}")
+        total = cursor.fetchone()[0]
+        progress(0, total, force=True)
+
+        cursor.execute(
+            f"SELECT {', '.join(qn(c) for c in columns)} FROM {qn(table_name)}"
+        )
+        writer = csv.writer(text)
+        if export_format == "csv":
+            writer.writerow(columns)
+        done = 0
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            if export_format == "csv":
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    text.write(
+                        json.dumps(dict(zip(columns, row)), cls=encoders.JSONEncoder)
+                    )
+                    text.write("\n")
+            done += len(rows)
+            progress(done)
+    text.detach()
+    return f"{table_name}.{export_format}"
+
+
+@register("empty_tables")
+def empty_tables(job, out, progress):
+    """Same result as GetEmptyTablesAPIView, probing one row per table."""
+    form_tables = set(Form.objects.values_list("table_name", flat=True))
+    user_tables = [
+        table
+        for table in filter_tables(job.tenant, table_names())
+        if is_user_table(table) and table not in form_tables
+    ]
+    progress(0, len(user_tables), force=True)
+
+    qn = connection.ops.quote_name
+    empty = []
+    with connection.cursor() as cursor:
+        for done, table in enumerate(user_tables, start=1):
+            cursor.execute(f"SELECT 1 FROM {qn(table)} LIMIT 1")
+            if cursor.fetchone() is None:
+                empty.append(table)
+            progress(done)
+    out.write(json.dumps({"tables": empty}).encode())
+    return "empty_tables.json"
+
+
+@register("export_submissions")
+def export_submissions(job, out, progress):
+    """A form's stored submissions as JSON lines."""
+    form = Form.objects.filter(
+        id=job.params.get("form_id"), tenant=job.tenant, is_deleted=False
+    ).first()
+    if form is None:
+        raise JobError("Form not found.")
+    total = form.submissions.count()
+    progress(0, total, force=True)
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    for done, row in enumerate(iter_submissions(form), 1):
+        text.write(json.dumps(row, cls=encoders.JSONEncoder))
+        text.write("\n")
+        progress(done)
+    text.detach()
+    return f"form_{form.id}_submissions.jsonl"
+
+
+@register("import_forms")
+def import_forms(job, out, progress):
+    """Create many forms from FormCreateSerializer payloads."""
+    from .search import index_form
+    from .serializers import FormCreateSerializer
+
+    forms = job.params.get("forms") or []
+    progress(0, len(forms), force=True)
+    results = []
+    for done, payload in enumerate(forms, start=1):
+        serializer = FormCreateSerializer(data=payload)
+        if serializer.is_valid():
+            with transaction.atomic():
+                form = serializer.save(tenant=job.tenant)
+                index_form(form)
+            results.append({"index": done - 1, "id": form.id})
+        else:
+            results.append({"index": done - 1, "errors": serializer.errors})
+        progress(done)
+    out.write(json.dumps({"results": results}).encode())
+    return "import_forms.json"
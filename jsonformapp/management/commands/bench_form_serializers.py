@@ -0,0 +1,142 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from jsonformapp.form_tree import serialize_tree
+from jsonformapp.models import Column, Field, Form, Row, Section
+from jsonformapp.serializers import FormSerializer
+
+
+def build_forms(forms, sections, rows, columns, fields):
+    """Insert a synthetic form tree with bulk_create; returns the form ids."""
+    form_objs = Form.objects.bulk_create(
+        Form(
+            submit_api_route="https://example.com/submit",
+            form_name=f"Bench form {i}",
+            table_name="product_product",
+        )
+        for i in range(forms)
+    )
+    section_objs = Section.objects.bulk_create(
+        Section(form=form, section_name=f"Section {i}", section_order=i)
+        for form in form_objs
+        for i in range(sections)
+    )
+    row_objs = Row.objects.bulk_create(
+        Row(section=section, row_name=f"Row {i}", row_order=i % 3 + 1)
+        for section in section_objs
+        for i in range(rows)
+    )
+    column_objs = Column.objects.bulk_create(
+        Column(row=row, column_name=f"Column {i}", column_order=i % 3 + 1)
+        for row in row_objs
+        for i in range(columns)
+    )
+    Field.objects.bulk_create(
+        Field(
+            column=column,
+            db_column_name=f"field_{i}",
+            data_type="string",
+            is_Required=bool(i % 2),
+            max_length=255,
+            config={"label": f"Field {i}", "placeholder": "..."},
+        )
+        for column in column_objs
+        for i in range(fields)
+    )
+    return [form.id for form in form_objs]
+
+
+def measure(run, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark FormSerializer against the values_list read path "
+        "(form_tree.serialize_tree) on a synthetic form tree. The data is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--forms", type=int, default=10)
+        parser.add_argument("--sections", type=int, default=10)
+        parser.add_argument("--rows", type=int, default=5)
+        parser.add_argument("--columns", type=int, default=2)
+        parser.add_argument("--fields", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ids = build_forms(
+                options["forms"],
+                options["sections"],
+                options["rows"],
+                options["columns"],
+                options["fields"],
+            )
+            self.report(ids, options)
+            transaction.set_rollback(True)
+
+    def report(self, ids, options):
+        forms = options["forms"]
+        sections = forms * options["sections"]
+        rows = sections * options["rows"]
+        columns = rows * options["columns"]
+        fields = columns * options["fields"]
+        objects = forms + sections + rows + columns + fields
+        self.stdout.write(f"{objects} objects ({fields} fields)\n")
+
+        queryset = Form.objects.filter(id__in=ids).order_by("id")
+
+        def drf():
+            return FormSerializer(
+                queryset.prefetch_related(
+                    Prefetch(
+                        "sections",
+                        queryset=Section.objects.order_by("section_order", "id"),
+                    ),
+                    Prefetch(
+                        "sections__rows",
+                        queryset=Row.objects.order_by("row_order", "id"),
+                    ),
+                    Prefetch(
+                        "sections__rows__columns",
+                        queryset=Column.objects.order_by("column_order", "id"),
+                    ),
+                    Prefetch(
+                        "sections__rows__columns__fields",
+                        queryset=Field.objects.order_by("field_order", "id"),
+                    ),
+                ),
+                many=True,
+            ).data
+
+        def fast():
+            return serialize_tree(0, ids)
+
+        if drf() != fast():
+            self.stderr.write("Output differs between the two read paths.")
+
+        baseline = None
+        for label, run in (("FormSerializer", drf), ("serialize_tree", fast)):
+            best, peak = measure(run, options["repeat"])
+            baseline = baseline or best
+            self.stdout.write(
+                f"{label:<15} {best * 1000:8.1f} ms ({baseline / best:4.1f}x)  "
+                f"{objects / best:10.0f} objects/s  "
+                f"peak {peak / 1024 / 1024:6.1f} MiB"
+            )
@@ -0,0 +1,75 @@
+import datetime
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from jsonformapp.renderers import FastJSONRenderer
+
+
+def product_rows(count):
+    for i in range(count):
+        yield {
+            "id": i + 1,
+            "product_name": f"Product {i}",
+            "product_code": f"P{i % 100000:04d}"[:5],
+            "currency": "INR" if i % 2 else "USD",
+            "is_active": True,
+            "is_annual": bool(i % 3),
+            "platform_fee": Decimal(f"{i % 1000}.50"),
+            "admin_fee": Decimal("12.00"),
+            "agency_commission": Decimal("7.25"),
+            "assurance_charge": None,
+            "cancellation_fee": Decimal("2.50"),
+            "bank_name": "Bank of Example",
+            "bank_branch": "Main",
+            "bank_account": f"{1000000 + i}",
+            "bsb": "062-000",
+            "parameters": '{"term": 12}',
+            "product_family": "Travel",
+            "section_definition": None,
+            "wording_url": "https://example.com/wording.pdf",
+            "start_date": datetime.date(2025, 1, 1) + datetime.timedelta(days=i % 365),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark JSON rendering and gzip size for a synthetic table payload "
+        "shaped like GetTableDataAPIView output."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        data = {"data": list(product_rows(options["rows"]))}
+        self.stdout.write(f"Rendering {options['rows']} rows\n")
+
+        baseline = None
+        for label, renderer in (
+            ("drf JSONRenderer", JSONRenderer()),
+            ("FastJSONRenderer", FastJSONRenderer()),
+        ):
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                body = renderer.render(data)
+                timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            compressed = compress_string(body)
+            gzip_time = time.perf_counter() - start
+
+            best = min(timings)
+            baseline = baseline or best
+            self.stdout.write(
+                f"{label:<18} render {best * 1000:8.1f} ms "
+                f"({baseline / best:4.1f}x)  "
+                f"raw {len(body) / 1024:9.1f} KiB  "
+                f"gzip {len(compressed) / 1024:8.1f} KiB "
+                f"({len(compressed) / len(body):.1%}, {gzip_time * 1000:.1f} ms)"
+            )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jsonformapp.dispatch import dispatch_once, dispatch_settings, dispatcher, has_due
+
+
+class Command(BaseCommand):
+    help = "Forward queued submissions to their forms' submit_api_route."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--concurrency", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=None)
+        parser.add_argument(
+            "--once", action="store_true", help="Send what is due and exit."
+        )
+
+    def handle(self, *args, **options):
+        config = dispatch_settings()
+        if options["batch_size"]:
+            config["BATCH_SIZE"] = options["batch_size"]
+        if options["concurrency"]:
+            config["CONCURRENCY"] = options["concurrency"]
+        interval = options["interval"] or config["POLL_INTERVAL"]
+
+        pool, executor = dispatcher(config)
+        try:
+            while True:
+                close_old_connections()
+                result = dispatch_once(pool, executor, config)
+                if result:
+                    delivered, retried, dead = result
+                    self.stdout.write(
+                        f"Delivered {delivered}, retrying {retried}, "
+                        f"dead-lettered {dead}."
+                    )
+                if options["once"] and not has_due():
+                    break
+                if not result:
+                    time.sleep(interval)
+        finally:
+            executor.shutdown()
+            pool.close()
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jsonformapp.outbox import (
+    RateLimiter,
+    drain_once,
+    has_pending,
+    queue_settings,
+)
+
+
+class Command(BaseCommand):
+    help = "Drain buffered form submissions into their tables in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=None)
+        parser.add_argument(
+            "--once", action="store_true", help="Drain what is pending and exit."
+        )
+
+    def handle(self, *args, **options):
+        config = queue_settings()
+        batch_size = options["batch_size"] or config["BATCH_SIZE"]
+        interval = options["interval"] or config["POLL_INTERVAL"]
+        limiter = RateLimiter(config["RATE_LIMITS"], config["DEFAULT_RATE_LIMIT"])
+
+        while True:
+            close_old_connections()
+            written = drain_once(limiter, batch_size)
+            if written:
+                self.stdout.write(f"Processed {written} submissions.")
+            if options["once"] and not has_pending():
+                break
+            if not written:
+                time.sleep(interval)
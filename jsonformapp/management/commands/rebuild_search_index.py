@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jsonformapp.models import Form, FormSearchToken
+from jsonformapp.search import index_form
+
+
+class Command(BaseCommand):
+    help = "Rebuild the form search index from scratch."
+
+    def handle(self, *args, **options):
+        FormSearchToken.objects.all().delete()
+        count = 0
+        for form in Form.objects.filter(is_deleted=False).iterator():
+            index_form(form)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} forms."))
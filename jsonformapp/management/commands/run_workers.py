@@ -0,0 +1,86 @@
+import logging
+import multiprocessing
+import signal
+import time
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+
+def worker_loop(interval, once=False):
+    if not apps.ready:
+        django.setup()
+    from jsonformapp.jobs import claim_job, reclaim_stale_jobs, run_job
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        close_old_connections()
+        try:
+            reclaim_stale_jobs()
+            job = claim_job()
+        except DatabaseError:
+            logger.exception("Could not claim a job")
+            job = None
+        if job is not None:
+            run_job(job)
+        elif once:
+            return
+        else:
+            time.sleep(interval)
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (table exports, empty-table scans, imports)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "JOB_WORKER_CONCURRENCY", 2),
+        )
+        parser.add_argument("--interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run queued jobs in this process and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            worker_loop(options["interval"], once=True)
+            return
+
+        # Children must not share the parent's database connections.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=worker_loop, args=(options["interval"],), daemon=True
+            )
+            for _ in range(options["concurrency"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} job workers.")
+
+        try:
+            while True:
+                for i, worker in enumerate(workers):
+                    if not worker.is_alive():
+                        self.stderr.write(f"Worker {worker.pid} exited, restarting.")
+                        workers[i] = multiprocessing.Process(
+                            target=worker_loop,
+                            args=(options["interval"],),
+                            daemon=True,
+                        )
+                        workers[i].start()
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
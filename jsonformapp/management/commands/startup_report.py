@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so nothing is already imported or cached.
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urlconf = time.perf_counter()
+from django.test import Client
+response = Client().get({path!r}, HTTP_HOST={host!r})
+first = time.perf_counter()
+sys.stdout.write(json.dumps({{
+    "setup_ms": (setup - start) * 1000,
+    "urlconf_ms": (urlconf - setup) * 1000,
+    "first_request_ms": (first - urlconf) * 1000,
+    "total_ms": (first - start) * 1000,
+    "status": response.status_code,
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Parse ``python -X importtime`` output into (module, self_us, cumulative_us)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cumulative_us, name = rest.split("|", 2)
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start cost in a fresh interpreter: import time per "
+        "module, django.setup(), URLConf load and the first request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/v1/form/")
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=None,
+            help="Fail if the time to first response exceeds this many ms.",
+        )
+
+    def handle(self, *args, **options):
+        hosts = [h for h in settings.ALLOWED_HOSTS if h and h != "*"]
+        host = hosts[0].lstrip(".") if hosts else "localhost"
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                PROBE.format(path=options["path"], host=host),
+            ],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        timings = json.loads(result.stdout)
+
+        modules = parse_importtime(result.stderr)
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for name, self_us, cumulative_us in sorted(
+            modules, key=lambda m: m[2], reverse=True
+        )[: options["top"]]:
+            self.stdout.write(
+                f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}"
+            )
+
+        self.stdout.write("")
+        self.stdout.write(f"modules imported   {len(modules)}")
+        self.stdout.write(f"django.setup()     {timings['setup_ms']:8.1f} ms")
+        self.stdout.write(f"URLConf load       {timings['urlconf_ms']:8.1f} ms")
+        self.stdout.write(
+            f"first request      {timings['first_request_ms']:8.1f} ms "
+            f"(GET {options['path']} -> {timings['status']})"
+        )
+        self.stdout.write(f"time to response   {timings['total_ms']:8.1f} ms")
+
+        budget = options["budget_ms"]
+        if budget is not None and timings["total_ms"] > budget:
+            raise CommandError(
+                f"Cold start took {timings['total_ms']:.0f} ms, over the "
+                f"{budget:.0f} ms budget."
+            )
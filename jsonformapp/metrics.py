@@ -0,0 +1,39 @@
+"""
+Named counters, e.g. ``DELIVERED = counter("dispatch.delivered")`` at import
+time and ``incr(DELIVERED)`` at runtime. Values are kept in the default
+cache, so workers that share a cache backend report into the same totals
+(with the local-memory backend they are per process).
+"""
+
+from django.core.cache import cache
+
+COUNTER_KEY = "jsonformapp:metrics:{}"
+
+_counters = []
+
+
+def counter(name):
+    if name not in _counters:
+        _counters.append(name)
+    return name
+
+
+def incr(name, amount=1):
+    if not amount:
+        return
+    key = COUNTER_KEY.format(name)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        if not cache.add(key, amount, None):
+            cache.incr(key, amount)
+
+
+def snapshot():
+    """Every registered counter and its current value."""
+    values = cache.get_many([COUNTER_KEY.format(name) for name in _counters])
+    return {name: values.get(COUNTER_KEY.format(name), 0) for name in _counters}
+
+
+def reset():
+    cache.delete_many([COUNTER_KEY.format(name) for name in _counters])
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_header_parameters
+
+from . import bus
+from .tenancy import DEFAULT_TENANT, UnknownTenant, tenant_from_header, tenants
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Return True if the Accept-Encoding header accepts gzip with a non-zero
+    quality. ``x-gzip`` is an alias of ``gzip`` and ``*`` covers any coding
+    not listed explicitly, so ``gzip;q=0`` opts out even alongside ``*``.
+    """
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        if not item.strip():
+            continue
+        coding, params = parse_header_parameters(item)
+        try:
+            qvalues[coding.lower()] = float(params.get("q", 1))
+        except ValueError:
+            qvalues[coding.lower()] = 0.0
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qvalues:
+            return qvalues[coding] > 0
+    return False
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware with a configurable size threshold and proper
+    Accept-Encoding negotiation.
+
+    Responses smaller than ``settings.GZIP_MIN_LENGTH`` bytes are sent as-is,
+    since compressing them costs more CPU than it saves on the wire.
+    """
+
+    def process_response(self, request, response):
+        min_length = getattr(settings, "GZIP_MIN_LENGTH", 1024)
+        if not response.streaming and len(response.content) < min_length:
+            return response
+
+        if response.has_header("Content-Encoding"):
+            return response
+
+        # Compressed event streams are buffered by gzip and by proxies.
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+
+        if not accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            patch_vary_headers(response, ("Accept-Encoding",))
+            return response
+
+        return super().process_response(request, response)
+
+
+class TenantMiddleware:
+    """Resolve ``request.tenant`` from the tenant header."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        exempt = getattr(settings, "TENANT_EXEMPT_PATHS", ())
+        if request.path.startswith(tuple(exempt)):
+            request.tenant = DEFAULT_TENANT
+            return self.get_response(request)
+
+        header = getattr(settings, "TENANT_HEADER", "X-Tenant")
+        try:
+            request.tenant = tenant_from_header(request.headers.get(header))
+        except UnknownTenant as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        response = self.get_response(request)
+        if tenants():
+            patch_vary_headers(response, (header,))
+        return response
+
+
+class InvalidationMiddleware:
+    """Apply other workers' cache invalidations before serving a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        bus.poll()
+        return self.get_response(request)
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0005_form_table_name_row_row_order"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FormSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=32)),
+                ("token", models.CharField(max_length=255)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to="jsonformapp.form",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["token", "source"], name="jsonformapp_token_01d1ca_idx"
+                    )
+                ],
+            },
+        ),
+    ]
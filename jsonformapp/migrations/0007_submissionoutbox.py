@@ -0,0 +1,58 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:55
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0006_formsearchtoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ticket",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("table_name", models.CharField(max_length=255)),
+                ("field_values", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("record_id", models.BigIntegerField(blank=True, null=True)),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "table_name", "id"],
+                        name="jsonformapp_status_42221b_idx",
+                    )
+                ],
+            },
+        ),
+    ]
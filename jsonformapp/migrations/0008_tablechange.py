@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:57
+
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0007_submissionoutbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("table_name", models.CharField(max_length=255)),
+                ("record_id", models.CharField(blank=True, max_length=64)),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("insert", "Insert"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=rest_framework.utils.encoders.JSONEncoder, null=True
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["table_name", "id"],
+                        name="jsonformapp_table_n_e167e7_idx",
+                    )
+                ],
+            },
+        ),
+    ]
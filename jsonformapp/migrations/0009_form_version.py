@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0008_tablechange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="form",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, help_text="Incremented on every form update"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0010_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="form",
+            name="tenant",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="tenant",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="form",
+            index=models.Index(
+                fields=["tenant", "is_deleted", "id"],
+                name="jsonformapp_tenant_17e85f_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:08
+
+import django.db.models.deletion
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0011_tenant"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FormSubmission",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField()),
+                (
+                    "payload",
+                    models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="submissions",
+                        to="jsonformapp.form",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SubmissionValue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("value", models.CharField(max_length=255)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="jsonformapp.form",
+                    ),
+                ),
+                (
+                    "submission",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="values",
+                        to="jsonformapp.formsubmission",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="formsubmission",
+            index=models.Index(
+                fields=["form", "id"], name="jsonformapp_form_id_7c2542_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submissionvalue",
+            index=models.Index(
+                fields=["form", "name", "value", "submission"],
+                name="jsonformapp_form_id_0dc43c_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0012_form_submissions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProvisionedTable",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("table_name", models.CharField(max_length=64, unique=True)),
+                ("form_version", models.PositiveIntegerField()),
+                ("version", models.PositiveIntegerField(default=1)),
+                ("columns", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "form",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="provisioned_tables",
+                        to="jsonformapp.form",
+                    ),
+                ),
+            ],
+        ),
+    ]
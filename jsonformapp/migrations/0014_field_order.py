@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0013_provisioned_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="field",
+            name="field_order",
+            field=models.IntegerField(
+                default=0, help_text="Field order within the column"
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0015_submission_dispatch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("topic", models.CharField(max_length=64)),
+                ("key", models.CharField(max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("topic", "key"), name="unique_cache_generation"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:35
+
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0016_cache_generation"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="submissionoutbox",
+            name="field_values",
+            field=models.JSONField(encoder=rest_framework.utils.encoders.JSONEncoder),
+        ),
+    ]
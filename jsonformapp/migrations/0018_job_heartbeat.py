@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0017_outbox_field_values_encoder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0018_job_heartbeat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submissionoutbox",
+            name="tenant",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+    ]
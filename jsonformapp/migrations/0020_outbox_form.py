@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jsonformapp", "0019_outbox_tenant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submissionoutbox",
+            name="form",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="jsonformapp.form",
+            ),
+        ),
+    ]
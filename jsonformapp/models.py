@@ -1,7 +1,11 @@
+import uuid
+
 from django.db import models
 from django.db.models import JSONField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from rest_framework.utils import encoders
 
 
 class Form(models.Model):
@@ -9,6 +13,15 @@ class Form(models.Model):
     form_name = models.CharField(max_length=255)
     is_deleted = models.BooleanField(default=False)
     table_name = models.CharField(max_length=255, default="")
+    version = models.PositiveIntegerField(
+        default=1, editable=False, help_text="Incremented on every form update"
+    )
+    tenant = models.CharField(max_length=64, default="", blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tenant", "is_deleted", "id"]),
+        ]
 
     def __str__(self):
         return f"Form to {self.submit_api_route}"
@@ -59,6 +72,275 @@ class Field(models.Model):
     is_Required = models.BooleanField(default=False)
     max_length = models.IntegerField(null=True, blank=True)
     config = JSONField()
+    field_order = models.IntegerField(
+        default=0, help_text="Field order within the column"
+    )
 
     def __str__(self):
         return f"Field in column {self.column.column_order} of Row {self.column.row.row_name}"
+
+
+class FormSearchToken(models.Model):
+    """
+    Inverted index entry: one row per distinct (form, source, token).
+    Maintained by ``jsonformapp.search.index_form``.
+    """
+
+    form = models.ForeignKey(
+        Form, related_name="search_tokens", on_delete=models.CASCADE
+    )
+    source = models.CharField(max_length=32)
+    token = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["token", "source"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source}:{self.token}"
+
+
+class SubmissionOutbox(models.Model):
+    """
+    Durable queue of buffered DynamicTableRecordView submissions, drained in
+    batches by ``manage.py drain_submissions``.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    ticket = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    table_name = models.CharField(max_length=255)
+    tenant = models.CharField(max_length=64, default="", blank=True, editable=False)
+    # Forwarded to the form's submit_api_route once written.
+    form = models.ForeignKey(
+        Form, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    field_values = JSONField(encoder=encoders.JSONEncoder)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    record_id = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "table_name", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Submission {self.ticket} to {self.table_name} ({self.status})"
+
+
+class TableChange(models.Model):
+    """
+    Append-only change log of writes to the tables listed in
+    ``settings.CHANGE_FEED_TABLES``. The auto-increment id is the sequence
+    number clients pass back as ``since``.
+    """
+
+    OP_INSERT = "insert"
+    OP_UPDATE = "update"
+    OP_DELETE = "delete"
+    OP_CHOICES = [
+        (OP_INSERT, "Insert"),
+        (OP_UPDATE, "Update"),
+        (OP_DELETE, "Delete"),
+    ]
+
+    table_name = models.CharField(max_length=255)
+    record_id = models.CharField(max_length=64, blank=True)
+    op = models.CharField(max_length=8, choices=OP_CHOICES)
+    data = JSONField(null=True, encoder=encoders.JSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["table_name", "id"]),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.op} {self.table_name}:{self.record_id}"
+
+
+class Job(models.Model):
+    """
+    Long-running table operation executed by ``manage.py run_workers``.
+    Results are written to ``result_file``.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=64)
+    tenant = models.CharField(max_length=64, default="", blank=True)
+    params = JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result_file = models.FileField(upload_to="jobs/", blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Touched by the worker while the job runs; see jobs.reclaim_stale_jobs.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} {self.kind} ({self.status})"
+
+
+class FormSubmission(models.Model):
+    """
+    Submission to a form whose ``table_name`` has no backing model, stored
+    as a JSON document. Fields flagged ``"indexed": true`` in their config
+    are copied to SubmissionValue rows for lookups.
+    """
+
+    form = models.ForeignKey(Form, related_name="submissions", on_delete=models.CASCADE)
+    version = models.PositiveIntegerField()
+    payload = JSONField(encoder=encoders.JSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["form", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Submission #{self.id} to form {self.form_id}"
+
+
+class SubmissionValue(models.Model):
+    """One indexed field value of a FormSubmission."""
+
+    submission = models.ForeignKey(
+        FormSubmission, related_name="values", on_delete=models.CASCADE
+    )
+    form = models.ForeignKey(Form, related_name="+", on_delete=models.CASCADE)
+    name = models.CharField(max_length=255)
+    value = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["form", "name", "value", "submission"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class ProvisionedTable(models.Model):
+    """
+    Physical table generated from a form by ``jsonformapp.provisioning``.
+    ``columns`` is the column spec last applied to the database.
+    """
+
+    table_name = models.CharField(max_length=64, unique=True)
+    form = models.ForeignKey(
+        Form, related_name="provisioned_tables", on_delete=models.PROTECT
+    )
+    form_version = models.PositiveIntegerField()
+    version = models.PositiveIntegerField(default=1)
+    columns = JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.table_name} (form {self.form_id} v{self.form_version})"
+
+
+class Delivery(models.Model):
+    """
+    Submission waiting to be forwarded to its form's ``submit_api_route`` by
+    ``manage.py dispatch_submissions``.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_DELIVERED = "delivered"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_DELIVERED, "Delivered"),
+    ]
+
+    form = models.ForeignKey(Form, related_name="deliveries", on_delete=models.CASCADE)
+    route = models.URLField()
+    payload = JSONField(encoder=encoders.JSONEncoder)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Delivery #{self.id} to {self.route} ({self.status})"
+
+
+class DeliveryDeadLetter(models.Model):
+    """Delivery that ran out of attempts or was rejected by the route."""
+
+    form = models.ForeignKey(Form, related_name="+", on_delete=models.CASCADE)
+    route = models.URLField()
+    payload = JSONField(encoder=encoders.JSONEncoder)
+    attempts = models.PositiveIntegerField()
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField()
+    failed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Dead delivery to {self.route}: {self.error[:50]}"
+
+
+class CacheGeneration(models.Model):
+    """
+    Invalidation bus entry (see jsonformapp.bus): one row per invalidated
+    (topic, key), re-inserted on every invalidation so that the id is a
+    global generation workers poll past.
+    """
+
+    topic = models.CharField(max_length=64)
+    key = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["topic", "key"], name="unique_cache_generation"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.topic}:{self.key}@{self.id}"
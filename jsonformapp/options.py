@@ -0,0 +1,88 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import FieldDoesNotExist
+
+from .caching import table_generation
+from .tables import resolve_model
+from .tenancy import DEFAULT_TENANT, table_allowed, tenant_cache, tenant_key
+
+MAX_LIMIT = 200
+
+
+class OptionsError(ValueError):
+    pass
+
+
+def option_field(table_name, field_name, tenant=DEFAULT_TENANT):
+    """Resolve an allow-listed (table, field) pair from OPTION_SOURCES."""
+    allowed = getattr(settings, "OPTION_SOURCES", {}).get(table_name, [])
+    if field_name not in allowed or not table_allowed(tenant, table_name):
+        raise OptionsError(f"No options available for '{table_name}.{field_name}'.")
+    try:
+        model = resolve_model(table_name)
+        return model, model._meta.get_field(field_name)
+    except (LookupError, ValueError, FieldDoesNotExist):
+        raise OptionsError(f"No options available for '{table_name}.{field_name}'.")
+
+
+def _choice_options(field, prefix, limit):
+    prefix = prefix.lower()
+    options = [
+        {"value": value, "label": str(label)}
+        for value, label in field.flatchoices
+        if not prefix
+        or str(value).lower().startswith(prefix)
+        or str(label).lower().startswith(prefix)
+    ]
+    return options[:limit]
+
+
+def _distinct_options(model, field, prefix, limit):
+    # istartswith compiles to LIKE 'prefix%' which can use the column index;
+    # LIMIT keeps each keystroke to a short index range scan.
+    queryset = model._default_manager.exclude(**{f"{field.name}__isnull": True})
+    if prefix:
+        queryset = queryset.filter(**{f"{field.name}__istartswith": prefix})
+    values = (
+        queryset.order_by(field.name)
+        .values_list(field.name, flat=True)
+        .distinct()[:limit]
+    )
+    return [{"value": value, "label": str(value)} for value in values]
+
+
+def get_options(table_name, field_name, prefix="", limit=50, tenant=DEFAULT_TENANT):
+    """
+    Return ``(etag, payload)`` for an option set. Model ``choices`` are
+    served straight from the field definition; other fields are looked up
+    as distinct values. Results are cached per table write generation, so
+    any write to the source table invalidates them.
+    """
+    model, field = option_field(table_name, field_name, tenant)
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    generation = "choices" if field.choices else table_generation(table_name)
+    digest = hashlib.sha1(prefix.lower().encode()).hexdigest()[:16]
+    key = tenant_key(
+        tenant,
+        f"jsonformapp:options:{table_name}:{field_name}:{generation}:{limit}:{digest}",
+    )
+
+    cache = tenant_cache(tenant)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    if field.choices:
+        options = _choice_options(field, prefix, limit)
+    else:
+        options = _distinct_options(model, field, prefix, limit)
+
+    payload = {"table_name": table_name, "field": field_name, "options": options}
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+    etag = '"%s"' % hashlib.sha1(body.encode()).hexdigest()
+    cache.set(key, (etag, payload), getattr(settings, "OPTIONS_CACHE_TTL", 300))
+    return etag, payload
@@ -0,0 +1,185 @@
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .caching import bump_table_generation
+from .changefeed import record_bulk_insert
+from .dispatch import forward_submission
+from .models import Form, SubmissionOutbox
+from .queries import TRUE_VALUES
+from .tables import resolve_model
+from .tenancy import DEFAULT_TENANT
+
+DEFAULTS = {
+    # Tables whose submissions are always buffered, even without "buffered".
+    "TABLES": [],
+    "BATCH_SIZE": 500,
+    "POLL_INTERVAL": 1.0,
+    # Maximum rows per second written to a table, e.g. {"product_product": 200}.
+    "RATE_LIMITS": {},
+    "DEFAULT_RATE_LIMIT": None,
+}
+
+
+def queue_settings():
+    return {**DEFAULTS, **getattr(settings, "SUBMISSION_QUEUE", {})}
+
+
+def is_buffered(table_name, requested):
+    if isinstance(requested, str):
+        # Form posts and query strings send booleans as text.
+        requested = requested.strip().lower() in TRUE_VALUES
+    return bool(requested) or table_name in queue_settings()["TABLES"]
+
+
+def enqueue(table_name, field_values, tenant=DEFAULT_TENANT, form=None):
+    return SubmissionOutbox.objects.create(
+        table_name=table_name, field_values=field_values, tenant=tenant, form=form
+    )
+
+
+class RateLimiter:
+    """
+    Token bucket per table. ``take`` returns how many rows may be written
+    right now, up to ``wanted``; tables without a limit are unrestricted.
+    """
+
+    def __init__(self, limits, default=None, clock=time.monotonic):
+        self.limits = limits
+        self.default = default
+        self.clock = clock
+        self.buckets = {}
+
+    def take(self, table_name, wanted):
+        rate = self.limits.get(table_name, self.default)
+        if not rate:
+            return wanted
+
+        # A bucket holds at least one token, so rates below one row per
+        # second still grant a row once enough time has passed.
+        capacity = max(rate, 1)
+        now = self.clock()
+        tokens, last = self.buckets.get(table_name, (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * rate)
+        granted = min(wanted, int(tokens))
+        self.buckets[table_name] = (tokens - granted, now)
+        return granted
+
+
+def _fail(entry, error):
+    entry.status = SubmissionOutbox.STATUS_FAILED
+    entry.error = " ".join(getattr(error, "messages", [str(error)]))
+
+
+def _write_rows(pending):
+    for entry, obj in pending:
+        try:
+            with transaction.atomic():
+                obj.pk = None
+                obj.save(force_insert=True)
+            entry.status = SubmissionOutbox.STATUS_DONE
+            entry.record_id = obj.pk
+        except Exception as e:
+            _fail(entry, e)
+
+
+def _write_batch(model, entries):
+    pending = []
+    for entry in entries:
+        try:
+            pending.append((entry, model(**entry.field_values)))
+        except Exception as e:
+            _fail(entry, e)
+    if not pending:
+        return
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # bulk_create would leave the primary keys (record_id) unset.
+        _write_rows(pending)
+        return
+    objs = [obj for _, obj in pending]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objs)
+            record_bulk_insert(model._meta.db_table, objs)
+    except Exception:
+        # Isolate the offending rows instead of failing the whole batch.
+        _write_rows(pending)
+        return
+    for entry, obj in pending:
+        entry.status = SubmissionOutbox.STATUS_DONE
+        entry.record_id = obj.pk
+
+
+def _forward(table_name, entries):
+    """Queue the written entries for their form's route, in entry order."""
+    written = [
+        entry
+        for entry in entries
+        if entry.status == SubmissionOutbox.STATUS_DONE and entry.form_id
+    ]
+    forms = Form.objects.in_bulk({entry.form_id for entry in written})
+    for entry in written:
+        form = forms.get(entry.form_id)
+        if form is not None:
+            forward_submission(
+                form,
+                table_name,
+                entry.field_values,
+                ticket=str(entry.ticket),
+                record_id=entry.record_id,
+            )
+
+
+def drain_table(table_name, limit):
+    """Write up to ``limit`` pending submissions of one table. Returns count."""
+    with transaction.atomic():
+        entries = list(
+            SubmissionOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=SubmissionOutbox.STATUS_PENDING, table_name=table_name)
+            .order_by("id")[:limit]
+        )
+        if not entries:
+            return 0
+
+        try:
+            model = resolve_model(table_name)
+        except (LookupError, ValueError):
+            for entry in entries:
+                entry.status = SubmissionOutbox.STATUS_FAILED
+                entry.error = "Invalid table name."
+        else:
+            _write_batch(model, entries)
+            # bulk_create sends no post_save, so invalidate caches here.
+            bump_table_generation(table_name)
+            _forward(table_name, entries)
+
+        processed_at = timezone.now()
+        for entry in entries:
+            entry.processed_at = processed_at
+        SubmissionOutbox.objects.bulk_update(
+            entries, ["status", "record_id", "error", "processed_at"]
+        )
+    return len(entries)
+
+
+def has_pending():
+    return SubmissionOutbox.objects.filter(
+        status=SubmissionOutbox.STATUS_PENDING
+    ).exists()
+
+
+def drain_once(limiter, batch_size):
+    """One pass over every table with pending submissions."""
+    tables = (
+        SubmissionOutbox.objects.filter(status=SubmissionOutbox.STATUS_PENDING)
+        .values_list("table_name", flat=True)
+        .distinct()
+    )
+    written = 0
+    for table_name in list(tables):
+        allowed = limiter.take(table_name, batch_size)
+        if allowed:
+            written += drain_table(table_name, allowed)
+    return written
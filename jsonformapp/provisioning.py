@@ -0,0 +1,352 @@
+"""
+Provision physical tables from form definitions.
+
+Each field of a form becomes a typed column named after its
+``db_column_name``: ``data_type`` picks the column type, ``max_length`` the
+VARCHAR length, ``is_Required`` NOT NULL, and ``"indexed": true`` in the
+config adds an index. The applied column spec is stored on
+ProvisionedTable; re-provisioning diffs the form against it and applies
+only the differences. On MySQL they are sent as a single ALTER TABLE.
+
+Models for provisioned tables are built in an isolated app registry, so
+they never show up in migrations or the project's app registry.
+"""
+
+import re
+
+from django.apps.registry import Apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, models
+from django.db.backends.utils import names_digest, truncate_name
+
+from . import bus
+from .caching import forget_rows
+from .models import Field, ProvisionedTable
+from .schema import EXCLUDED_PREFIXES, clear_schema_cache, table_names
+
+IDENTIFIER = re.compile(r"^[a-z][a-z0-9_]{0,63}$")
+RESERVED_COLUMNS = {"id"}
+DEFAULT_MAX_LENGTH = 255
+MAX_VARCHAR_LENGTH = 1024
+STATE_CACHE_KEY = "jsonformapp:provisioned:{}"
+
+# data_type (lower-cased) -> Django field class. Anything else is stored as
+# a VARCHAR.
+DATA_TYPES = {
+    "string": "CharField",
+    "char": "CharField",
+    "text": "TextField",
+    "textarea": "TextField",
+    "integer": "BigIntegerField",
+    "int": "BigIntegerField",
+    "number": "DecimalField",
+    "decimal": "DecimalField",
+    "float": "FloatField",
+    "boolean": "BooleanField",
+    "bool": "BooleanField",
+    "checkbox": "BooleanField",
+    "date": "DateField",
+    "datetime": "DateTimeField",
+    "time": "TimeField",
+    "email": "EmailField",
+    "url": "URLField",
+    "json": "JSONField",
+}
+FIELD_CLASSES = {
+    "CharField": models.CharField,
+    "TextField": models.TextField,
+    "BigIntegerField": models.BigIntegerField,
+    "DecimalField": models.DecimalField,
+    "FloatField": models.FloatField,
+    "BooleanField": models.BooleanField,
+    "DateField": models.DateField,
+    "DateTimeField": models.DateTimeField,
+    "TimeField": models.TimeField,
+    "EmailField": models.EmailField,
+    "URLField": models.URLField,
+    "JSONField": models.JSONField,
+}
+LENGTH_TYPES = {"CharField", "EmailField", "URLField"}
+
+
+class ProvisioningError(ValueError):
+    pass
+
+
+def check_identifier(name, kind):
+    if not IDENTIFIER.match(name or ""):
+        raise ProvisioningError(
+            f"Invalid {kind} name '{name}': use lower-case letters, digits "
+            "and underscores, starting with a letter."
+        )
+    return name
+
+
+def column_spec(data_type, max_length, is_required, config):
+    """Column spec for one form field, as stored on ProvisionedTable."""
+    config = config if isinstance(config, dict) else {}
+    field_type = DATA_TYPES.get((data_type or "").strip().lower(), "CharField")
+    spec = {"type": field_type, "null": not is_required}
+    if field_type in LENGTH_TYPES:
+        length = max_length or DEFAULT_MAX_LENGTH
+        if length > MAX_VARCHAR_LENGTH:
+            spec["type"] = "TextField"
+        else:
+            spec["max_length"] = length
+    elif field_type == "DecimalField":
+        spec["max_digits"] = 20
+        spec["decimal_places"] = 6
+    spec["index"] = bool(config.get("indexed")) and spec["type"] not in (
+        "TextField",
+        "JSONField",
+    )
+    return spec
+
+
+def form_columns(form):
+    """The column specs the form's fields call for, keyed by column name."""
+    columns = {}
+    for name, data_type, max_length, is_required, config in Field.objects.filter(
+        column__row__section__form=form
+    ).values_list("db_column_name", "data_type", "max_length", "is_Required", "config"):
+        check_identifier(name, "column")
+        if name in RESERVED_COLUMNS:
+            raise ProvisioningError(f"Column name '{name}' is reserved.")
+        if name in columns:
+            raise ProvisioningError(f"Duplicate column '{name}'.")
+        columns[name] = column_spec(data_type, max_length, is_required, config)
+    if not columns:
+        raise ProvisioningError("The form has no fields to provision.")
+    return columns
+
+
+def index_name(table_name, column):
+    name = f"{table_name}_{column}_idx"
+    max_length = connection.ops.max_name_length() or 64
+    if len(name) > max_length:
+        name = truncate_name(name, max_length - 9) + names_digest(
+            table_name, column, length=8
+        )
+    return name
+
+
+def _index(table_name, name):
+    return models.Index(fields=[name], name=index_name(table_name, name))
+
+
+def build_field(spec):
+    options = {"null": spec["null"]}
+    if spec["null"] and spec["type"] in LENGTH_TYPES | {"TextField"}:
+        options["blank"] = True
+    for key in ("max_length", "max_digits", "decimal_places"):
+        if key in spec:
+            options[key] = spec[key]
+    return FIELD_CLASSES[spec["type"]](**options)
+
+
+def build_model(table_name, columns):
+    """An unmanaged-registry model class for a provisioned table."""
+    meta = type(
+        "Meta",
+        (),
+        {
+            "app_label": "provisioned",
+            "db_table": table_name,
+            "apps": Apps(),
+            "indexes": [
+                _index(table_name, name)
+                for name, spec in columns.items()
+                if spec["index"]
+            ],
+        },
+    )
+    attrs = {
+        "__module__": __name__,
+        "Meta": meta,
+        "id": models.BigAutoField(primary_key=True),
+    }
+    for name, spec in columns.items():
+        attrs[name] = build_field(spec)
+    class_name = "".join(part.title() for part in table_name.split("_"))
+    return type(class_name, (models.Model,), attrs)
+
+
+def plan_changes(old, new, drop_columns=False):
+    """
+    Minimal operations turning the ``old`` column specs into ``new``:
+    ``(op, column)`` with op one of add, alter, drop, add_index, drop_index.
+    Columns missing from ``new`` are kept (as nullable) unless
+    ``drop_columns`` is set.
+    """
+    operations = []
+    target = dict(new)
+    for name, spec in old.items():
+        if name in new:
+            continue
+        if drop_columns:
+            # Some backends refuse to drop a column that is still indexed.
+            if spec["index"]:
+                operations.insert(0, ("drop_index", name))
+            operations.append(("drop", name))
+        else:
+            target[name] = dict(spec, null=True)
+
+    for name, spec in target.items():
+        before = old.get(name)
+        if before is None:
+            operations.append(("add", name))
+            if spec["index"]:
+                operations.append(("add_index", name))
+            continue
+        column_before = {k: v for k, v in before.items() if k != "index"}
+        column_after = {k: v for k, v in spec.items() if k != "index"}
+        if before["index"] and not spec["index"]:
+            operations.insert(0, ("drop_index", name))
+        if column_before != column_after:
+            operations.append(("alter", name))
+        if spec["index"] and not before["index"]:
+            operations.append(("add_index", name))
+    return operations, target
+
+
+def _apply_batched(editor, table_name, old, target, operations):
+    """MySQL: every change in one ALTER TABLE statement."""
+    qn = editor.quote_name
+    model = build_model(table_name, target)
+    clauses, params = [], []
+    for op, name in operations:
+        if op in ("add", "alter"):
+            field = model._meta.get_field(name)
+            definition, field_params = editor.column_sql(model, field)
+            verb = "ADD COLUMN" if op == "add" else "MODIFY"
+            clauses.append(f"{verb} {qn(name)} {definition}")
+            params.extend(field_params or [])
+        elif op == "drop":
+            clauses.append(f"DROP COLUMN {qn(name)}")
+        elif op == "add_index":
+            clauses.append(f"ADD INDEX {qn(index_name(table_name, name))} ({qn(name)})")
+        elif op == "drop_index":
+            clauses.append(f"DROP INDEX {qn(index_name(table_name, name))}")
+    editor.execute(f"ALTER TABLE {qn(table_name)} {', '.join(clauses)}", params)
+
+
+def _apply_stepwise(editor, table_name, old, target, operations):
+    """Other backends: one schema editor call per change."""
+    current = dict(old)
+    for op, name in operations:
+        model = build_model(table_name, current)
+        if op == "add":
+            current[name] = dict(target[name], index=False)
+            field = build_model(table_name, current)._meta.get_field(name)
+            editor.add_field(model, field)
+        elif op == "alter":
+            old_field = model._meta.get_field(name)
+            current[name] = dict(target[name], index=current[name]["index"])
+            new_field = build_model(table_name, current)._meta.get_field(name)
+            editor.alter_field(model, old_field, new_field, strict=True)
+        elif op == "drop":
+            editor.remove_field(model, model._meta.get_field(name))
+            del current[name]
+        elif op == "add_index":
+            editor.add_index(model, _index(table_name, name))
+            current[name] = dict(current[name], index=True)
+        elif op == "drop_index":
+            editor.remove_index(model, _index(table_name, name))
+            current[name] = dict(current[name], index=False)
+
+
+def provision_form(form, dry_run=False, drop_columns=False):
+    """
+    Create or update ``form.table_name`` to match the form. Returns
+    ``(operations, statements)``; with ``dry_run`` nothing is executed and
+    the SQL statements are only collected.
+    """
+    table_name = check_identifier(form.table_name, "table")
+    if any(table_name.startswith(prefix) for prefix in EXCLUDED_PREFIXES):
+        raise ProvisioningError(f"Table name '{table_name}' is reserved.")
+
+    record = ProvisionedTable.objects.filter(table_name=table_name).first()
+    if record is None and table_name in table_names():
+        raise ProvisioningError(
+            f"Table '{table_name}' already exists and was not provisioned."
+        )
+    if record is not None and record.form_id != form.id:
+        raise ProvisioningError(
+            f"Table '{table_name}' is provisioned for form {record.form_id}."
+        )
+
+    new = form_columns(form)
+    created = record is None
+    if created:
+        target, operations = new, [("create", table_name)]
+    else:
+        operations, target = plan_changes(record.columns, new, drop_columns)
+
+    try:
+        with connection.schema_editor(collect_sql=dry_run) as editor:
+            if created:
+                editor.create_model(build_model(table_name, target))
+            elif not operations:
+                pass
+            elif connection.vendor == "mysql":
+                _apply_batched(editor, table_name, record.columns, target, operations)
+            else:
+                _apply_stepwise(editor, table_name, record.columns, target, operations)
+    except DatabaseError as e:
+        raise ProvisioningError(f"Could not provision '{table_name}': {e}")
+    # Deferred statements (indexes) are only collected on exiting the editor.
+    statements = list(editor.collected_sql) if dry_run else []
+
+    if dry_run or not operations:
+        return operations, statements
+
+    if created:
+        record = ProvisionedTable(table_name=table_name, form=form)
+    else:
+        record.version += 1
+    record.form_version = form.version
+    record.columns = target
+    record.save()
+    bus.publish("table", table_name)
+    return operations, statements
+
+
+_models = {}
+
+
+def forget_table(table_name):
+    """Bus handler: the table's structure changed in some worker."""
+    _models.pop(table_name, None)
+    cache.delete(STATE_CACHE_KEY.format(table_name))
+    clear_schema_cache()
+    forget_rows(table_name)
+
+
+bus.subscribe("table", forget_table)
+
+
+def provisioned_model(table_name):
+    """
+    Model class for a provisioned table, or None. The class is rebuilt only
+    when the table's provisioned version changes.
+    """
+    key = STATE_CACHE_KEY.format(table_name)
+    state = cache.get(key)
+    if state is None:
+        record = (
+            ProvisionedTable.objects.filter(table_name=table_name)
+            .values_list("version", "columns")
+            .first()
+        )
+        state = list(record) if record else []
+        cache.set(key, state, getattr(settings, "FORM_CACHE_TTL", 300))
+    if not state:
+        return None
+
+    version, columns = state
+    cached = _models.get(table_name)
+    if cached is None or cached[0] != version:
+        cached = (version, build_model(table_name, columns))
+        _models[table_name] = cached
+    return cached[1]
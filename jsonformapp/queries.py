@@ -0,0 +1,205 @@
+"""
+SQL for the raw table views. Table and column names are checked against the
+schema catalog (schema.py) and quoted with ``connection.ops.quote_name``;
+values are always passed as parameters. The SQL text is memoised per
+(table, projection, filter shape), so repeated requests send byte-identical
+statements and the database can reuse their plans.
+"""
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .caching import RECORD_KEY
+from .schema import NUMERIC_TYPES, is_user_table, table_columns
+
+OPERATORS = {
+    "eq": "=",
+    "ne": "<>",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+}
+TRUE_VALUES = ("1", "true", "yes")
+MAX_ROWS = 10000
+MAX_RECORD_IDS = 500
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_filters(params):
+    """``f.<column>[__<op>]=<value>`` query parameters as sorted triples."""
+    filters = []
+    for key, value in params.items():
+        if not key.startswith("f."):
+            continue
+        column, _, op = key[2:].partition("__")
+        filters.append((column, op or "eq", value))
+    return sorted(filters)
+
+
+def check_table(table_name):
+    """The catalog's columns for ``table_name``, or QueryError."""
+    if not is_user_table(table_name):
+        raise QueryError(f"Table '{table_name}' is not available.")
+    columns = table_columns(table_name)
+    if columns is None:
+        raise QueryError(f"Table '{table_name}' does not exist.")
+    return columns
+
+
+def check_column(columns, name):
+    if name not in columns:
+        raise QueryError(f"Unknown column '{name}'.")
+    return name
+
+
+@lru_cache(maxsize=1024)
+def describe_sql(table_name):
+    return f"DESCRIBE {connection.ops.quote_name(table_name)}"
+
+
+def where_sql(shape):
+    """
+    The ANDed WHERE conditions for a ``compile_filters`` shape: a tuple of
+    ``(column, op, arity)``. Only identifiers and the number of placeholders
+    go into the text, never values.
+    """
+    qn = connection.ops.quote_name
+    where = []
+    for name, op, arity in shape:
+        if op == "in":
+            where.append(f"{qn(name)} IN ({', '.join(['%s'] * arity)})")
+        elif op == "isnull":
+            where.append(f"{qn(name)} IS NULL")
+        elif op == "notnull":
+            where.append(f"{qn(name)} IS NOT NULL")
+        else:
+            where.append(f"{qn(name)} {OPERATORS[op]} %s")
+    return " AND ".join(where)
+
+
+@lru_cache(maxsize=1024)
+def select_sql(table_name, projection, shape, limited):
+    qn = connection.ops.quote_name
+    select = ", ".join(qn(name) for name in projection) if projection else "*"
+    sql = f"SELECT {select} FROM {qn(table_name)}"
+    if shape:
+        sql += f" WHERE {where_sql(shape)}"
+    if limited:
+        sql += " LIMIT %s"
+    return sql
+
+
+def coerce(columns, name, value):
+    """A filter value for ``name``; booleans are parsed from their text forms."""
+    if columns[name]["type"] == "BooleanField":
+        return str(value).lower() in TRUE_VALUES
+    return value
+
+
+def compile_filters(columns, filters):
+    """
+    Check ``(column, op, value)`` filters against ``columns`` and return
+    ``(shape, params)``, where ``shape`` is the input of ``where_sql``.
+    """
+    shape, params = [], []
+    for name, op, value in filters:
+        check_column(columns, name)
+        if op == "in":
+            if not isinstance(value, (list, tuple)):
+                value = str(value).split(",")
+            values = [coerce(columns, name, v) for v in value]
+            shape.append((name, op, len(values)))
+            params.extend(values)
+        elif op == "isnull":
+            is_null = str(value).lower() in TRUE_VALUES
+            shape.append((name, "isnull" if is_null else "notnull", 0))
+        elif op in OPERATORS:
+            shape.append((name, op, 1))
+            params.append(coerce(columns, name, value))
+        else:
+            raise QueryError(f"Unknown filter operator '{op}'.")
+    return tuple(shape), params
+
+
+def compile_select(table_name, fields=None, filters=(), limit=None):
+    """Check and compile a select to ``(sql, params)``."""
+    columns = check_table(table_name)
+    projection = tuple(check_column(columns, name) for name in fields or ())
+    shape, params = compile_filters(columns, filters)
+    sql = select_sql(table_name, projection, shape, limit is not None)
+    if limit is not None:
+        params.append(int(limit))
+    return sql, params
+
+
+def describe_table(table_name):
+    """``DESCRIBE`` rows for a catalogued user table."""
+    check_table(table_name)
+    with connection.cursor() as cursor:
+        cursor.execute(describe_sql(table_name))
+        return cursor.fetchall()
+
+
+def fetch_rows(table_name, fields=None, filters=(), limit=None):
+    sql, params = compile_select(table_name, fields, filters, limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        names = [col[0] for col in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def fetch_records(table_name, ids, fields=None):
+    """
+    Rows of ``table_name`` by primary key, as ``(rows, missing_ids)`` in
+    request order, read with a single ``WHERE pk IN (...)`` query. With
+    RECORD_CACHE_TTL set, whole rows are cached per record and ``fields`` is
+    applied on the way out.
+    """
+    columns = check_table(table_name)
+    pk = next((name for name, info in columns.items() if info["pk"]), None)
+    if pk is None:
+        raise QueryError(f"Table '{table_name}' has no primary key.")
+    fields = list(dict.fromkeys([pk, *fields])) if fields else None
+    for name in fields or ():
+        check_column(columns, name)
+    ids = [str(record_id) for record_id in ids]
+    if columns[pk]["type"] in NUMERIC_TYPES:
+        # str.isdigit() would also accept digits such as "²" that int() rejects.
+        if not all(re.fullmatch(r"[0-9]+", i) for i in ids):
+            raise QueryError("Ids must be integers.")
+        ids = [str(int(i)) for i in ids]
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise QueryError("At least one id is required.")
+    if len(ids) > MAX_RECORD_IDS:
+        raise QueryError(f"At most {MAX_RECORD_IDS} ids per request.")
+
+    ttl = getattr(settings, "RECORD_CACHE_TTL", 0)
+    found = {}
+    if ttl:
+        keys = {RECORD_KEY.format(table_name, i): i for i in ids}
+        found = {keys[key]: row for key, row in cache.get_many(keys).items()}
+
+    missing = [i for i in ids if i not in found]
+    if missing:
+        projection = None if ttl else fields
+        rows = fetch_rows(table_name, projection, [(pk, "in", missing)], len(missing))
+        fetched = {str(row[pk]): row for row in rows}
+        if ttl:
+            cache.set_many(
+                {RECORD_KEY.format(table_name, i): row for i, row in fetched.items()},
+                ttl,
+            )
+        found.update(fetched)
+
+    if fields:
+        found = {i: {name: row[name] for name in fields} for i, row in found.items()}
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
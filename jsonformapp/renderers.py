@@ -0,0 +1,69 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer.
+
+    Compact responses are encoded with orjson when it is installed, which
+    handles dates, UUIDs and plain containers natively. Anything orjson does
+    not know about (Decimal, datetimes, lazy strings, querysets) is handed to
+    DRF's encoder so the output stays identical to the stock renderer.
+    Indented or non-compact output (browsable API, ``?indent=``) falls back
+    to the stdlib path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if orjson is None or indent is not None or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # Integers wider than 64 bits and other values orjson refuses.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # We always fully escape \u2028 and \u2029, like JSONRenderer does.
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views negotiate ``Accept: text/event-stream``; such views return a
+    StreamingHttpResponse themselves, so this only renders error payloads.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"event: error\ndata: " + FastJSONRenderer().render(data) + b"\n\n"
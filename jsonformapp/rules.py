@@ -0,0 +1,309 @@
+"""
+Declarative field rules stored in ``Field.config``::
+
+    {
+        "visible_if": {"==": [{"var": "currency"}, "USD"]},
+        "required_if": {">": [{"var": "platform_fee"}, 100]},
+        "compute": {"+": [{"var": "platform_fee"}, {"var": "admin_fee"}]}
+    }
+
+Expressions are JSON-logic style ``{operator: [arguments]}`` objects where
+``{"var": "<db_column_name>"}`` reads another field's value. A form's rules
+are compiled once per ``Form.version`` into a dependency graph, so that a
+change to one field only re-evaluates the fields that depend on it.
+"""
+
+from collections import defaultdict, deque
+from decimal import Decimal, InvalidOperation
+
+from .caching import FormVersionCache
+from .models import Field
+
+RULE_KEYS = ("visible_if", "required_if", "compute")
+EMPTY_VALUES = (None, "", [], {})
+CACHE_SIZE = 256
+
+
+class RuleError(ValueError):
+    pass
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return Decimal(int(value))
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise RuleError(f"'{value}' is not a number.")
+
+
+def _equal(a, b):
+    if a == b:
+        return True
+    try:
+        return _number(a) == _number(b)
+    except RuleError:
+        return False
+
+
+def _compare(op):
+    def compare(a, b):
+        if a in EMPTY_VALUES or b in EMPTY_VALUES:
+            return False
+        return op(_number(a), _number(b))
+
+    return compare
+
+
+def _divide(a, b):
+    b = _number(b)
+    return _number(a) / b if b else None
+
+
+def _arithmetic(op):
+    def apply(*args):
+        if any(arg in EMPTY_VALUES for arg in args):
+            return None
+        result = _number(args[0])
+        for arg in args[1:]:
+            result = op(result, _number(arg))
+        return result
+
+    return apply
+
+
+OPERATORS = {
+    "==": lambda a, b: _equal(a, b),
+    "!=": lambda a, b: not _equal(a, b),
+    "<": _compare(lambda a, b: a < b),
+    "<=": _compare(lambda a, b: a <= b),
+    ">": _compare(lambda a, b: a > b),
+    ">=": _compare(lambda a, b: a >= b),
+    "in": lambda a, b: a in (b or []),
+    "not": lambda a: not a,
+    "empty": lambda a: a in EMPTY_VALUES,
+    "+": _arithmetic(lambda a, b: a + b),
+    "-": _arithmetic(lambda a, b: a - b),
+    "*": _arithmetic(lambda a, b: a * b),
+    "/": lambda a, b: None if a in EMPTY_VALUES or b in EMPTY_VALUES else _divide(a, b),
+}
+# (fewest, most) arguments; None is unbounded.
+ARITY = {
+    "==": (2, 2),
+    "!=": (2, 2),
+    "<": (2, 2),
+    "<=": (2, 2),
+    ">": (2, 2),
+    ">=": (2, 2),
+    "in": (2, 2),
+    "not": (1, 1),
+    "empty": (1, 1),
+    "+": (1, None),
+    "-": (1, None),
+    "*": (1, None),
+    "/": (2, 2),
+}
+
+
+def compile_expression(expression):
+    """
+    Compile an expression into ``(function(values) -> result, variables)``.
+    ``and``, ``or`` and ``if`` short-circuit; everything else is strict.
+    """
+    if not isinstance(expression, dict):
+        if isinstance(expression, list):
+            items = [compile_expression(item) for item in expression]
+            variables = set().union(*(v for _, v in items)) if items else set()
+            return (lambda values: [fn(values) for fn, _ in items]), variables
+        return (lambda values: expression), set()
+
+    if len(expression) != 1:
+        raise RuleError(f"Expression must have exactly one operator: {expression}")
+    op, args = next(iter(expression.items()))
+
+    if op == "var":
+        name = args[0] if isinstance(args, list) else args
+        if not isinstance(name, str):
+            raise RuleError(f"'var' needs a field name: {expression}")
+        return (lambda values: values.get(name)), {name}
+
+    if not isinstance(args, list):
+        args = [args]
+    compiled = [compile_expression(arg) for arg in args]
+    functions = [fn for fn, _ in compiled]
+    variables = set().union(*(v for _, v in compiled)) if compiled else set()
+
+    if op == "and":
+        return (lambda values: all(fn(values) for fn in functions)), variables
+    if op == "or":
+        return (lambda values: any(fn(values) for fn in functions)), variables
+    if op == "if":
+        if len(functions) != 3:
+            raise RuleError("'if' takes [condition, then, else].")
+        condition, then, otherwise = functions
+        return (
+            lambda values: then(values) if condition(values) else otherwise(values)
+        ), variables
+    if op not in OPERATORS:
+        raise RuleError(f"Unknown operator '{op}'.")
+
+    fewest, most = ARITY[op]
+    if len(functions) < fewest or (most is not None and len(functions) > most):
+        expected = fewest if fewest == most else f"at least {fewest}"
+        raise RuleError(f"'{op}' takes {expected} argument(s): {expression}")
+
+    operator = OPERATORS[op]
+    return (lambda values: operator(*(fn(values) for fn in functions))), variables
+
+
+class FormRules:
+    """Compiled rules of one form version."""
+
+    def __init__(self, fields):
+        # fields: iterable of (db_column_name, is_required, config)
+        self.required = {}
+        self.rules = {}
+        self.dependents = defaultdict(set)
+        dependencies = {}
+
+        for name, is_required, config in fields:
+            if not name:
+                continue
+            self.required[name] = bool(is_required)
+            config = config if isinstance(config, dict) else {}
+            rules, variables = {}, set()
+            for key in RULE_KEYS:
+                if key in config:
+                    try:
+                        rules[key], used = compile_expression(config[key])
+                    except RuleError as e:
+                        raise RuleError(f"{name}.{key}: {e}")
+                    variables |= used
+            if rules:
+                self.rules[name] = rules
+                dependencies[name] = variables
+                for variable in variables:
+                    self.dependents[variable].add(name)
+
+        self.order = self._topological_order(dependencies)
+
+    def _topological_order(self, dependencies):
+        pending = {
+            name: {dep for dep in deps if dep in dependencies and dep != name}
+            for name, deps in dependencies.items()
+        }
+        for name, deps in dependencies.items():
+            if name in deps and "compute" in self.rules[name]:
+                raise RuleError(f"Field '{name}' is computed from itself.")
+
+        ready = deque(sorted(name for name, deps in pending.items() if not deps))
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for dependent in sorted(self.dependents.get(name, ())):
+                deps = pending.get(dependent)
+                if deps and name in deps:
+                    deps.discard(name)
+                    if not deps:
+                        ready.append(dependent)
+        if len(order) != len(pending):
+            cyclic = sorted(set(pending) - set(order))
+            raise RuleError(f"Circular rules between fields: {', '.join(cyclic)}")
+        return order
+
+    def affected_by(self, changed):
+        """Rule-bearing fields that transitively depend on ``changed``."""
+        affected, queue = set(), deque(changed)
+        while queue:
+            for dependent in self.dependents.get(queue.popleft(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        return affected
+
+    def evaluate(self, values, changed=None, state=None):
+        """
+        Evaluate the rules against ``values``. When ``changed`` and the
+        ``state`` returned by a previous call are given, only the fields
+        depending on ``changed`` are re-evaluated.
+        """
+        values = dict(values)
+        if changed is None or state is None:
+            targets = set(self.order)
+            visible, required, computed = {}, {}, {}
+        else:
+            targets = self.affected_by(changed)
+            visible = dict(state.get("visible", {}))
+            required = dict(state.get("required", {}))
+            computed = dict(state.get("computed", {}))
+            for name, value in computed.items():
+                if name not in targets:
+                    values[name] = value
+
+        for name in self.order:
+            if name not in targets:
+                continue
+            rules = self.rules[name]
+            try:
+                if "compute" in rules:
+                    computed[name] = values[name] = rules["compute"](values)
+                if "visible_if" in rules:
+                    visible[name] = bool(rules["visible_if"](values))
+                if "required_if" in rules:
+                    required[name] = self.required.get(name, False) or bool(
+                        rules["required_if"](values)
+                    )
+            except RuleError as e:
+                raise RuleError(f"{name}: {e}")
+            except (TypeError, ArithmeticError) as e:
+                # Operands come from the submission, e.g. "in" on a number or
+                # a product past the Decimal context's exponent range.
+                raise RuleError(f"{name}: cannot evaluate: {e!r}") from e
+
+        for name, is_required in self.required.items():
+            visible.setdefault(name, True)
+            required.setdefault(name, is_required)
+
+        errors = {
+            name: ["This field is required."]
+            for name in self.required
+            if visible[name]
+            and required[name]
+            and name not in computed
+            and values.get(name) in EMPTY_VALUES
+        }
+        return {
+            "values": values,
+            "visible": visible,
+            "required": required,
+            "computed": computed,
+            "errors": errors,
+        }
+
+
+_compiled = FormVersionCache(CACHE_SIZE)
+
+
+def form_rules(form):
+    """Compiled rules for ``form``, cached per (form id, version)."""
+
+    def build():
+        return FormRules(
+            Field.objects.filter(column__row__section__form=form).values_list(
+                "db_column_name", "is_Required", "config"
+            )
+        )
+
+    return _compiled.get_or_build(form, build)
+
+
+def apply_form_rules(form, field_values):
+    """
+    Server-side check of a submission against its form's rules. Returns the
+    field values with computed fields filled in, and the validation errors.
+    """
+    result = form_rules(form).evaluate(field_values)
+    values = dict(field_values)
+    values.update(result["computed"])
+    return values, result["errors"]
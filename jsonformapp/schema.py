@@ -0,0 +1,141 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+
+from .models import ProvisionedTable
+
+# Tables that are never exposed through the table introspection/data views.
+EXCLUDED_PREFIXES = [
+    "django_",
+    "auth_",
+    "admin_",
+    "contenttypes",
+    "sessions",
+    "jsonformapp_",
+]
+
+NUMERIC_TYPES = {
+    "AutoField",
+    "BigAutoField",
+    "SmallAutoField",
+    "IntegerField",
+    "BigIntegerField",
+    "SmallIntegerField",
+    "PositiveIntegerField",
+    "PositiveBigIntegerField",
+    "PositiveSmallIntegerField",
+    "DecimalField",
+    "FloatField",
+}
+
+TABLES_CACHE_KEY = "jsonformapp:schema:tables"
+COLUMNS_CACHE_KEY = "jsonformapp:schema:columns:{}"
+FINGERPRINT_CACHE_KEY = "jsonformapp:schema:fingerprint"
+
+
+def _ttl():
+    return getattr(settings, "SCHEMA_CACHE_TTL", 300)
+
+
+def is_user_table(table_name):
+    return not any(table_name.startswith(prefix) for prefix in EXCLUDED_PREFIXES)
+
+
+def table_names():
+    """All table names in the database, cached for SCHEMA_CACHE_TTL seconds."""
+    names = cache.get(TABLES_CACHE_KEY)
+    if names is None:
+        with connection.cursor() as cursor:
+            names = connection.introspection.table_names(cursor)
+        cache.set(TABLES_CACHE_KEY, names, _ttl())
+    return names
+
+
+def table_columns(table_name):
+    """
+    Introspected columns of ``table_name`` as an ordered mapping of column
+    name to ``{"type", "nullable", "pk", "default"}``, where ``type`` is the
+    Django field class name the column maps to. Returns None for unknown
+    tables, so callers can treat the result as an identifier whitelist.
+    """
+    if table_name not in table_names():
+        return None
+
+    key = COLUMNS_CACHE_KEY.format(table_name)
+    columns = cache.get(key)
+    if columns is None:
+        introspection = connection.introspection
+        with connection.cursor() as cursor:
+            description = introspection.get_table_description(cursor, table_name)
+            pk = introspection.get_primary_key_column(cursor, table_name)
+        columns = {}
+        for info in description:
+            try:
+                field_type = introspection.get_field_type(info.type_code, info)
+            except KeyError:
+                field_type = "TextField"
+            columns[info.name] = {
+                "type": field_type,
+                "nullable": bool(info.null_ok),
+                "pk": info.name == pk,
+                "default": info.default,
+            }
+        cache.set(key, columns, _ttl())
+    return columns
+
+
+def primary_key(table_name):
+    columns = table_columns(table_name) or {}
+    return next((name for name, info in columns.items() if info["pk"]), None)
+
+
+def schema_fingerprint():
+    """
+    ``(digest, last_modified)`` of the database schema: a hash of the applied
+    migrations, the provisioned table versions and the table list, and the
+    time of the latest of those changes. Cached like the rest of the catalog
+    (provisioning clears it), so tables created outside of migrations change
+    it once SCHEMA_CACHE_TTL expires.
+    """
+    fingerprint = cache.get(FINGERPRINT_CACHE_KEY)
+    if fingerprint is None:
+        applied = list(
+            MigrationRecorder(connection)
+            .migration_qs.order_by("app", "name")
+            .values_list("app", "name", "applied")
+        )
+        # An ALTER TABLE from re-provisioning changes neither of the others.
+        provisioned = list(
+            ProvisionedTable.objects.order_by("table_name").values_list(
+                "table_name", "version", "updated_at"
+            )
+        )
+        digest = hashlib.sha1(
+            json.dumps(
+                [
+                    sorted(table_names()),
+                    [[app, name] for app, name, _ in applied],
+                    [[table, version] for table, version, _ in provisioned],
+                ]
+            ).encode()
+        ).hexdigest()
+        last_modified = max(
+            [when for _, _, when in applied] + [when for _, _, when in provisioned],
+            default=None,
+        )
+        fingerprint = (digest, last_modified)
+        cache.set(FINGERPRINT_CACHE_KEY, fingerprint, _ttl())
+    return fingerprint
+
+
+def clear_schema_cache(**kwargs):
+    """Forget the cached catalog; usable as a post_migrate receiver."""
+    names = cache.get(TABLES_CACHE_KEY) or []
+    cache.delete_many(
+        [TABLES_CACHE_KEY, FINGERPRINT_CACHE_KEY]
+        + [COLUMNS_CACHE_KEY.format(name) for name in names]
+    )
@@ -0,0 +1,147 @@
+import re
+
+from django.db import transaction
+
+from .models import Form, Section, Row, Column, Field, FormSearchToken
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MAX_TOKEN_LENGTH = 255
+
+# Searchable sources; a query term may be restricted with ``source:value``.
+SOURCES = (
+    "form_name",
+    "section_name",
+    "row_name",
+    "column_name",
+    "db_column_name",
+    "data_type",
+    "config_key",
+    "config_value",
+)
+
+
+def tokenize(value):
+    """
+    Split a value into lowercase alphanumeric tokens. Single-word values are
+    also kept whole, so ``policy_no`` matches both ``policy_no`` and ``policy``.
+    """
+    if value is None:
+        return set()
+    text = str(value).strip().lower()
+    if not text:
+        return set()
+    tokens = set(TOKEN_RE.findall(text))
+    if not any(char.isspace() for char in text):
+        tokens.add(text)
+    return {token[:MAX_TOKEN_LENGTH] for token in tokens}
+
+
+def _config_tokens(config):
+    if isinstance(config, dict):
+        for key, value in config.items():
+            for token in tokenize(key):
+                yield "config_key", token
+            yield from _config_tokens(value)
+    elif isinstance(config, (list, tuple)):
+        for item in config:
+            yield from _config_tokens(item)
+    else:
+        for token in tokenize(config):
+            yield "config_value", token
+
+
+def form_tokens(form):
+    """Collect the distinct (source, token) pairs for a form tree."""
+    pairs = {("form_name", token) for token in tokenize(form.form_name)}
+
+    section_ids = []
+    for section_id, name in Section.objects.filter(form=form).values_list(
+        "id", "section_name"
+    ):
+        section_ids.append(section_id)
+        pairs.update(("section_name", token) for token in tokenize(name))
+
+    row_ids = []
+    for row_id, name in Row.objects.filter(section_id__in=section_ids).values_list(
+        "id", "row_name"
+    ):
+        row_ids.append(row_id)
+        pairs.update(("row_name", token) for token in tokenize(name))
+
+    column_ids = []
+    for column_id, name in Column.objects.filter(row_id__in=row_ids).values_list(
+        "id", "column_name"
+    ):
+        column_ids.append(column_id)
+        pairs.update(("column_name", token) for token in tokenize(name))
+
+    for db_column_name, data_type, config in Field.objects.filter(
+        column_id__in=column_ids
+    ).values_list("db_column_name", "data_type", "config"):
+        pairs.update(("db_column_name", token) for token in tokenize(db_column_name))
+        pairs.update(("data_type", token) for token in tokenize(data_type))
+        pairs.update(_config_tokens(config))
+
+    return pairs
+
+
+@transaction.atomic
+def index_form(form):
+    """(Re)build the index entries of a single form."""
+    FormSearchToken.objects.filter(form=form).delete()
+    if form.is_deleted:
+        return
+    FormSearchToken.objects.bulk_create(
+        [
+            FormSearchToken(form=form, source=source, token=token)
+            for source, token in form_tokens(form)
+        ],
+        batch_size=1000,
+    )
+
+
+def unindex_form(form_id):
+    FormSearchToken.objects.filter(form_id=form_id).delete()
+
+
+def parse_query(query):
+    """
+    Turn ``"policy db_column_name:start_date"`` into a list of
+    ``(source or None, token, is_prefix)`` terms. A trailing ``*`` makes the
+    term a prefix match.
+    """
+    terms = []
+    for part in query.split():
+        source = None
+        if ":" in part:
+            candidate, _, rest = part.partition(":")
+            if candidate in SOURCES:
+                source, part = candidate, rest
+        is_prefix = part.endswith("*")
+        part = part.rstrip("*").strip().lower()[:MAX_TOKEN_LENGTH]
+        if part:
+            terms.append((source, part, is_prefix))
+    return terms
+
+
+def search_forms(query, limit=50, tenant=""):
+    """
+    Return the tenant's non-deleted forms matching every term of ``query``.
+    Each term becomes an indexed ``form_id IN (...)`` subquery, so the
+    database only ever touches the matching index ranges.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return Form.objects.none()
+
+    forms = Form.objects.filter(tenant=tenant, is_deleted=False)
+    for source, token, is_prefix in terms:
+        matches = FormSearchToken.objects.all()
+        if is_prefix:
+            matches = matches.filter(token__startswith=token)
+        else:
+            matches = matches.filter(token=token)
+        if source:
+            matches = matches.filter(source=source)
+        forms = forms.filter(id__in=matches.values("form_id"))
+    return forms.order_by("id")[:limit]
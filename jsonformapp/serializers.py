@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import F
 from rest_framework import serializers
 from .models import Form, Section, Row, Column, Field
 
@@ -40,6 +42,20 @@ class FormSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class SectionHeaderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Section
+        fields = ["id", "section_name", "is_collapsable", "section_order"]
+
+
+class FormSkeletonSerializer(serializers.ModelSerializer):
+    sections = SectionHeaderSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Form
+        fields = "__all__"
+
+
 class FieldCreateUpdateSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
     column = serializers.PrimaryKeyRelatedField(
@@ -265,36 +281,44 @@ class FormUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         sections_data = validated_data.pop("sections", [])
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        # Update sections
-        existing_ids = {s.id for s in instance.sections.all()}
-        payload_ids = {s.get("id") for s in sections_data if s.get("id")}
-        Section.objects.filter(id__in=(existing_ids - payload_ids)).delete()
-
-        for section_data in sections_data:
-            section_id = section_data.get("id")
-            if section_id:
-                section_instance = Section.objects.filter(
-                    id=section_id, form=instance
-                ).first()
-                if section_instance:
+        # One transaction, with the version bumped last: a reader never sees
+        # the new version before the tree it describes.
+        with transaction.atomic():
+            # Update sections
+            existing_ids = {s.id for s in instance.sections.all()}
+            payload_ids = {s.get("id") for s in sections_data if s.get("id")}
+            Section.objects.filter(id__in=(existing_ids - payload_ids)).delete()
+
+            for section_data in sections_data:
+                section_id = section_data.get("id")
+                if section_id:
+                    section_instance = Section.objects.filter(
+                        id=section_id, form=instance
+                    ).first()
+                    if section_instance:
+                        serializer = SectionCreateUpdateSerializer(
+                            section_instance,
+                            data=section_data,
+                            context={"form": instance},
+                        )
+                        serializer.is_valid(raise_exception=True)
+                        serializer.save()
+                    else:
+                        raise serializers.ValidationError(
+                            f"Section ID {section_id} not found."
+                        )
+                else:
                     serializer = SectionCreateUpdateSerializer(
-                        section_instance, data=section_data, context={"form": instance}
+                        data=section_data, context={"form": instance}
                     )
                     serializer.is_valid(raise_exception=True)
                     serializer.save()
-                else:
-                    raise serializers.ValidationError(
-                        f"Section ID {section_id} not found."
-                    )
-            else:
-                serializer = SectionCreateUpdateSerializer(
-                    data=section_data, context={"form": instance}
-                )
-                serializer.is_valid(raise_exception=True)
-                serializer.save()
+
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            # Incremented in the database so concurrent updates each count.
+            instance.version = F("version") + 1
+            instance.save()
+        instance.refresh_from_db(fields=["version"])
 
         return instance
@@ -0,0 +1,97 @@
+"""
+Generic submission store for forms whose ``table_name`` has no model. The
+payload is kept as a JSON document on FormSubmission; fields whose config
+has ``"indexed": true`` are also written to SubmissionValue so they can be
+filtered on without scanning payloads.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Field, FormSubmission, SubmissionValue
+
+INDEXED_CACHE_KEY = "jsonformapp:submissions:indexed:{}:{}"
+MAX_VALUE_LENGTH = 255
+MAX_PAGE_SIZE = 1000
+
+
+class SubmissionError(ValueError):
+    pass
+
+
+def indexed_fields(form):
+    """db_column_names of the form's indexed fields, cached per version."""
+    key = INDEXED_CACHE_KEY.format(form.id, form.version)
+    names = cache.get(key)
+    if names is None:
+        names = sorted(
+            name
+            for name, config in Field.objects.filter(
+                column__row__section__form=form
+            ).values_list("db_column_name", "config")
+            if isinstance(config, dict) and config.get("indexed")
+        )
+        cache.set(key, names, getattr(settings, "FORM_CACHE_TTL", 300))
+    return names
+
+
+def index_value(value):
+    """The string stored and compared for an indexed value."""
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    return str(value)[:MAX_VALUE_LENGTH]
+
+
+def store_submission(form, payload):
+    """Insert a submission and its indexed values in one transaction."""
+    if not isinstance(payload, dict):
+        raise SubmissionError("'field_values' must be an object.")
+    with transaction.atomic():
+        submission = FormSubmission.objects.create(
+            form=form, version=form.version, payload=payload
+        )
+        SubmissionValue.objects.bulk_create(
+            SubmissionValue(
+                submission=submission,
+                form=form,
+                name=name,
+                value=index_value(payload[name]),
+            )
+            for name in indexed_fields(form)
+            if payload.get(name) is not None
+        )
+    return submission
+
+
+def query_submissions(form, filters=None, after=0, limit=100):
+    """
+    Submissions of ``form`` matching every ``{field: value}`` filter, in id
+    order starting after ``after`` (keyset paging). Only indexed fields can
+    be filtered on.
+    """
+    indexed = set(indexed_fields(form))
+    queryset = FormSubmission.objects.filter(form=form, id__gt=after)
+    for name, value in sorted((filters or {}).items()):
+        if name not in indexed:
+            raise SubmissionError(f"Field '{name}' is not indexed.")
+        queryset = queryset.filter(
+            id__in=SubmissionValue.objects.filter(
+                form=form, name=name, value=index_value(value)
+            ).values("submission_id")
+        )
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    return queryset.order_by("id").values("id", "version", "payload", "created_at")[
+        :limit
+    ]
+
+
+def iter_submissions(form, batch_size=MAX_PAGE_SIZE):
+    """Every submission of ``form``, fetched a page at a time."""
+    after = 0
+    while True:
+        page = list(query_submissions(form, after=after, limit=batch_size))
+        if not page:
+            return
+        yield from page
+        after = page[-1]["id"]
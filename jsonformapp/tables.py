@@ -0,0 +1,44 @@
+from django.apps import apps
+from django.core.exceptions import ValidationError
+
+from .provisioning import provisioned_model
+
+
+def resolve_model(table_name):
+    """
+    Map an ``<app_label>_<model>`` table name, as used by
+    DynamicTableRecordView, to its Django model, falling back to tables
+    provisioned from forms. Raises LookupError or ValueError when the name
+    does not resolve.
+    """
+    try:
+        app_label, model_name = table_name.split("_")
+        return apps.get_model(app_label, model_name)
+    except (LookupError, ValueError):
+        model = provisioned_model(table_name)
+        if model is None:
+            raise
+        return model
+
+
+def validate_field_values(model, field_values):
+    """
+    Build an unsaved instance from ``field_values`` and run model validation
+    on it, so problems surface before the values are queued. Uniqueness is
+    not checked here; it is enforced by the database on insert.
+    """
+    if not isinstance(field_values, dict):
+        raise ValidationError("'field_values' must be an object.")
+
+    concrete = {f.attname for f in model._meta.concrete_fields} | {
+        f.name for f in model._meta.concrete_fields
+    }
+    unknown = sorted(set(field_values) - concrete)
+    if unknown:
+        raise ValidationError(
+            {name: ["Unknown field."] for name in unknown},
+        )
+
+    instance = model(**field_values)
+    instance.full_clean(exclude=[model._meta.pk.name], validate_unique=False)
+    return instance
@@ -0,0 +1,69 @@
+"""
+Tenant scoping. ``settings.TENANTS`` maps a tenant key to its options::
+
+    TENANTS = {
+        "travel": {"tables": ["product_product"], "cache": "travel"},
+        "wordings": {"tables": ["wording_wording"]},
+    }
+
+The tenant comes from the ``X-Tenant`` header (``TENANT_HEADER``). A tenant
+without a "tables" list sees every table. With no TENANTS configured the app
+is single-tenant: the tenant is ``""`` and every table is visible.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_TENANT = ""
+
+
+class UnknownTenant(ValueError):
+    pass
+
+
+def tenants():
+    return getattr(settings, "TENANTS", {})
+
+
+def tenant_from_header(value):
+    value = (value or "").strip()
+    if not tenants():
+        return DEFAULT_TENANT
+    if value not in tenants():
+        raise UnknownTenant(f"Unknown tenant '{value}'.")
+    return value
+
+
+def get_tenant(request):
+    """Tenant resolved by TenantMiddleware, defaulting to single-tenant."""
+    return getattr(request, "tenant", DEFAULT_TENANT)
+
+
+def allowed_tables(tenant):
+    """The tenant's table allow-list, or None when all tables are visible."""
+    tables = tenants().get(tenant, {}).get("tables")
+    return None if tables is None else set(tables)
+
+
+def table_allowed(tenant, table_name):
+    tables = allowed_tables(tenant)
+    return tables is None or table_name in tables
+
+
+def filter_tables(tenant, table_names):
+    tables = allowed_tables(tenant)
+    if tables is None:
+        return list(table_names)
+    return [name for name in table_names if name in tables]
+
+
+def tenant_cache(tenant):
+    """
+    The cache holding a tenant's entries: a dedicated alias when configured,
+    so that eviction pressure in one tenant can't push out another's keys.
+    """
+    return caches[tenants().get(tenant, {}).get("cache", "default")]
+
+
+def tenant_key(tenant, key):
+    return f"tenant:{tenant}:{key}"
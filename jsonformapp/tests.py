@@ -1,3 +1,1333 @@
-from django.test import TestCase
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, connections
+from django.db.models import Prefetch
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from product.models import Product
+
+from . import bus, metrics
+from .aggregates import AggregateError, aggregate, parse_spec
+from .caching import (
+    RECORD_KEY,
+    FormVersionCache,
+    bump_table_generation,
+    forget_form,
+    forget_rows,
+    table_generation,
+)
+from .budgets import QueryTimeout, query_budget
+from .changefeed import changes_since, latest_seq
+from .jobs import claim_job, reclaim_stale_jobs, run_job, submit
+from .outbox import RateLimiter, drain_table, enqueue
+from .httpcache import cached_introspection
+from .provisioning import (
+    ProvisioningError,
+    provision_form,
+    provisioned_model,
+)
+from .queries import QueryError, compile_select, fetch_rows
+from .dispatch import dispatch_once, dispatch_settings, dispatcher
+from .form_schema import SchemaError, _compiled, form_schema
+from .form_tree import serialize_tree
+from .middleware import accepts_gzip
+from .models import (
+    CacheGeneration,
+    Column,
+    Delivery,
+    DeliveryDeadLetter,
+    Field,
+    Form,
+    FormSearchToken,
+    Job,
+    ProvisionedTable,
+    Row,
+    Section,
+    SubmissionOutbox,
+    TableChange,
+)
+from .rules import FormRules, RuleError, compile_expression, form_rules
+from .schema import clear_schema_cache, schema_fingerprint
+from .search import index_form, search_forms
+from .serializers import FormSerializer, SectionSerializer
+from .submissions import store_submission
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers POST /ok with 200, /fail with 503 and /reject with 400."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((self.path, self.client_address, json.loads(body)))
+        code = {"/ok": 200, "/fail": 503, "/reject": 400}.get(self.path, 404)
+        self.send_response(code)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+def make_form(fields, **kwargs):
+    """A form with one section, row and column holding ``fields``."""
+    form = Form.objects.create(
+        **{"form_name": "Test", "submit_api_route": "http://127.0.0.1:9/", **kwargs}
+    )
+    section = Section.objects.create(form=form, section_name="S", section_order=1)
+    column = Column.objects.create(
+        row=Row.objects.create(section=section), column_order=1
+    )
+    for order, field in enumerate(fields):
+        Field.objects.create(
+            column=column, field_order=order, **{"config": {}, **field}
+        )
+    # TestCase never commits, so Form's on-commit publish does not run, and
+    # ids are reused across tests: drop anything compiled for an earlier form.
+    bus.publish("form", form.id)
+    return form
+
+
+class DispatchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.server.received = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.received.clear()
+        metrics.reset()
+
+    def queue(self, path, count):
+        form = Form.objects.create(
+            submit_api_route=self.base + path, form_name="Stub", table_name="x"
+        )
+        for i in range(count):
+            Delivery.objects.create(
+                form=form, route=form.submit_api_route, payload={"n": i}
+            )
+        return form
+
+    def run_once(self, **overrides):
+        config = {**dispatch_settings(), **overrides}
+        pool, executor = dispatcher(config)
+        try:
+            return dispatch_once(pool, executor, config)
+        finally:
+            executor.shutdown()
+            pool.close()
+
+    def test_delivers_in_order_over_one_keep_alive_connection(self):
+        self.queue("/ok", 3)
+        self.assertEqual(self.run_once(), (3, 0, 0))
+        self.assertEqual(
+            [body for _, _, body in self.server.received],
+            [{"n": 0}, {"n": 1}, {"n": 2}],
+        )
+        self.assertEqual(len({client for _, client, _ in self.server.received}), 1)
+        self.assertEqual(
+            Delivery.objects.filter(status=Delivery.STATUS_DELIVERED).count(), 3
+        )
+        counters = metrics.snapshot()
+        self.assertEqual(counters["dispatch.connections_opened"], 1)
+        self.assertEqual(counters["dispatch.connections_reused"], 2)
+
+    def test_batch_route_gets_one_array_request(self):
+        form = self.queue("/ok", 3)
+        result = self.run_once(BATCH_ROUTES=[form.submit_api_route])
+        self.assertEqual(result, (3, 0, 0))
+        self.assertEqual(len(self.server.received), 1)
+        self.assertEqual(self.server.received[0][2], [{"n": 0}, {"n": 1}, {"n": 2}])
+
+    def test_server_errors_are_retried_then_dead_lettered(self):
+        self.queue("/fail", 1)
+        self.assertEqual(self.run_once(MAX_ATTEMPTS=2), (0, 1, 0))
+        delivery = Delivery.objects.get()
+        self.assertEqual(delivery.attempts, 1)
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+        self.assertIsNone(self.run_once(MAX_ATTEMPTS=2))
+
+        Delivery.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(self.run_once(MAX_ATTEMPTS=2), (0, 0, 1))
+        self.assertFalse(Delivery.objects.exists())
+        dead = DeliveryDeadLetter.objects.get()
+        self.assertEqual((dead.attempts, dead.payload), (2, {"n": 0}))
+        self.assertIn("HTTP 503", dead.error)
+
+    def test_client_errors_are_dead_lettered_immediately(self):
+        self.queue("/reject", 1)
+        self.assertEqual(self.run_once(), (0, 0, 1))
+        self.assertEqual(DeliveryDeadLetter.objects.get().attempts, 1)
+
+    def test_route_stops_at_the_first_failure(self):
+        form = self.queue("/fail", 3)
+        self.assertEqual(self.run_once(), (0, 1, 0))
+        self.assertEqual(len(self.server.received), 1)
+        first, *held = Delivery.objects.order_by("id")
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual([d.attempts for d in held], [0, 0])
+
+        # Later deliveries wait while the first one backs off.
+        Delivery.objects.create(form=form, route=form.submit_api_route, payload={})
+        self.assertIsNone(self.run_once())
+        Delivery.objects.filter(id=first.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(self.run_once(), (0, 1, 0))
+        self.assertEqual(
+            [body for _, _, body in self.server.received], [{"n": 0}, {"n": 0}]
+        )
+
+    @override_settings(SUBMISSION_DISPATCH={"ENABLED": True})
+    def test_record_view_queues_a_delivery(self):
+        form = Form.objects.create(
+            submit_api_route=self.base + "/ok", form_name="Stub", table_name="x"
+        )
+        response = self.client.post(
+            "/api/v1/form/field-values-submission/",
+            {"table_name": "x", "form_id": form.id, "field_values": {"a": 1}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Delivery.objects.get().payload["field_values"], {"a": 1})
+
+
+def watch_schemas(form_id, other_id, ready, results):
+    """
+    Worker process: compile two forms' schemas, then poll the bus until the
+    first one is dropped. Reports (dropped, other kept, time seen).
+    """
+    form, other = Form.objects.get(id=form_id), Form.objects.get(id=other_id)
+    form_schema(form)
+    form_schema(other)
+    bus.poll(force=True)
+    ready.set()
+    deadline = time.monotonic() + 10
+    while (form.id, form.version) in _compiled and time.monotonic() < deadline:
+        time.sleep(0.01)
+        bus.poll()
+    results.put(
+        (
+            (form.id, form.version) not in _compiled,
+            (other.id, other.version) in _compiled,
+            time.monotonic(),
+        )
+    )
+    connections.close_all()
+
+
+class InvalidationBusTests(TransactionTestCase):
+    WORKERS = 3
+    INTERVAL = 0.1
+
+    def setUp(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            self.skipTest("Worker processes need a database they can share.")
+
+    def run_workers(self):
+        form = Form.objects.create(form_name="Watched", table_name="a")
+        other = Form.objects.create(form_name="Other", table_name="b")
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        ready = [context.Event() for _ in range(self.WORKERS)]
+        # Children must open their own connections.
+        connections.close_all()
+        workers = [
+            context.Process(
+                target=watch_schemas, args=(form.id, other.id, event, results)
+            )
+            for event in ready
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for event in ready:
+                self.assertTrue(event.wait(10))
+            updated_at = time.monotonic()
+            form.form_name = "Renamed"
+            form.save()
+            reports = [results.get(timeout=15) for _ in workers]
+        finally:
+            for worker in workers:
+                worker.join(5)
+        for dropped, other_kept, seen_at in reports:
+            self.assertTrue(dropped)
+            self.assertTrue(other_kept)
+            self.assertLess(seen_at - updated_at, self.INTERVAL + 1.0)
+
+    def test_database_backend_reaches_every_worker(self):
+        with override_settings(
+            INVALIDATION_BUS={"BACKEND": "db", "INTERVAL": self.INTERVAL}
+        ):
+            self.run_workers()
+
+    def test_file_backend_reaches_every_worker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bus.log")
+            with override_settings(
+                INVALIDATION_BUS={
+                    "BACKEND": "file",
+                    "PATH": path,
+                    "INTERVAL": self.INTERVAL,
+                }
+            ):
+                self.run_workers()
+
+
+class BusPublishTests(TestCase):
+    def test_form_writes_publish_on_commit(self):
+        form = make_form([{"db_column_name": "x"}])
+        form_schema(form)
+        with self.captureOnCommitCallbacks() as callbacks:
+            form.form_name = "Renamed"
+            form.save()
+            self.assertIn((form.id, form.version), _compiled)
+        for callback in callbacks:
+            callback()
+        self.assertNotIn((form.id, form.version), _compiled)
+
+    @override_settings(INVALIDATION_BUS={"BACKEND": "db"})
+    def test_database_errors_are_logged(self):
+        with mock.patch.object(
+            CacheGeneration.objects, "create", side_effect=OperationalError
+        ):
+            with self.assertLogs("jsonformapp.bus", "WARNING"):
+                bus.publish("form", 1)
+
+    @override_settings(INVALIDATION_BUS={"BACKEND": "db"})
+    def test_row_writes_reach_other_workers(self):
+        other = bus.DatabaseBackend({})
+        other.poll()
+        product = Product.objects.create(
+            product_name="A", product_code="A1", currency="INR"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        events = other.poll()
+        self.assertIn(("rows", f"product_product:{product.pk}"), events)
+
+        cache.set(RECORD_KEY.format("product_product", product.pk), {"id": 1})
+        generation = table_generation("product_product")
+        forget_rows(f"product_product:{product.pk}")
+        self.assertEqual(table_generation("product_product"), generation + 1)
+        self.assertIsNone(cache.get(RECORD_KEY.format("product_product", product.pk)))
+
+    def test_poll_rechecks_only_skipped_ids(self):
+        backend = bus.DatabaseBackend({})
+        backend.poll()
+        _, skipped, _ = (
+            CacheGeneration.objects.create(topic="t", key=key) for key in "abc"
+        )
+        # Not yet committed, as far as the poll can tell.
+        skipped_id = skipped.id
+        skipped.delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.poll(), [("t", "a"), ("t", "c")])
+        CacheGeneration.objects.create(id=skipped_id, topic="t", key="b")
+        self.assertEqual(backend.poll(), [("t", "b")])
+        self.assertEqual(backend.poll(), [])
+        self.assertEqual(backend.gaps, {})
+
+
+class ProvisioningTests(TransactionTestCase):
+    TABLE = "provisioned_test"
+
+    def setUp(self):
+        cache.clear()
+        self.form = make_form(
+            [
+                {"db_column_name": "name", "max_length": 40, "is_Required": True},
+                {
+                    "db_column_name": "age",
+                    "data_type": "int",
+                    "config": {"indexed": True},
+                },
+            ],
+            table_name=self.TABLE,
+        )
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+        cache.clear()
+
+    def columns(self):
+        with connection.cursor() as cursor:
+            return [
+                column.name
+                for column in connection.introspection.get_table_description(
+                    cursor, self.TABLE
+                )
+            ]
+
+    def add_field(self, **field):
+        column = Column.objects.get(row__section__form=self.form)
+        Field.objects.create(column=column, field_order=9, config={}, **field)
+
+    def test_creates_the_table(self):
+        operations, statements = provision_form(self.form)
+        self.assertEqual(operations, [("create", self.TABLE)])
+        self.assertEqual(statements, [])
+        self.assertEqual(self.columns(), ["id", "name", "age"])
+        record = ProvisionedTable.objects.get(table_name=self.TABLE)
+        self.assertEqual(record.version, 1)
+        self.assertEqual(record.columns["name"]["max_length"], 40)
+        self.assertTrue(record.columns["age"]["index"])
+        model = provisioned_model(self.TABLE)
+        model.objects.create(name="A", age=3)
+        self.assertEqual(model.objects.get().age, 3)
+
+    def test_adding_a_column_changes_the_schema_fingerprint(self):
+        provision_form(self.form)
+        before = schema_fingerprint()[0]
+        self.add_field(db_column_name="email", data_type="email")
+        operations, _ = provision_form(self.form)
+        self.assertEqual(operations, [("add", "email")])
+        self.assertEqual(self.columns(), ["id", "name", "age", "email"])
+        self.assertEqual(ProvisionedTable.objects.get().version, 2)
+        self.assertNotEqual(schema_fingerprint()[0], before)
+        self.assertIn(
+            "email", {f.name for f in provisioned_model(self.TABLE)._meta.fields}
+        )
+
+    def test_dry_run_only_collects_sql(self):
+        operations, statements = provision_form(self.form, dry_run=True)
+        self.assertEqual(operations, [("create", self.TABLE)])
+        self.assertTrue(any("CREATE TABLE" in sql for sql in statements))
+        self.assertTrue(any("CREATE INDEX" in sql for sql in statements))
+        self.assertNotIn(self.TABLE, connection.introspection.table_names())
+        self.assertFalse(ProvisionedTable.objects.exists())
+
+    def test_dropped_fields_are_kept_unless_asked(self):
+        provision_form(self.form)
+        Field.objects.filter(db_column_name="age").delete()
+        operations, _ = provision_form(self.form)
+        self.assertEqual(operations, [])
+        self.assertTrue(ProvisionedTable.objects.get().columns["age"]["null"])
+        self.assertIn("age", self.columns())
+
+        operations, _ = provision_form(self.form, drop_columns=True)
+        self.assertEqual(operations, [("drop_index", "age"), ("drop", "age")])
+        self.assertEqual(self.columns(), ["id", "name"])
+
+    def test_rejects_bad_names(self):
+        self.add_field(db_column_name="id")
+        with self.assertRaises(ProvisioningError):
+            provision_form(self.form)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def test_rates_below_one_per_second(self):
+        now = [0.0]
+        limiter = RateLimiter({"t": 0.5}, clock=lambda: now[0])
+        self.assertEqual(limiter.take("t", 10), 1)
+        granted = []
+        for _ in range(8):
+            now[0] += 1
+            granted.append(limiter.take("t", 10))
+        self.assertEqual(granted, [0, 1, 0, 1, 0, 1, 0, 1])
+
+    def test_burst_is_capped_at_the_rate(self):
+        now = [0.0]
+        limiter = RateLimiter({}, default=100, clock=lambda: now[0])
+        self.assertEqual(limiter.take("t", 500), 100)
+        self.assertEqual(limiter.take("t", 500), 0)
+        now[0] += 60
+        self.assertEqual(limiter.take("t", 500), 100)
+        self.assertEqual(limiter.take("other", 5), 5)
+
+
+class FormVersionCacheTests(SimpleTestCase):
+    def test_lru_and_forget(self):
+        compiled = FormVersionCache(size=2)
+        forms = [SimpleNamespace(id=i, version=1) for i in range(3)]
+        builds = []
+
+        def get(form):
+            return compiled.get_or_build(form, lambda: builds.append(form.id) or form)
+
+        get(forms[0])
+        get(forms[1])
+        get(forms[0])
+        get(forms[2])
+        self.assertEqual(builds, [0, 1, 2])
+        self.assertNotIn((1, 1), compiled)
+        self.assertIn((0, 1), compiled)
+
+        forget_form("0")
+        self.assertNotIn((0, 1), compiled)
+        get(forms[0])
+        self.assertEqual(builds, [0, 1, 2, 0])
+
+
+class AcceptsGzipTests(SimpleTestCase):
+    def test_negotiation(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("GZip;q=0.5"))
+        self.assertTrue(accepts_gzip("x-gzip"))
+        self.assertTrue(accepts_gzip("*"))
+        self.assertTrue(accepts_gzip("br, *;q=0.1"))
+        self.assertFalse(accepts_gzip(""))
+        self.assertFalse(accepts_gzip("br, deflate"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("*, gzip;q=0"))
+        self.assertFalse(accepts_gzip("*;q=0"))
+
+
+class AggregateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for code, family, fee in [
+            ("H1", "Health", "10.00"),
+            ("H2", "Health", "30.00"),
+            ("T1", "Travel", "5.00"),
+        ]:
+            Product.objects.create(
+                product_name=code,
+                product_code=code,
+                currency="INR",
+                product_family=family,
+                platform_fee=fee,
+            )
+
+    def run_spec(self, **params):
+        return aggregate("product_product", parse_spec(params))[0]
+
+    def test_groups_with_metrics(self):
+        rows = self.run_spec(
+            group_by="product_family", metrics="count,sum:platform_fee"
+        )
+        self.assertEqual(
+            [
+                (r["product_family"], r["count"], float(r["sum_platform_fee"]))
+                for r in rows
+            ],
+            [("Health", 2, 40.0), ("Travel", 1, 5.0)],
+        )
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(parse_spec({"limit": "0"})["limit"], 1)
+        self.assertEqual(parse_spec({"limit": "-5"})["limit"], 1)
+        self.assertEqual(parse_spec({"limit": "99999999"})["limit"], 10000)
+        rows = self.run_spec(group_by="product_family", limit="-1")
+        self.assertEqual(len(rows), 1)
+        with self.assertRaises(AggregateError):
+            parse_spec({"limit": "ten"})
+
+    def test_rejects_duplicate_aliases(self):
+        for params in (
+            {"metrics": "count,count"},
+            {"metrics": "max:platform_fee,MAX:platform_fee"},
+            {"group_by": "product_family,product_family"},
+        ):
+            with self.subTest(params=params), self.assertRaises(AggregateError):
+                self.run_spec(**params)
+
+
+class ChangeFeedTests(TestCase):
+    def log(self, count):
+        return [
+            TableChange.objects.create(
+                table_name="product_product", record_id=str(i), op="insert"
+            ).id
+            for i in range(count)
+        ]
+
+    def served(self, since=0, limit=1000):
+        return [c["id"] for c in changes_since("product_product", since, limit)]
+
+    def test_waits_for_recent_gaps_to_fill(self):
+        first, in_flight, last = self.log(3)
+        # A row not yet visible looks like a hole in the ids.
+        TableChange.objects.filter(id=in_flight).delete()
+        self.assertEqual(self.served(), [first])
+        self.assertEqual(latest_seq("product_product"), first)
+
+        TableChange.objects.update(created_at=timezone.now() - timedelta(seconds=60))
+        self.assertEqual(self.served(), [first, last])
+        self.assertEqual(latest_seq("product_product"), last)
+
+    def test_limit_is_clamped(self):
+        ids = self.log(3)
+        self.assertEqual(self.served(limit=0), ids[:1])
+        self.assertEqual(self.served(limit=-1), ids[:1])
+        self.assertEqual(self.served(since=ids[0]), ids[1:])
+
+    def test_view_rejects_non_finite_wait_and_clamps_limit(self):
+        ids = self.log(2)
+        client = APIClient()
+        url = "/api/v1/tables/product_product/changes/"
+        for wait in ("nan", "inf", "-inf"):
+            with self.subTest(wait=wait):
+                response = client.get(url, {"wait": wait})
+                self.assertEqual(response.status_code, 400)
+        started = time.monotonic()
+        response = client.get(url, {"wait": "-5", "since": ids[-1]})
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(time.monotonic() - started, 1)
+        response = client.get(url, {"limit": "0"})
+        self.assertEqual([c["id"] for c in response.data["changes"]], ids[:1])
+
+
+class RuleTests(TestCase):
+    def setUp(self):
+        self.form = make_form(
+            [
+                {"db_column_name": "product_name", "is_Required": True},
+                {"db_column_name": "product_code", "is_Required": True},
+                {"db_column_name": "currency", "is_Required": True},
+                {"db_column_name": "platform_fee", "data_type": "decimal"},
+                {"db_column_name": "admin_fee", "data_type": "decimal"},
+                {
+                    "db_column_name": "assurance_charge",
+                    "data_type": "decimal",
+                    "config": {
+                        "compute": {
+                            "+": [{"var": "platform_fee"}, {"var": "admin_fee"}]
+                        }
+                    },
+                },
+                {
+                    "db_column_name": "bank_name",
+                    "config": {"required_if": {">": [{"var": "platform_fee"}, 100]}},
+                },
+            ],
+            table_name="product_product",
+        )
+        self.client = APIClient()
+
+    def test_computes_decimals(self):
+        result = form_rules(self.form).evaluate(
+            {"platform_fee": "10.10", "admin_fee": 2}
+        )
+        self.assertEqual(result["computed"], {"assurance_charge": Decimal("12.10")})
+        self.assertEqual(result["values"]["assurance_charge"], Decimal("12.10"))
+        self.assertFalse(result["required"]["bank_name"])
+        self.assertIn("product_name", result["errors"])
+
+    def test_incremental_evaluation(self):
+        rules = form_rules(self.form)
+        first = rules.evaluate({"platform_fee": "10", "admin_fee": "1"})
+        values = {**first["values"], "platform_fee": "150"}
+        second = rules.evaluate(values, ["platform_fee"], first)
+        self.assertEqual(second["computed"]["assurance_charge"], Decimal("151"))
+        self.assertTrue(second["required"]["bank_name"])
+        self.assertEqual(second["errors"]["bank_name"], ["This field is required."])
+
+    def test_evaluate_rejects_malformed_state(self):
+        url = f"/api/v1/form/{self.form.id}/evaluate/"
+        for body in (
+            {"values": {}, "changed": "platform_fee", "state": {}},
+            {"values": {}, "changed": [{"a": 1}], "state": {}},
+            {"values": {}, "changed": ["platform_fee"], "state": []},
+            {"values": {}, "changed": ["platform_fee"], "state": {"visible": [1]}},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+
+    def test_checks_operator_arity(self):
+        for expression in ({"==": [1]}, {"not": [1, 2]}, {"/": [4]}, {"+": []}):
+            with self.subTest(expression=expression):
+                with self.assertRaises(RuleError):
+                    compile_expression(expression)
+
+    def test_runtime_errors_are_rule_errors(self):
+        for config, values in (
+            ({"compute": {"*": [{"var": "a"}, {"var": "a"}]}}, {"a": "1e999999999"}),
+            ({"visible_if": {"in": ["USD", {"var": "tags"}]}}, {"tags": 5}),
+        ):
+            with self.subTest(config=config):
+                rules = FormRules([("x", False, config)])
+                with self.assertRaises(RuleError):
+                    rules.evaluate(values)
+
+        form = make_form(
+            [{"db_column_name": "x", "config": {"visible_if": {"in": [1, 2]}}}]
+        )
+        response = self.client.post(
+            f"/api/v1/form/{form.id}/evaluate/", {"values": {}}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_buffered_submission_stores_computed_decimals(self):
+        response = self.client.post(
+            "/api/v1/form/field-values-submission/",
+            {
+                "form_id": self.form.id,
+                "table_name": "product_product",
+                "buffered": "true",
+                "field_values": {
+                    "product_name": "Cover",
+                    "product_code": "C1",
+                    "currency": "INR",
+                    "platform_fee": "10.10",
+                    "admin_fee": "2",
+                },
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202, response.data)
+        entry = SubmissionOutbox.objects.get(ticket=response.data["ticket"])
+        self.assertEqual(
+            Decimal(str(entry.field_values["assurance_charge"])), Decimal("12.10")
+        )
+
+    def test_buffered_submission_is_forwarded_once_written(self):
+        response = self.client.post(
+            "/api/v1/form/field-values-submission/",
+            {
+                "form_id": self.form.id,
+                "table_name": "product_product",
+                "buffered": True,
+                "field_values": {
+                    "product_name": "Cover",
+                    "product_code": "C1",
+                    "currency": "INR",
+                },
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertFalse(Delivery.objects.exists())
+        self.assertEqual(drain_table("product_product", 10), 1)
+        payload = Delivery.objects.get().payload
+        self.assertEqual(payload["ticket"], response.data["ticket"])
+        self.assertEqual(
+            payload["record_id"], Product.objects.get(product_code="C1").id
+        )
+
+
+@override_settings(JOB_STALE_AFTER=60, JOB_MAX_ATTEMPTS=2)
+class JobReclaimTests(TestCase):
+    def go_stale(self, job):
+        Job.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=61)
+        )
+
+    def test_requeues_then_fails_jobs_without_heartbeat(self):
+        job = submit("empty_tables", {})
+        claimed = claim_job()
+        self.assertEqual((claimed.pk, claimed.attempts), (job.pk, 1))
+        self.assertEqual(reclaim_stale_jobs(), (0, 0))
+
+        self.go_stale(claimed)
+        self.assertEqual(reclaim_stale_jobs(), (1, 0))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.STATUS_QUEUED)
+
+        # The first run finishing late must not overwrite the second one.
+        stale_run = claimed
+        claimed = claim_job()
+        self.assertEqual(claimed.attempts, 2)
+        run_job(stale_run)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.STATUS_RUNNING)
+
+        self.go_stale(claimed)
+        self.assertEqual(reclaim_stale_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn("stopped responding", job.error)
+
+
+class TableImportTests(TestCase):
+    def upload(self, content, **data):
+        return APIClient().post(
+            "/api/v1/tables/product_product/import/",
+            {"file": SimpleUploadedFile("products.csv", content), **data},
+            format="multipart",
+        )
+
+    def test_imports_rows(self):
+        response = self.upload(
+            b"product_name,product_code,currency\nCover,C1,INR\nTrip,T1,USD\n"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["inserted"], 2)
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_rows_get_ids_without_bulk_returning(self):
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ):
+            response = self.upload(
+                b"product_name,product_code,currency\nCover,C1,INR\nTrip,T1,USD\n"
+            )
+        self.assertEqual(response.data["inserted"], 2)
+        ids = sorted(str(pk) for pk in Product.objects.values_list("id", flat=True))
+        changes = TableChange.objects.filter(table_name="product_product")
+        self.assertEqual(sorted(c.record_id for c in changes), ids)
+        self.assertEqual(sorted(str(c.data["id"]) for c in changes), ids)
+
+    def test_malformed_csv_is_a_bad_request(self):
+        response = self.upload(b"product_name,product_code\n" + b"x" * 200000)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 2", response.data["error"])
+
+    def test_rejects_non_positive_chunk_size(self):
+        for chunk_size in ("0", "-1", "ten"):
+            with self.subTest(chunk_size=chunk_size):
+                response = self.upload(b"product_name\nCover\n", chunk_size=chunk_size)
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(TENANTS={"acme": {}, "globex": {}})
+class TenantTests(TestCase):
+    def test_admin_and_docs_need_no_tenant(self):
+        client = APIClient()
+        self.assertEqual(client.get("/api/v1/form/").status_code, 400)
+        self.assertEqual(client.get("/admin/login/").status_code, 200)
+        self.assertNotEqual(client.get("/redoc/").status_code, 400)
+
+    def test_submission_status_is_scoped_to_the_tenant(self):
+        entry = enqueue("product_product", {"product_name": "x"}, "acme")
+        url = f"/api/v1/form/field-values-submission/{entry.ticket}/"
+        client = APIClient()
+        response = client.get(url, HTTP_X_TENANT="globex")
+        self.assertEqual(response.status_code, 404)
+        response = client.get(url, HTTP_X_TENANT="acme")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], SubmissionOutbox.STATUS_PENDING)
+
+
+class RecordTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.cover, self.trip = (
+            Product.objects.create(product_name=name, product_code=code, currency="INR")
+            for name, code in (("Cover", "C1"), ("Trip", "T1"))
+        )
+
+    def test_records_by_id(self):
+        response = self.client.get(
+            "/api/v1/tables/product_product/records/",
+            {"ids": f"{self.trip.id},999,{self.cover.id}", "fields": "product_code"},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            response.data["data"],
+            [
+                {"id": self.trip.id, "product_code": "T1"},
+                {"id": self.cover.id, "product_code": "C1"},
+            ],
+        )
+        self.assertEqual(response.data["missing"], ["999"])
+
+    def test_record(self):
+        url = "/api/v1/tables/product_product/records/{}/"
+        response = self.client.get(url.format(self.cover.id))
+        self.assertEqual(response.data["product_name"], "Cover")
+        self.assertEqual(self.client.get(url.format(999)).status_code, 404)
+        for record_id in ("%C2%B2", "abc", "-1"):
+            with self.subTest(record_id=record_id):
+                response = self.client.get(url.format(record_id))
+                self.assertEqual(response.status_code, 400)
+
+    @override_settings(RECORD_CACHE_TTL=60)
+    def test_cached_records_are_dropped_on_write(self):
+        url = f"/api/v1/tables/product_product/records/{self.cover.id}/"
+        self.assertEqual(self.client.get(url).data["product_name"], "Cover")
+        Product.objects.filter(pk=self.cover.pk).update(product_name="Stale")
+        self.assertEqual(self.client.get(url).data["product_name"], "Cover")
+        self.cover.product_name = "Renamed"
+        self.cover.save()
+        self.assertEqual(self.client.get(url).data["product_name"], "Renamed")
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.form = make_form(
+            [
+                {"db_column_name": "policy_no", "config": {"label": "Policy number"}},
+                {"db_column_name": "start_date", "data_type": "date"},
+            ],
+            form_name="Travel cover",
+        )
+        index_form(self.form)
+
+    def found(self, query, tenant=""):
+        return [form.id for form in search_forms(query, tenant=tenant)]
+
+    def test_matches_every_term(self):
+        self.assertEqual(self.found("travel policy"), [self.form.id])
+        self.assertEqual(self.found("pol*"), [self.form.id])
+        self.assertEqual(self.found("db_column_name:start_date"), [self.form.id])
+        self.assertEqual(self.found("form_name:policy"), [])
+        self.assertEqual(self.found("travel health"), [])
+        response = APIClient().get("/api/v1/form/search/", {"q": "cover", "limit": 0})
+        self.assertEqual(
+            [form["id"] for form in response.data["forms"]], [self.form.id]
+        )
+
+    def test_reindexing_and_deletes(self):
+        self.form.form_name = "Health cover"
+        self.form.save()
+        index_form(self.form)
+        self.assertEqual(self.found("travel"), [])
+        self.assertEqual(self.found("health"), [self.form.id])
+        self.assertEqual(self.found("health", tenant="acme"), [])
+
+        self.form.is_deleted = True
+        self.form.save()
+        index_form(self.form)
+        self.assertEqual(self.found("health"), [])
+        self.assertFalse(FormSearchToken.objects.filter(form=self.form).exists())
+
+
+class OptionsTests(TestCase):
+    URL = "/api/v1/tables/product_product/options/{}/"
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for code in ("C1", "C2", "T1"):
+            Product.objects.create(product_name=code, product_code=code, currency="INR")
+
+    def options(self, field, **params):
+        return self.client.get(self.URL.format(field), params)
+
+    def test_distinct_values_and_choices(self):
+        response = self.options("product_code", q="c")
+        self.assertEqual(
+            [option["value"] for option in response.data["options"]], ["C1", "C2"]
+        )
+        response = self.client.get(
+            self.URL.format("product_code"),
+            {"q": "c"},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.options("currency", q="us")
+        self.assertEqual(
+            response.data["options"], [{"value": "USD", "label": "US Dollar"}]
+        )
+        self.assertEqual(self.options("bank_name").status_code, 404)
+
+    def test_writes_invalidate_cached_options(self):
+        etag = self.options("product_code", q="c")["ETag"]
+        Product.objects.create(product_name="C3", product_code="C3", currency="INR")
+        response = self.client.get(
+            self.URL.format("product_code"), {"q": "c"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [option["value"] for option in response.data["options"]],
+            ["C1", "C2", "C3"],
+        )
+
+
+class IntrospectionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return Response({"build": self.builds})
+
+    def get(self, tables=(), **headers):
+        request = RequestFactory().get("/", **headers)
+        return cached_introspection(request, "test", self.build, tables)
+
+    def test_etag_and_shared_payload(self):
+        first = self.get()
+        self.assertEqual(first.data, {"build": 1})
+        self.assertIn("max-age", first["Cache-Control"])
+        self.assertEqual(self.get().data, {"build": 1})
+        self.assertEqual(self.builds, 1)
+        response = self.get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        response = self.get(HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+        response = self.get(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_table_writes_and_schema_changes_change_the_etag(self):
+        etag = self.get(tables=["product_product"])["ETag"]
+        bump_table_generation("product_product")
+        response = self.get(tables=["product_product"], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertEqual(self.builds, 2)
+
+        etag = self.get()["ETag"]
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE introspection_test (id integer PRIMARY KEY)")
+        clear_schema_cache()
+        # The table is rolled back with the test; the catalog must follow.
+        self.addCleanup(clear_schema_cache)
+        self.assertNotEqual(self.get()["ETag"], etag)
+
+
+class QueryCompilationTests(TestCase):
+    INJECTION = "x' OR '1'='1"
+
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(product_name="Cover", product_code="C1", currency="INR")
+
+    def test_values_are_parameters(self):
+        sql, params = compile_select(
+            "product_product",
+            ["product_code"],
+            [("currency", "eq", self.INJECTION), ("is_active", "eq", "yes")],
+            10,
+        )
+        self.assertNotIn(self.INJECTION, sql)
+        self.assertEqual(params, [self.INJECTION, True, 10])
+        self.assertEqual(
+            fetch_rows("product_product", filters=[("currency", "eq", self.INJECTION)]),
+            [],
+        )
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_identifiers_must_be_known_columns(self):
+        for fields, filters in (
+            (["product_code; DROP TABLE product_product"], []),
+            (["product_code"], [("currency = currency OR 1", "eq", "1")]),
+            (["product_code"], [("currency", "like", "%")]),
+        ):
+            with self.subTest(fields=fields, filters=filters):
+                with self.assertRaises(QueryError):
+                    compile_select("product_product", fields, filters)
+
+    def test_only_user_tables(self):
+        for table_name in ("jsonformapp_form", "auth_user", "no_such_table"):
+            with self.subTest(table_name=table_name):
+                with self.assertRaises(QueryError):
+                    compile_select(table_name)
+
+    def test_aggregates_share_the_checks(self):
+        for params in (
+            {"group_by": "currency) FROM auth_user --"},
+            {"metrics": "sum:product_name"},
+            {"metrics": "max:nope"},
+            {"f.currency__regex": "."},
+            {"f.currency OR 1=1": "1"},
+        ):
+            with self.subTest(params=params), self.assertRaises(QueryError):
+                aggregate("product_product", parse_spec(params))
+        rows, _ = aggregate(
+            "product_product", parse_spec({"f.currency__in": f"INR,{self.INJECTION}"})
+        )
+        self.assertEqual(rows, [{"count": 1}])
+
+
+class FormSubmissionsTests(TestCase):
+    def test_next_cursor_follows_the_clamped_limit(self):
+        form = make_form([{"db_column_name": "name"}])
+        ids = [store_submission(form, {"name": str(i)}).id for i in range(3)]
+        url = f"/api/v1/form/{form.id}/submissions/"
+        response = APIClient().get(url, {"limit": 0})
+        self.assertEqual([r["id"] for r in response.data["results"]], ids[:1])
+        self.assertEqual(response.data["next"], ids[0])
+        response = APIClient().get(url, {"after": ids[0], "limit": 5000})
+        self.assertEqual([r["id"] for r in response.data["results"]], ids[1:])
+        self.assertIsNone(response.data["next"])
+
+
+class FormUpdateTests(TestCase):
+    def update(self, form, sections):
+        return APIClient().put(
+            f"/api/v1/form/create-update/{form.id}/",
+            {
+                "form_name": "Renamed",
+                "submit_api_route": form.submit_api_route,
+                "sections": sections,
+            },
+            format="json",
+        )
+
+    def test_version_is_bumped_with_the_tree(self):
+        form = make_form([{"db_column_name": "x"}])
+        section = form.sections.get()
+        response = self.update(
+            form,
+            [{"id": section.id, "section_name": "S2", "section_order": 1, "rows": []}],
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        form.refresh_from_db()
+        self.assertEqual((form.form_name, form.version), ("Renamed", 2))
+
+    def test_failed_update_changes_nothing(self):
+        form = make_form([{"db_column_name": "x"}])
+        section = form.sections.get()
+        response = self.update(
+            form,
+            [
+                {"section_name": "New", "section_order": 2, "rows": []},
+                {
+                    "id": section.id + 1000,
+                    "section_name": "S",
+                    "section_order": 1,
+                    "rows": [],
+                },
+            ],
+        )
+        self.assertEqual(response.status_code, 400)
+        form.refresh_from_db()
+        self.assertEqual((form.form_name, form.version), ("Test", 1))
+        self.assertEqual(list(form.sections.all()), [section])
+
+
+class FormTreeTests(TestCase):
+    ORDERED = [
+        Prefetch("sections", queryset=Section.objects.order_by("section_order", "id")),
+        Prefetch("sections__rows", queryset=Row.objects.order_by("row_order", "id")),
+        Prefetch(
+            "sections__rows__columns",
+            queryset=Column.objects.order_by("column_order", "id"),
+        ),
+        Prefetch(
+            "sections__rows__columns__fields",
+            queryset=Field.objects.order_by("field_order", "id"),
+        ),
+    ]
+
+    def setUp(self):
+        self.form = make_form(
+            [
+                {"db_column_name": "amount", "data_type": "decimal", "max_length": 9},
+                {"db_column_name": "note", "config": {"label": "Note", "min": 1}},
+            ],
+            table_name="t",
+        )
+        # A section placed before the first one, with an empty row.
+        section = Section.objects.create(
+            form=self.form, section_name="Intro", section_order=0
+        )
+        Row.objects.create(section=section, row_name="R", row_order=2)
+        self.empty = Form.objects.create(form_name="Empty", submit_api_route="x")
+
+    def test_matches_the_drf_serializers(self):
+        forms = Form.objects.filter(id__in=[self.form.id, self.empty.id])
+        expected = FormSerializer(
+            forms.order_by("id").prefetch_related(*self.ORDERED), many=True
+        ).data
+        self.assertEqual(serialize_tree(0, [self.form.id, self.empty.id]), expected)
+        self.assertEqual(serialize_tree(0, forms.values("id")), expected)
+        self.assertEqual(
+            [s["section_name"] for s in expected[0]["sections"]], ["Intro", "S"]
+        )
+
+    def test_single_section(self):
+        section = Section.objects.prefetch_related(
+            Prefetch("rows", queryset=Row.objects.order_by("row_order", "id")),
+            Prefetch(
+                "rows__columns", queryset=Column.objects.order_by("column_order", "id")
+            ),
+            Prefetch(
+                "rows__columns__fields",
+                queryset=Field.objects.order_by("field_order", "id"),
+            ),
+        ).get(form=self.form, section_name="S")
+        self.assertEqual(
+            serialize_tree(1, [section.id]), [SectionSerializer(section).data]
+        )
+        self.assertEqual(serialize_tree(1, []), [])
+
+
+class FormReorderTests(TestCase):
+    def setUp(self):
+        self.form = make_form(
+            [{"db_column_name": name} for name in ("first", "second", "third")]
+        )
+        self.section = self.form.sections.get()
+        self.column = Column.objects.get(row__section=self.section)
+        self.client = APIClient()
+
+    def reorder(self, **body):
+        return self.client.post(
+            f"/api/v1/form/{self.form.id}/reorder/", body, format="json"
+        )
+
+    def field_names(self):
+        url = f"/api/v1/form/{self.form.id}/sections/{self.section.id}/"
+        column = self.client.get(url).data["rows"][0]["columns"][0]
+        return [field["db_column_name"] for field in column["fields"]]
+
+    def test_tree_follows_the_new_order(self):
+        self.assertEqual(self.field_names(), ["first", "second", "third"])
+        ids = list(
+            Field.objects.filter(column=self.column)
+            .order_by("-id")
+            .values_list("id", flat=True)
+        )
+        response = self.reorder(level="fields", parent_id=self.column.id, ids=ids)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.field_names(), ["third", "second", "first"])
+
+    def test_rejects_malformed_ids(self):
+        ids = list(Field.objects.values_list("id", flat=True))
+        for body in (
+            {"level": "fields", "parent_id": "abc", "ids": ids},
+            {"level": "fields", "parent_id": True, "ids": ids},
+            {"level": "fields", "parent_id": self.column.id, "ids": [True]},
+            {"level": "fields", "parent_id": self.column.id, "ids": ids[:1] * 2},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.reorder(**body).status_code, 400)
+
+
+class QueryBudgetTests(TestCase):
+    COUNT_TO = (
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n"
+        " WHERE i < 100000000) SELECT COUNT(*) FROM n"
+    )
+
+    def setUp(self):
+        metrics.reset()
+        for code in ("A1", "B1"):
+            Product.objects.create(product_name=code, product_code=code, currency="INR")
+
+    def table_data(self, **params):
+        return APIClient().get("/api/v1/tables/product_product/data/", params)
+
+    @override_settings(QUERY_BUDGETS={"aggregate": {"TIMEOUT": 0.05}})
+    def test_sqlite_statement_is_interrupted_at_the_deadline(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite progress handler")
+        started = time.monotonic()
+        with self.assertRaises(QueryTimeout):
+            with query_budget("aggregate"):
+                with connection.cursor() as cursor:
+                    cursor.execute(self.COUNT_TO)
+        self.assertLess(time.monotonic() - started, 5)
+        counters = metrics.snapshot()
+        self.assertEqual(counters["queries.timeouts"], 1)
+        self.assertEqual(counters["queries.timeouts.aggregate"], 1)
+        # The handler is removed again afterwards.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    @override_settings(QUERY_BUDGETS={"table_data": {"TIMEOUT": 1e-9}})
+    def test_timeout_is_503(self):
+        response = self.table_data()
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(QUERY_BUDGETS={"table_data": {"MAX_ROWS": 1}})
+    def test_row_limit_is_413(self):
+        self.assertEqual(self.table_data().status_code, 413)
+        response = self.table_data(limit=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), 1)
+
+    def test_limit_is_at_least_one(self):
+        for limit in ("0", "-3"):
+            with self.subTest(limit=limit):
+                response = self.table_data(limit=limit)
+                self.assertEqual(len(response.data["data"]), 1)
+
+
+class SchemaTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_compiles_fields(self):
+        form = make_form(
+            [
+                {
+                    "db_column_name": "name",
+                    "data_type": "string",
+                    "is_Required": True,
+                    "max_length": 20,
+                },
+                {"db_column_name": "age", "data_type": "integer"},
+                {
+                    "db_column_name": "fee",
+                    "data_type": "decimal",
+                    "is_Required": True,
+                    "config": {"visible_if": {"field": "age", "gt": 18}},
+                },
+            ]
+        )
+        schema = form_schema(form).schema
+        self.assertEqual(schema["required"], ["name"])
+        self.assertEqual(
+            schema["properties"]["name"],
+            {"type": "string", "maxLength": 20, "minLength": 1},
+        )
+        self.assertEqual(schema["properties"]["age"]["type"], ["integer", "null"])
+        self.assertIn("fee", schema["x-rules"])
+
+    def test_validates_values(self):
+        form = make_form(
+            [
+                {"db_column_name": "name", "is_Required": True},
+                {"db_column_name": "age", "data_type": "int", "config": {"min": 0}},
+                {"db_column_name": "code", "config": {"pattern": "^[A-Z]+$"}},
+                {"db_column_name": "size", "config": {"options": ["S", "M"]}},
+            ]
+        )
+        errors = form_schema(form).validate({"age": -1, "code": "abc", "size": "XL"})
+        self.assertEqual(set(errors), {"name", "age", "code", "size"})
+        self.assertEqual(
+            form_schema(form).validate({"name": "A", "age": "1"}),
+            {"age": ["Must be of type integer or null."]},
+        )
+        self.assertEqual(
+            form_schema(form).validate({"name": "A", "age": 3, "code": "AB"}), {}
+        )
+
+    def test_config_is_checked_when_compiled(self):
+        form = make_form(
+            [{"db_column_name": "age", "data_type": "int", "config": {"max": "10"}}]
+        )
+        self.assertEqual(form_schema(form).schema["properties"]["age"]["maximum"], 10)
+        self.assertIn("age", form_schema(form).validate({"age": 11}))
+
+        for config in ({"pattern": "("}, {"min": "ten"}, {"min_length": -1}):
+            with self.subTest(config=config):
+                form = make_form([{"db_column_name": "x", "config": config}])
+                with self.assertRaises(SchemaError):
+                    form_schema(form)
+
+    def test_invalid_config_is_a_bad_request(self):
+        form = make_form([{"db_column_name": "x", "config": {"pattern": "("}}])
+        response = self.client.get(f"/api/v1/form/{form.id}/schema/")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Field 'x'", response.data["error"])
+        response = self.client.post(
+            "/api/v1/form/field-values-submission/",
+            {"form_id": form.id, "table_name": "x", "field_values": {"x": "a"}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag(self):
+        form = make_form([{"db_column_name": "x"}])
+        url = f"/api/v1/form/{form.id}/schema/"
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
@@ -9,6 +9,25 @@ from .views import (
     DynamicTableRecordView,
     GetEmptyTablesAPIView,
     GetTableDataAPIView,
+    FormSearchAPIView,
+    SubmissionStatusView,
+    AggregateTableAPIView,
+    FieldOptionsAPIView,
+    TableChangesAPIView,
+    FormSkeletonAPIView,
+    FormSectionAPIView,
+    FormEvaluateAPIView,
+    FormSchemaView,
+    JobSubmitView,
+    JobStatusView,
+    JobDownloadView,
+    TableImportView,
+    FormSubmissionsView,
+    FormProvisionView,
+    TableRecordsAPIView,
+    TableRecordAPIView,
+    FormReorderView,
+    MetricsView,
 )
 
 urlpatterns = [
@@ -17,6 +36,42 @@ urlpatterns = [
         "tables/<str:table_name>/fields/", GetFieldsAPIView.as_view(), name="get-fields"
     ),
     path("form/", FormListAPIView.as_view(), name="form-list"),
+    path(
+        "form/<int:form_id>/skeleton/",
+        FormSkeletonAPIView.as_view(),
+        name="form-skeleton",
+    ),
+    path(
+        "form/<int:form_id>/sections/<int:section_id>/",
+        FormSectionAPIView.as_view(),
+        name="form-section",
+    ),
+    path(
+        "form/<int:form_id>/schema/",
+        FormSchemaView.as_view(),
+        name="form-schema",
+    ),
+    path(
+        "form/<int:form_id>/evaluate/",
+        FormEvaluateAPIView.as_view(),
+        name="form-evaluate",
+    ),
+    path(
+        "form/<int:form_id>/submissions/",
+        FormSubmissionsView.as_view(),
+        name="form-submissions",
+    ),
+    path(
+        "form/<int:form_id>/provision/",
+        FormProvisionView.as_view(),
+        name="form-provision",
+    ),
+    path(
+        "form/<int:form_id>/reorder/",
+        FormReorderView.as_view(),
+        name="form-reorder",
+    ),
+    path("form/search/", FormSearchAPIView.as_view(), name="form-search"),
     path("form/create/", FormListCreateView.as_view(), name="form-create"),
     path(
         "form/create-update/<int:form_id>/",
@@ -33,10 +88,53 @@ urlpatterns = [
         DynamicTableRecordView.as_view(),
         name="form-field-values-submission",
     ),
+    path(
+        "form/field-values-submission/<uuid:ticket>/",
+        SubmissionStatusView.as_view(),
+        name="form-field-values-submission-status",
+    ),
     path("tables/empty/", GetEmptyTablesAPIView.as_view(), name="get-empty-tables"),
+    path(
+        "tables/<str:table_name>/records/",
+        TableRecordsAPIView.as_view(),
+        name="table-records",
+    ),
+    path(
+        "tables/<str:table_name>/records/<str:record_id>/",
+        TableRecordAPIView.as_view(),
+        name="table-record",
+    ),
     path(
         "tables/<str:table_name>/data/",
         GetTableDataAPIView.as_view(),
         name="get-table-data",
     ),
+    path(
+        "tables/<str:table_name>/aggregate/",
+        AggregateTableAPIView.as_view(),
+        name="aggregate-table",
+    ),
+    path(
+        "tables/<str:table_name>/options/<str:field_name>/",
+        FieldOptionsAPIView.as_view(),
+        name="field-options",
+    ),
+    path(
+        "tables/<str:table_name>/changes/",
+        TableChangesAPIView.as_view(),
+        name="table-changes",
+    ),
+    path(
+        "tables/<str:table_name>/import/",
+        TableImportView.as_view(),
+        name="table-import",
+    ),
+    path("jobs/", JobSubmitView.as_view(), name="job-submit"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("jobs/<int:job_id>/", JobStatusView.as_view(), name="job-status"),
+    path(
+        "jobs/<int:job_id>/download/",
+        JobDownloadView.as_view(),
+        name="job-download",
+    ),
 ]
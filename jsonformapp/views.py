@@ -1,35 +1,96 @@
+import math
+
 from rest_framework.generics import ListAPIView
 from rest_framework.views import APIView
 from .models import Form
 from .serializers import FormSerializer, FormCreateSerializer, FormUpdateSerializer
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework import status
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
-from django.db import connection
+from django.db import connection, transaction
+from django.http import FileResponse, StreamingHttpResponse
 from django.apps import apps
-from django.core.exceptions import ObjectDoesNotExist, FieldError
+from django.urls import reverse
+from django.core.exceptions import ObjectDoesNotExist, FieldError, ValidationError
+from .aggregates import aggregate, parse_spec
+from .budgets import (
+    QueryTimeout,
+    RowLimitExceeded,
+    budget,
+    check_row_count,
+    is_timeout,
+    query_budget,
+)
+from .caching import FORM_TABLE
+from . import metrics
+from .dispatch import forward_submission, queue_stats
+from .form_schema import SchemaError, form_schema
+from .form_tree import (
+    ReorderError,
+    get_form_section,
+    get_form_skeleton,
+    reorder,
+    serialize_tree,
+)
+from .changefeed import (
+    MAX_LIMIT,
+    MAX_WAIT,
+    event_stream,
+    feed_tables,
+    latest_seq,
+    wait_for_changes,
+)
+from .httpcache import cached_introspection
+from .imports import TableImportError, import_file
+from .jobs import JobError, submit
+from .models import Job, SubmissionOutbox
+from .options import OptionsError, get_options
+from .rules import RuleError, apply_form_rules, form_rules
+from .renderers import EventStreamRenderer, FastJSONRenderer
+from .outbox import enqueue, is_buffered
+from .provisioning import ProvisioningError, provision_form
+from .queries import (
+    QueryError,
+    describe_table,
+    fetch_records,
+    fetch_rows,
+    parse_filters,
+)
+from .schema import is_user_table, table_names
+from .search import index_form, unindex_form, search_forms
+from .submissions import (
+    MAX_PAGE_SIZE,
+    SubmissionError,
+    query_submissions,
+    store_submission,
+)
+from .tables import resolve_model, validate_field_values
+from .tenancy import filter_tables, get_tenant, table_allowed
+
+
+def _validation_error(ve):
+    return Response(
+        {"error": ve.message_dict if hasattr(ve, "error_dict") else ve.messages},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
 
 
-class GetTablesAPIView(APIView):
-    @swagger_auto_schema(
-        operation_description="Fetch all tables from the database",
-        responses={
-            200: openapi.Response(
-                description="A list of tables in the database",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "tables": openapi.Schema(
-                            type=openapi.TYPE_ARRAY,
-                            items=openapi.Items(type=openapi.TYPE_STRING),
-                        )
-                    },
-                ),
-            )
-        },
+def _table_not_available(request, table_name):
+    """404 response when the request's tenant may not see ``table_name``."""
+    if table_allowed(get_tenant(request), table_name):
+        return None
+    return Response(
+        {"error": f"Table {table_name} is not available."},
+        status=status.HTTP_404_NOT_FOUND,
     )
+
+
+class GetTablesAPIView(APIView):
     def get(self, request, *args, **kwargs):
+        return cached_introspection(request, "tables", lambda: self.build(request))
+
+    def build(self, request):
         with connection.cursor() as cursor:
             cursor.execute("SHOW TABLES")
             tables = [table[0] for table in cursor.fetchall()]
@@ -45,7 +106,7 @@ class GetTablesAPIView(APIView):
 
         filtered_tables = [
             table
-            for table in tables
+            for table in filter_tables(get_tenant(request), tables)
             if not any(table.startswith(prefix) for prefix in excluded_prefixes)
         ]
 
@@ -53,68 +114,30 @@ class GetTablesAPIView(APIView):
 
 
 class GetFieldsAPIView(APIView):
-    @swagger_auto_schema(
-        operation_description="Fetch all fields and metadata from a specific table in the database",
-        responses={
-            200: openapi.Response(
-                description="A list of fields and metadata in the specified table",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "fields": openapi.Schema(
-                            type=openapi.TYPE_ARRAY,
-                            items=openapi.Items(
-                                type=openapi.TYPE_OBJECT,
-                                properties={
-                                    "name": openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        description="Name of the field",
-                                    ),
-                                    "type": openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        description="Data type of the field",
-                                    ),
-                                    "nullable": openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        description="Is field nullable ('YES'/'NO')",
-                                    ),
-                                    "key": openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        description="Key type ('PRI', 'MUL', '')",
-                                    ),
-                                    "default": openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        nullable=True,
-                                        description="Default value",
-                                    ),
-                                    "extra": openapi.Schema(
-                                        type=openapi.TYPE_STRING,
-                                        description="Extra information",
-                                    ),
-                                },
-                            ),
-                        )
-                    },
-                ),
-            )
-        },
-    )
     def get(self, request, table_name, *args, **kwargs):
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
+        return cached_introspection(
+            request, f"fields:{table_name}", lambda: self.build(table_name)
+        )
+
+    def build(self, table_name):
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(f"DESCRIBE {table_name}")
-                fields = [
-                    {
-                        "name": field[0],
-                        "type": field[1],
-                        "required": field[2],
-                        "key": field[3],
-                        "default": field[4],
-                    }
-                    for field in cursor.fetchall()
-                ]
+            fields = [
+                {
+                    "name": field[0],
+                    "type": field[1],
+                    "required": field[2],
+                    "key": field[3],
+                    "default": field[4],
+                }
+                for field in describe_table(table_name)
+            ]
 
             return Response({"fields": fields}, status=status.HTTP_200_OK)
+        except QueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": f"Error fetching fields for table {table_name}: {str(e)}"},
@@ -126,22 +149,167 @@ class FormListAPIView(ListAPIView):
     queryset = Form.objects.filter(is_deleted=False)
     serializer_class = FormSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().filter(tenant=get_tenant(self.request))
+
+    def list(self, request, *args, **kwargs):
+        # Same shape as FormSerializer, read with one query per tree level;
+        # each level filters on the form queryset as a subquery.
+        forms = self.get_queryset().values("id")
+        return Response(serialize_tree(0, forms), status=status.HTTP_200_OK)
+
+
+class FormSkeletonAPIView(APIView):
+    def get(self, request, form_id, *args, **kwargs):
+        data = get_form_skeleton(form_id, get_tenant(request))
+        if data is None:
+            return Response(
+                {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class FormSectionAPIView(APIView):
+    def get(self, request, form_id, section_id, *args, **kwargs):
+        data = get_form_section(form_id, section_id, get_tenant(request))
+        if data is None:
+            return Response(
+                {"error": "Section not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class FormSchemaView(APIView):
+    """The form as a JSON Schema document, revalidated by ETag."""
+
+    def get(self, request, form_id, *args, **kwargs):
+        form = (
+            Form.objects.filter(
+                tenant=get_tenant(request), is_deleted=False, id=form_id
+            )
+            .only("id", "version", "form_name")
+            .first()
+        )
+        if form is None:
+            return Response(
+                {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            compiled = form_schema(form)
+        except SchemaError as se:
+            return Response({"error": str(se)}, status=status.HTTP_400_BAD_REQUEST)
+        headers = {"ETag": compiled.etag, "Cache-Control": "no-cache"}
+        if compiled.etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(compiled.schema, status=status.HTTP_200_OK, headers=headers)
+
+
+class FormEvaluateAPIView(APIView):
+    def post(self, request, form_id, *args, **kwargs):
+        form = Form.objects.filter(
+            tenant=get_tenant(request), is_deleted=False, id=form_id
+        ).first()
+        if form is None:
+            return Response(
+                {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        values = request.data.get("values") or {}
+        changed = request.data.get("changed")
+        state = request.data.get("state")
+        if not isinstance(values, dict):
+            return Response(
+                {"error": "'values' must be an object."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if changed is not None and not (
+            isinstance(changed, list) and all(isinstance(n, str) for n in changed)
+        ):
+            return Response(
+                {"error": "'changed' must be a list of field names."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if state is not None and not (
+            isinstance(state, dict)
+            and all(
+                isinstance(state.get(key, {}), dict)
+                for key in ("visible", "required", "computed")
+            )
+        ):
+            return Response(
+                {"error": "'state' must be the object a previous call returned."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            result = form_rules(form).evaluate(values, changed, state)
+        except RuleError as re:
+            return Response({"error": str(re)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class FormReorderView(APIView):
+    """
+    Reorder the children of one node without resubmitting the form:
+    ``{"level": "rows", "parent_id": <section id>, "ids": [...]}``.
+    """
+
+    def post(self, request, form_id, *args, **kwargs):
+        form = Form.objects.filter(
+            tenant=get_tenant(request), is_deleted=False, id=form_id
+        ).first()
+        if form is None:
+            return Response(
+                {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            reorder(
+                form,
+                request.data.get("level"),
+                request.data.get("parent_id"),
+                request.data.get("ids"),
+            )
+        except ReorderError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": "Order updated."}, status=status.HTTP_200_OK)
+
+
+class FormSearchAPIView(APIView):
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"error": "Query parameter 'q' is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 50)), 500))
+        except ValueError:
+            return Response(
+                {"error": "'limit' must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        forms = search_forms(query, limit=limit, tenant=get_tenant(request)).values(
+            "id", "form_name", "table_name"
+        )
+        return Response({"forms": list(forms)}, status=status.HTTP_200_OK)
+
 
 class FormListCreateView(APIView):
-    @swagger_auto_schema(request_body=FormCreateSerializer)
     def post(self, request):
         serializer = FormCreateSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            form = serializer.save(tenant=get_tenant(request))
+            index_form(form)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class FormListUpdateView(APIView):
-    @swagger_auto_schema(request_body=FormUpdateSerializer)
     def put(self, request, form_id):
         try:
-            form_instance = Form.objects.get(pk=form_id)
+            form_instance = Form.objects.get(pk=form_id, tenant=get_tenant(request))
             print("form instance", form_instance)
         except Form.DoesNotExist:
             return Response(
@@ -149,32 +317,23 @@ class FormListUpdateView(APIView):
             )
         serializer = FormUpdateSerializer(form_instance, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            form = serializer.save()
+            index_form(form)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class FormSoftDeleteView(APIView):
-    @swagger_auto_schema(
-        operation_description="Delete Form from db",
-        responses={
-            200: openapi.Response(
-                description="A Form got deleted.",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                ),
-            )
-        },
-    )
     def delete(self, request, form_id, *args, **kwargs):
         if not form_id:
             return Response(
                 {"error": "Form ID is required."}, status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            form = Form.objects.get(id=form_id)
+            form = Form.objects.get(id=form_id, tenant=get_tenant(request))
             form.is_deleted = True
             form.save()
+            unindex_form(form.id)
             return Response(
                 {"message": "Form soft-deleted successfully."},
                 status=status.HTTP_200_OK,
@@ -190,26 +349,6 @@ class DynamicTableRecordView(APIView):
     Dynamically creates or updates data in any table by table_name and fields.
     """
 
-    @swagger_auto_schema(
-        operation_description="Create or update record in a dynamic table",
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            properties={
-                "table_name": openapi.Schema(type=openapi.TYPE_STRING),
-                "field_values": openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    additional_properties=openapi.Schema(type=openapi.TYPE_STRING),
-                ),
-            },
-            required=["table_name", "field_values"],
-        ),
-        responses={
-            201: "Created",
-            200: "Updated",
-            400: "Bad Request",
-            404: "Not Found",
-        },
-    )
     def post(self, request):
         table_name = request.data.get("table_name")
         field_values = request.data.get("field_values")
@@ -219,28 +358,102 @@ class DynamicTableRecordView(APIView):
                 {"error": "Both 'table_name' and 'field_values' are required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if not isinstance(field_values, dict):
+            return Response(
+                {"error": "'field_values' must be an object."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        form = None
+        form_id = request.data.get("form_id")
+        if form_id:
+            form = Form.objects.filter(
+                tenant=get_tenant(request), is_deleted=False, id=form_id
+            ).first()
+            if form is None:
+                return Response(
+                    {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+                )
+            # The same checks clients run against form/<id>/schema/.
+            try:
+                schema_errors = form_schema(form).validate(field_values)
+            except SchemaError as se:
+                return Response({"error": str(se)}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                field_values, errors = apply_form_rules(form, field_values)
+            except RuleError as re:
+                if schema_errors:
+                    return Response(
+                        {"error": schema_errors}, status=status.HTTP_400_BAD_REQUEST
+                    )
+                return Response({"error": str(re)}, status=status.HTTP_400_BAD_REQUEST)
+            errors = {**schema_errors, **errors}
+            if errors:
+                return Response({"error": errors}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            app_label, model_name = table_name.split("_")
-            model = apps.get_model(app_label, model_name)
+            model = resolve_model(table_name)
         except Exception:
+            # Forms without a backing model go to the generic submission store.
+            if form is not None and form.table_name == table_name:
+                return self.store(form, field_values)
             return Response(
                 {"error": "Invalid table name."}, status=status.HTTP_400_BAD_REQUEST
             )
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
+
+        if is_buffered(table_name, request.data.get("buffered")):
+            try:
+                validate_field_values(model, field_values)
+            except ValidationError as ve:
+                return _validation_error(ve)
+            # Forwarded by the drain once the row is written.
+            entry = enqueue(table_name, field_values, get_tenant(request), form)
+            return Response(
+                {"message": "Submission queued.", "ticket": str(entry.ticket)},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
         try:
-            instance = model.objects.create(**field_values)
+            # The row and its delivery commit together or not at all.
+            with transaction.atomic():
+                instance = model.objects.create(**field_values)
+                self.forward(form, table_name, field_values, record_id=instance.pk)
             return Response(
                 {"message": "Record created successfully.", "id": instance.id},
                 status=status.HTTP_201_CREATED,
             )
         except FieldError as fe:
             return Response({"error": str(fe)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as ve:
+            # e.g. Product's parameters/section_definition are not valid JSON.
+            return _validation_error(ve)
         except Exception as e:
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def forward(self, form, table_name, field_values, **ids):
+        """Queue the submission for the form's submit_api_route."""
+        if form is not None:
+            forward_submission(form, table_name, field_values, **ids)
+
+    def store(self, form, field_values):
+        try:
+            with transaction.atomic():
+                submission = store_submission(form, field_values)
+                self.forward(
+                    form, form.table_name, field_values, submission_id=submission.id
+                )
+        except SubmissionError as se:
+            return Response({"error": str(se)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"message": "Submission stored.", "submission_id": submission.id},
+            status=status.HTTP_201_CREATED,
+        )
+
     def put(self, request):
         table_name = request.data.get("table_name")
         field_values = request.data.get("field_values")
@@ -251,9 +464,11 @@ class DynamicTableRecordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
         try:
-            app_label, model_name = table_name.split("_")
-            model = apps.get_model(app_label, model_name)
+            model = resolve_model(table_name)
         except Exception:
             return Response(
                 {"error": "Invalid table name."}, status=status.HTTP_400_BAD_REQUEST
@@ -274,34 +489,131 @@ class DynamicTableRecordView(APIView):
             )
         except FieldError as fe:
             return Response({"error": str(fe)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as ve:
+            return _validation_error(ve)
         except Exception as e:
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
-class GetEmptyTablesAPIView(APIView):
-    @swagger_auto_schema(
-        operation_description="Fetch all tables in the database that have no records",
-        responses={
-            200: openapi.Response(
-                description="A list of empty tables in the database",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "empty_tables": openapi.Schema(
-                            type=openapi.TYPE_ARRAY,
-                            items=openapi.Items(type=openapi.TYPE_STRING),
-                        )
-                    },
-                ),
+class FormProvisionView(APIView):
+    """
+    Create or update the form's table_name as a typed table. With dry_run
+    the SQL is returned instead of executed.
+    """
+
+    def post(self, request, form_id, *args, **kwargs):
+        form = Form.objects.filter(
+            tenant=get_tenant(request), is_deleted=False, id=form_id
+        ).first()
+        if form is None:
+            return Response(
+                {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
             )
-        },
-    )
+        try:
+            operations, statements = provision_form(
+                form,
+                dry_run=bool(request.data.get("dry_run")),
+                drop_columns=bool(request.data.get("drop_columns")),
+            )
+        except ProvisioningError as pe:
+            return Response({"error": str(pe)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "table_name": form.table_name,
+                "operations": [list(operation) for operation in operations],
+                "statements": statements,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class FormSubmissionsView(APIView):
+    """
+    Keyset-paged listing of a form's stored submissions. Any query parameter
+    other than ``after`` and ``limit`` filters on an indexed field.
+    """
+
+    def get(self, request, form_id, *args, **kwargs):
+        form = Form.objects.filter(
+            tenant=get_tenant(request), is_deleted=False, id=form_id
+        ).first()
+        if form is None:
+            return Response(
+                {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        params = request.query_params
+        filters = {
+            key: value for key, value in params.items() if key not in ("after", "limit")
+        }
+        try:
+            after = int(params.get("after", 0))
+            # Clamped as query_submissions does, so "next" sees the page size.
+            limit = max(1, min(int(params.get("limit", 100)), MAX_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {"error": "'after' and 'limit' must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            results = list(query_submissions(form, filters, after, limit))
+        except SubmissionError as se:
+            return Response({"error": str(se)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "results": results,
+                "next": results[-1]["id"] if len(results) == limit else None,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MetricsView(APIView):
     def get(self, request, *args, **kwargs):
-        with connection.cursor() as cursor:
-            cursor.execute("SHOW TABLES")
-            tables = [table[0] for table in cursor.fetchall()]
+        return Response(
+            {"counters": metrics.snapshot(), "dispatch": queue_stats()},
+            status=status.HTTP_200_OK,
+        )
+
+
+class SubmissionStatusView(APIView):
+    def get(self, request, ticket, *args, **kwargs):
+        try:
+            entry = SubmissionOutbox.objects.get(
+                ticket=ticket, tenant=get_tenant(request)
+            )
+        except SubmissionOutbox.DoesNotExist:
+            return Response(
+                {"error": "Ticket not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(
+            {
+                "ticket": str(entry.ticket),
+                "table_name": entry.table_name,
+                "status": entry.status,
+                "record_id": entry.record_id,
+                "error": entry.error,
+                "created_at": entry.created_at,
+                "processed_at": entry.processed_at,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class GetEmptyTablesAPIView(APIView):
+    def get(self, request, *args, **kwargs):
+        tables = [FORM_TABLE] + [
+            table
+            for table in filter_tables(get_tenant(request), table_names())
+            if is_user_table(table)
+        ]
+        return cached_introspection(
+            request, "empty", lambda: self.build(request), tables
+        )
+
+    def build(self, request):
+        tables = table_names()
 
         # Exclude system tables
         excluded_prefixes = [
@@ -326,51 +638,312 @@ class GetEmptyTablesAPIView(APIView):
         # Filter user-defined tables
         user_tables = [
             table
-            for table in tables
+            for table in filter_tables(get_tenant(request), tables)
             if not any(table.startswith(prefix) for prefix in excluded_prefixes)
             and table not in excluded_form_tables
         ]
 
-        # Find empty tables
+        # Find empty tables, probing one row each rather than counting
+        qn = connection.ops.quote_name
         empty_tables = []
-        with connection.cursor() as cursor:
-            for table in user_tables:
-                try:
-                    cursor.execute("SELECT COUNT(*) FROM `" + table + "`")
-                    count = cursor.fetchone()[0]
-                    if count == 0:
+        try:
+            with query_budget("empty_tables"), connection.cursor() as cursor:
+                for table in user_tables:
+                    try:
+                        cursor.execute(f"SELECT 1 FROM {qn(table)} LIMIT 1")
+                    except QueryTimeout:
+                        raise
+                    except Exception as e:
+                        if is_timeout(e):
+                            raise
+                        continue
+                    if cursor.fetchone() is None:
                         empty_tables.append(table)
-                except Exception as e:
-                    continue
+        except QueryTimeout as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
 
         return Response({"tables": empty_tables}, status=status.HTTP_200_OK)
 
 
 class GetTableDataAPIView(APIView):
-    @swagger_auto_schema(
-        operation_description="Fetch all data from a specific table",
-        manual_parameters=[
-            openapi.Parameter(
-                "table_name",
-                openapi.IN_PATH,
-                type=openapi.TYPE_STRING,
-                description="Name of the table to fetch data from",
-            )
-        ],
-        responses={
-            200: openapi.Response(description="Success"),
-            400: openapi.Response(description="Invalid table name or query error"),
-        },
-    )
     def get(self, request, table_name):
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
+        params = request.query_params
+        fields = [name for name in params.get("fields", "").split(",") if name]
+        max_rows = budget("table_data").get("MAX_ROWS")
         try:
-            with connection.cursor() as cursor:
-                cursor.execute(f"SELECT * FROM {table_name}")
-                columns = [col[0] for col in cursor.description]
-                data = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            limit = params.get("limit")
+            limit = None if limit is None else max(1, int(limit))
+        except ValueError:
+            return Response(
+                {"error": "'limit' must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if max_rows is not None:
+            # One row past the cap tells an oversized result from a full one.
+            limit = max_rows + 1 if limit is None else min(limit, max_rows)
+        try:
+            with query_budget("table_data"):
+                data = fetch_rows(table_name, fields, parse_filters(params), limit)
+            check_row_count("table_data", len(data))
             return Response({"data": data}, status=status.HTTP_200_OK)
+        except QueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except QueryTimeout as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        except RowLimitExceeded as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
         except Exception as e:
             return Response(
                 {"error": f"Error fetching data from {table_name}: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+
+def _record_fields(request):
+    return [name for name in request.query_params.get("fields", "").split(",") if name]
+
+
+class TableRecordsAPIView(APIView):
+    """Records by primary key: ``?ids=1,2,3`` with optional ``fields=``."""
+
+    def get(self, request, table_name, *args, **kwargs):
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
+        ids = [i for i in request.query_params.get("ids", "").split(",") if i]
+        try:
+            records, missing = fetch_records(table_name, ids, _record_fields(request))
+        except QueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"data": records, "missing": missing}, status=status.HTTP_200_OK
+        )
+
+
+class TableRecordAPIView(APIView):
+    def get(self, request, table_name, record_id, *args, **kwargs):
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
+        try:
+            records, _ = fetch_records(table_name, [record_id], _record_fields(request))
+        except QueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not records:
+            return Response(
+                {"error": "Record not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(records[0], status=status.HTTP_200_OK)
+
+
+class AggregateTableAPIView(APIView):
+    def get(self, request, table_name, *args, **kwargs):
+        try:
+            spec = parse_spec(request.query_params)
+            with query_budget("aggregate"):
+                rows, cached = aggregate(table_name, spec, get_tenant(request))
+        except QueryError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except QueryTimeout as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return Response({"results": rows, "cached": cached}, status=status.HTTP_200_OK)
+
+
+class FieldOptionsAPIView(APIView):
+    def get(self, request, table_name, field_name, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", 50))
+        except ValueError:
+            return Response(
+                {"error": "'limit' must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            etag, payload = get_options(
+                table_name,
+                field_name,
+                request.query_params.get("q", ""),
+                limit,
+                get_tenant(request),
+            )
+        except OptionsError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(payload, status=status.HTTP_200_OK, headers={"ETag": etag})
+
+
+class TableChangesAPIView(APIView):
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [EventStreamRenderer]
+
+    def get(self, request, table_name, *args, **kwargs):
+        if table_name not in feed_tables() or not table_allowed(
+            get_tenant(request), table_name
+        ):
+            return Response(
+                {"error": f"No change feed for table {table_name}."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            since = int(
+                request.headers.get("Last-Event-ID")
+                or request.query_params.get("since", 0)
+            )
+            wait = float(request.query_params.get("wait", 0))
+            limit = int(request.query_params.get("limit", MAX_LIMIT))
+        except ValueError:
+            return Response(
+                {"error": "'since', 'wait' and 'limit' must be numbers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not math.isfinite(wait):
+            return Response(
+                {"error": "'wait' must be a finite number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        wait = max(0, min(wait, MAX_WAIT))
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        if request.accepted_renderer.format == EventStreamRenderer.format:
+            renderer = FastJSONRenderer()
+            response = StreamingHttpResponse(
+                event_stream(
+                    table_name,
+                    since,
+                    wait or 30,
+                    lambda change: renderer.render(change).decode(),
+                ),
+                content_type=EventStreamRenderer.media_type,
+            )
+            response["Cache-Control"] = "no-cache"
+            return response
+
+        changes = wait_for_changes(table_name, since, wait, limit)
+        last_seq = changes[-1]["id"] if changes else max(since, latest_seq(table_name))
+        return Response(
+            {"changes": changes, "last_seq": last_seq}, status=status.HTTP_200_OK
+        )
+
+
+def _job_data(request, job):
+    data = {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "download_url": None,
+    }
+    if job.status == Job.STATUS_DONE and job.result_file:
+        data["download_url"] = request.build_absolute_uri(
+            reverse("job-download", args=[job.id])
+        )
+    return data
+
+
+class JobSubmitView(APIView):
+    def post(self, request, *args, **kwargs):
+        params = request.data.get("params") or {}
+        if not isinstance(params, dict):
+            return Response(
+                {"error": "'params' must be an object."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            job = submit(request.data.get("kind"), params, get_tenant(request))
+        except JobError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(_job_data(request, job), status=status.HTTP_202_ACCEPTED)
+
+
+class JobStatusView(APIView):
+    def get(self, request, job_id, *args, **kwargs):
+        try:
+            job = Job.objects.get(id=job_id, tenant=get_tenant(request))
+        except Job.DoesNotExist:
+            return Response(
+                {"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(_job_data(request, job), status=status.HTTP_200_OK)
+
+
+class JobDownloadView(APIView):
+    def get(self, request, job_id, *args, **kwargs):
+        job = Job.objects.filter(
+            id=job_id, tenant=get_tenant(request), status=Job.STATUS_DONE
+        ).first()
+        if job is None or not job.result_file:
+            return Response(
+                {"error": "Job result not available."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return FileResponse(
+            job.result_file.open("rb"),
+            as_attachment=True,
+            filename=job.result_file.name.rsplit("/", 1)[-1],
+        )
+
+
+class TableImportView(APIView):
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, table_name, *args, **kwargs):
+        uploaded = request.FILES.get("file")
+        if uploaded is None:
+            return Response(
+                {"error": "A CSV or XLSX 'file' is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        denied = _table_not_available(request, table_name)
+        if denied:
+            return denied
+        try:
+            model = resolve_model(table_name)
+        except Exception:
+            return Response(
+                {"error": "Invalid table name."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        form = None
+        form_id = request.data.get("form_id")
+        if form_id:
+            form = Form.objects.filter(
+                tenant=get_tenant(request), is_deleted=False, id=form_id
+            ).first()
+            if form is None:
+                return Response(
+                    {"error": "Form not found."}, status=status.HTTP_404_NOT_FOUND
+                )
+
+        chunk_size = request.data.get("chunk_size")
+        try:
+            chunk_size = None if chunk_size in (None, "") else int(chunk_size)
+            if chunk_size is not None and chunk_size < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "'chunk_size' must be a positive integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            report = import_file(model, uploaded, form, chunk_size)
+        except (TableImportError, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
@@ -0,0 +1,45 @@
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+def warm_caches():
+    """Fill the schema catalog and the dropdown option sets."""
+    from .options import OptionsError, get_options
+    from .schema import is_user_table, table_columns, table_names
+
+    for table_name in table_names():
+        if is_user_table(table_name):
+            table_columns(table_name)
+
+    for table_name, fields in getattr(settings, "OPTION_SOURCES", {}).items():
+        for field_name in fields:
+            try:
+                get_options(table_name, field_name)
+            except OptionsError:
+                logger.warning("No options for %s.%s", table_name, field_name)
+
+
+def warm_caches_in_background():
+    """
+    Warm the caches from a daemon thread once the app registry is ready, so
+    a worker does not block on the database while booting.
+    """
+
+    def run():
+        while not apps.ready:
+            time.sleep(0.01)
+        try:
+            warm_caches()
+        except Exception:
+            logger.exception("Cache warm-up failed")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name="jsonformapp-warmup", daemon=True).start()
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ProductConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "product"
+
+    def ready(self):
+        from .definitions import product_saved
+        from .models import Product
+
+        post_save.connect(product_saved, sender=Product, dispatch_uid="product_defs")
+        post_delete.connect(product_saved, sender=Product, dispatch_uid="product_defs")
@@ -0,0 +1,137 @@
+"""
+Parsed ``Product.parameters`` and ``Product.section_definition``.
+
+Both are JSON text. Product.save() and Product.objects.bulk_create() always
+derive the ``parameters_data``/``section_data`` JSON columns and a
+``definition_hash`` over their canonical form from it, via
+``parse_definitions``, so those columns are never taken from the caller;
+readers use them and never re-parse the text. Invalid text is a
+ValidationError, raised only when the text was changed, so rows predating
+the validation stay editable (with empty parsed columns). Queryset
+``update()`` bypasses both, so write these fields through model instances.
+
+``fetch_definitions`` serves the parsed structures by product_code from two
+cache levels: product_code -> hash (dropped through the invalidation bus
+when a product is saved or deleted, and expiring after HASH_TTL to cover
+renamed codes) and hash ->
+parsed definitions. The second is content-addressed, so
+it never goes stale and products with identical definitions share an entry.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from jsonformapp import bus
+
+from .models import Product
+
+HASH_KEY = "product:definition-hash:{}"
+DEFINITIONS_KEY = "product:definitions:{}"
+HASH_TTL = 3600
+MAX_CODES = 500
+
+
+class DefinitionError(ValueError):
+    pass
+
+
+def _parse(name, text, expected):
+    if text is None or not text.strip():
+        return None
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise DefinitionError(f"'{name}' is not valid JSON: {e}")
+    if not isinstance(value, expected):
+        kinds = " or ".join(
+            {dict: "an object", list: "an array"}[kind] for kind in expected
+        )
+        raise DefinitionError(f"'{name}' must be {kinds}.")
+    return value
+
+
+def parse_definitions(parameters, section_definition):
+    """
+    Validate and parse the two text fields. Returns ``(parameters_data,
+    section_data, definition_hash)``; the hash is empty when both are blank.
+    """
+    parameters_data = _parse("parameters", parameters, (dict,))
+    section_data = _parse("section_definition", section_definition, (dict, list))
+    if parameters_data is None and section_data is None:
+        return None, None, ""
+    canonical = json.dumps(
+        [parameters_data, section_data], sort_keys=True, separators=(",", ":")
+    )
+    return parameters_data, section_data, hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def product_saved(sender, instance, **kwargs):
+    """
+    post_save/post_delete receiver for Product. Publishes once the write
+    commits, so no worker reloads the row before it is visible.
+    """
+    code = instance.product_code
+    transaction.on_commit(lambda: bus.publish("product", code))
+
+
+def forget_product(product_code):
+    """Bus handler: drop the product_code -> hash entry."""
+    cache.delete(HASH_KEY.format(product_code))
+
+
+bus.subscribe("product", forget_product)
+
+
+def fetch_definitions(codes):
+    """
+    Parsed definitions for ``codes`` as ``(rows, missing_codes)`` in request
+    order, where each row is ``{"product_code", "hash", "parameters",
+    "section_definition"}``.
+    """
+    codes = list(dict.fromkeys(code.strip() for code in codes if code.strip()))
+    if not codes:
+        raise DefinitionError("At least one product code is required.")
+    if len(codes) > MAX_CODES:
+        raise DefinitionError(f"At most {MAX_CODES} product codes per request.")
+
+    hash_keys = {HASH_KEY.format(code): code for code in codes}
+    hashes = {hash_keys[key]: h for key, h in cache.get_many(hash_keys).items()}
+    unknown = [code for code in codes if code not in hashes]
+    if unknown:
+        fetched = dict(
+            Product.objects.filter(product_code__in=unknown).values_list(
+                "product_code", "definition_hash"
+            )
+        )
+        cache.set_many({HASH_KEY.format(c): h for c, h in fetched.items()}, HASH_TTL)
+        hashes.update(fetched)
+
+    wanted = {DEFINITIONS_KEY.format(h): h for h in set(hashes.values()) if h}
+    definitions = {wanted[key]: d for key, d in cache.get_many(wanted).items()}
+    uncached = [code for code, h in hashes.items() if h and h not in definitions]
+    if uncached:
+        loaded = {}
+        for code, h, parameters, sections in Product.objects.filter(
+            product_code__in=uncached
+        ).values_list(
+            "product_code", "definition_hash", "parameters_data", "section_data"
+        ):
+            # The row wins over a hash cached before a concurrent save.
+            hashes[code] = h
+            loaded[h] = {"parameters": parameters, "section_definition": sections}
+        cache.set_many({DEFINITIONS_KEY.format(h): d for h, d in loaded.items()}, None)
+        definitions.update(loaded)
+
+    empty = {"parameters": None, "section_definition": None}
+    rows = [
+        {
+            "product_code": code,
+            "hash": hashes[code],
+            **definitions.get(hashes[code], empty),
+        }
+        for code in codes
+        if code in hashes
+    ]
+    return rows, [code for code in codes if code not in hashes]
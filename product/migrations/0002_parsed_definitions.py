@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:19
+
+from django.db import migrations, models
+
+
+def parse_existing(apps, schema_editor):
+    from product.definitions import DefinitionError, parse_definitions
+
+    Product = apps.get_model("product", "Product")
+    for product in Product.objects.exclude(
+        parameters__isnull=True, section_definition__isnull=True
+    ).iterator():
+        try:
+            parsed = parse_definitions(product.parameters, product.section_definition)
+        except DefinitionError:
+            # Left unparsed until the product is fixed and saved again.
+            continue
+        product.parameters_data, product.section_data, product.definition_hash = parsed
+        product.save(
+            update_fields=["parameters_data", "section_data", "definition_hash"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="definition_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="parameters_data",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="section_data",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(parse_existing, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,20 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
+DEFINITION_FIELDS = ("parameters", "section_definition")
+PARSED_FIELDS = ("parameters_data", "section_data", "definition_hash")
+
+
+class ProductQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(), so parse here; see definitions.py.
+        objs = list(objs)
+        for obj in objs:
+            obj.parse_definitions()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Product(models.Model):
     CURRENCY_CHOICES = [
         ("INR", "Indian Rupee"),
@@ -44,6 +58,75 @@ class Product(models.Model):
     )
     section_definition = models.TextField(blank=True, null=True)
     wording_url = models.URLField(max_length=255, blank=True)
+    # Parsed from parameters/section_definition on save; see definitions.py.
+    parameters_data = models.JSONField(null=True, blank=True, editable=False)
+    section_data = models.JSONField(null=True, blank=True, editable=False)
+    definition_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
 
     def __str__(self):
         return self.product_name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_definitions = {
+            name: instance.__dict__[name]
+            for name in DEFINITION_FIELDS
+            if name in instance.__dict__
+        }
+        return instance
+
+    def definitions_changed(self):
+        """Whether the definition text differs from what was loaded."""
+        loaded = getattr(self, "_loaded_definitions", None)
+        if loaded is None:
+            return True
+        return any(
+            name in self.__dict__
+            and (name not in loaded or self.__dict__[name] != loaded[name])
+            for name in DEFINITION_FIELDS
+        )
+
+    def parse_definitions(self):
+        """Fill the parsed fields; ValidationError if the text is invalid."""
+        from .definitions import DefinitionError, parse_definitions
+
+        try:
+            self.parameters_data, self.section_data, self.definition_hash = (
+                parse_definitions(self.parameters, self.section_definition)
+            )
+        except DefinitionError as e:
+            raise ValidationError(str(e))
+
+    def clean(self):
+        # Rows saved before definitions were validated may hold invalid
+        # text; they stay editable as long as that text is left alone.
+        if self.definitions_changed():
+            self.parse_definitions()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        writes_definitions = update_fields is None or not set(update_fields).isdisjoint(
+            DEFINITION_FIELDS + PARSED_FIELDS
+        )
+        if writes_definitions:
+            # The parsed fields are always derived from the text, never taken
+            # from the caller.
+            try:
+                self.parse_definitions()
+            except ValidationError:
+                if self.definitions_changed():
+                    raise
+                # Unchanged legacy text stays unparsed, as the backfill left it.
+                self.parameters_data, self.section_data = None, None
+                self.definition_hash = ""
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *PARSED_FIELDS}
+        super().save(*args, **kwargs)
+        self._loaded_definitions = {
+            name: self.__dict__[name]
+            for name in DEFINITION_FIELDS
+            if name in self.__dict__
+        }
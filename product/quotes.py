@@ -0,0 +1,178 @@
+"""
+Batch fee quotes over active products.
+
+Fees are held in a FeeTable: one ``array('q')`` per fee column of scaled
+integers (hundredths, matching the columns' two decimal places) plus a
+product_code -> row index. The table is built once per process and rebuilt
+when the product table's write generation changes (the invalidation bus
+carries bumps from other workers, including bulk writes that send no
+signals), when a product change is reported, and at least every MAX_AGE
+seconds. Quoting is integer arithmetic over those arrays with ROUND_HALF_UP
+done in integers, so results equal the Decimal computation exactly.
+
+For a base amount B (rounded half-up to cents):
+
+    agency_commission = B * agency_commission% / 100      (half-up, cents)
+    cancellation_fee  = B * cancellation_fee% / 100       (half-up, cents)
+    total = B + platform_fee + admin_fee + assurance_charge + agency_commission
+
+Missing fees count as zero. The cancellation fee is reported but not
+included in the total. Money is returned as Decimal strings ("12.50").
+"""
+
+import threading
+import time
+from array import array
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from jsonformapp import bus
+from jsonformapp.caching import table_generation
+
+from .models import Product
+
+SCALE = 100
+FLAT_FEES = ("platform_fee", "admin_fee", "assurance_charge")
+PERCENT_FEES = ("agency_commission", "cancellation_fee")
+MAX_ITEMS = 10000
+MAX_AGE = 300
+
+
+class QuoteError(ValueError):
+    pass
+
+
+def to_cents(value):
+    """Decimal-compatible value -> integer hundredths, rounded half-up."""
+    if value is None:
+        return 0
+    try:
+        value = Decimal(str(value))
+        if not value.is_finite():
+            raise InvalidOperation
+        # quantize raises InvalidOperation past the context precision (1e30).
+        return int((value * SCALE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise QuoteError(f"'{value}' is not a valid amount.")
+
+
+def from_cents(cents):
+    """Hundredths -> Decimal string, so clients get the exact value."""
+    return str(Decimal(cents).scaleb(-2))
+
+
+def _percent_of(base_cents, percent_hundredths):
+    """``base * percent / 100`` in cents, rounded half-up (base >= 0)."""
+    numerator = base_cents * percent_hundredths
+    if numerator >= 0:
+        return (numerator + 5000) // 10000
+    return -((-numerator + 5000) // 10000)
+
+
+class FeeTable:
+    def __init__(self, rows):
+        self.index = {}
+        self.currency = []
+        self.columns = {name: array("q") for name in FLAT_FEES + PERCENT_FEES}
+        for position, (code, currency, *fees) in enumerate(rows):
+            self.index[code] = position
+            self.currency.append(currency)
+            for name, value in zip(FLAT_FEES + PERCENT_FEES, fees):
+                self.columns[name].append(to_cents(value))
+
+    @classmethod
+    def load(cls):
+        return cls(
+            Product.objects.filter(is_active=True)
+            .order_by("id")
+            .values_list("product_code", "currency", *FLAT_FEES, *PERCENT_FEES)
+        )
+
+    def quote(self, items):
+        """
+        Quote ``[(product_code, amount), ...]``. Returns ``(results, errors)``
+        where errors are ``{"index", "error"}`` for the rejected items.
+        """
+        index, currency = self.index, self.currency
+        platform, admin, assurance = (self.columns[name] for name in FLAT_FEES)
+        commission, cancellation = (self.columns[name] for name in PERCENT_FEES)
+
+        results, errors = [], []
+        for position, (code, amount) in enumerate(items):
+            if not isinstance(code, str):
+                errors.append(
+                    {"index": position, "error": "'product_code' must be a string."}
+                )
+                continue
+            row = index.get(code)
+            if row is None:
+                errors.append({"index": position, "error": "Unknown product."})
+                continue
+            try:
+                base = to_cents(amount)
+            except QuoteError as e:
+                errors.append({"index": position, "error": str(e)})
+                continue
+            if base < 0:
+                errors.append({"index": position, "error": "Negative amount."})
+                continue
+            agency = _percent_of(base, commission[row])
+            total = base + platform[row] + admin[row] + assurance[row] + agency
+            results.append(
+                {
+                    "product_code": code,
+                    "currency": currency[row],
+                    "amount": from_cents(base),
+                    "platform_fee": from_cents(platform[row]),
+                    "admin_fee": from_cents(admin[row]),
+                    "assurance_charge": from_cents(assurance[row]),
+                    "agency_commission": from_cents(agency),
+                    "cancellation_fee": from_cents(
+                        _percent_of(base, cancellation[row])
+                    ),
+                    "total": from_cents(total),
+                }
+            )
+        return results, errors
+
+
+_lock = threading.Lock()
+_table = None
+
+
+def fee_table():
+    """
+    The process's FeeTable, rebuilt after any write to product_product and
+    at least every MAX_AGE seconds, in case an invalidation was lost.
+    """
+    global _table
+    generation = table_generation(Product._meta.db_table)
+    now = time.monotonic()
+    table = _table
+    if table is None or table[0] != generation or now - table[1] > MAX_AGE:
+        with _lock:
+            table = _table
+            if table is None or table[0] != generation or now - table[1] > MAX_AGE:
+                table = _table = (generation, now, FeeTable.load())
+    return table[2]
+
+
+def forget_fee_table(product_code):
+    """Bus handler: a product was written in some worker."""
+    global _table
+    _table = None
+
+
+bus.subscribe("product", forget_fee_table)
+
+
+def quote_many(items):
+    if not isinstance(items, list) or not items:
+        raise QuoteError("'items' must be a non-empty list.")
+    if len(items) > MAX_ITEMS:
+        raise QuoteError(f"At most {MAX_ITEMS} items per request.")
+    pairs = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise QuoteError("Each item needs 'product_code' and 'amount'.")
+        pairs.append((item.get("product_code"), item.get("amount")))
+    return fee_table().quote(pairs)
@@ -1,3 +1,181 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from jsonformapp.caching import forget_rows
+from rest_framework.test import APIClient
+
+from . import quotes
+from .models import Product
+
+
+class BatchQuoteTests(TestCase):
+    def setUp(self):
+        Product.objects.create(
+            product_name="Cover",
+            product_code="C1",
+            currency="INR",
+            platform_fee="1.50",
+            agency_commission="10.00",
+        )
+
+    def quote(self, items):
+        return APIClient().post(
+            "/api/v1/product/quotes/", {"items": items}, format="json"
+        )
+
+    def test_quotes_and_rejects_items_individually(self):
+        response = self.quote(
+            [
+                {"product_code": "C1", "amount": "100.005"},
+                {"product_code": "C1", "amount": "1e30"},
+                {"product_code": ["C1"], "amount": "1"},
+                {"product_code": 7, "amount": "1"},
+                {"product_code": "XX", "amount": "1"},
+            ]
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        [result] = response.data["results"]
+        self.assertEqual(result["amount"], "100.01")
+        self.assertEqual(result["agency_commission"], "10.00")
+        self.assertEqual(result["total"], "111.51")
+        self.assertEqual(
+            [error["index"] for error in response.data["errors"]], [1, 2, 3, 4]
+        )
+
+
+class FeeTableTests(TestCase):
+    def setUp(self):
+        # The table outlives test rollbacks.
+        quotes.forget_fee_table(None)
+
+    def product(self, code):
+        return Product(
+            product_name=code, product_code=code, currency="INR", platform_fee="1"
+        )
+
+    def quote(self, code):
+        results, errors = quotes.quote_many([{"product_code": code, "amount": "1"}])
+        return results
+
+    def test_bulk_writes_reported_by_the_bus_rebuild_the_table(self):
+        Product.objects.bulk_create([self.product("A1")])
+        self.assertTrue(self.quote("A1"))
+        Product.objects.bulk_create([self.product("B1")])
+        self.assertFalse(self.quote("B1"))
+        # As run when another worker's import or outbox drain publishes.
+        forget_rows("product_product")
+        self.assertTrue(self.quote("B1"))
+
+    def test_table_expires(self):
+        Product.objects.bulk_create([self.product("A1")])
+        self.quote("A1")
+        Product.objects.bulk_create([self.product("B1")])
+        later = time.monotonic() + quotes.MAX_AGE + 1
+        with mock.patch("product.quotes.time.monotonic", return_value=later):
+            self.assertTrue(self.quote("B1"))
+
+
+class DefinitionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def record(self, method, **field_values):
+        return getattr(self.client, method)(
+            "/api/v1/form/field-values-submission/",
+            {"table_name": "product_product", "field_values": field_values},
+            format="json",
+        )
+
+    def test_invalid_definitions_are_bad_requests(self):
+        response = self.record(
+            "post",
+            product_name="A",
+            product_code="A1",
+            currency="INR",
+            parameters="{nope",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("'parameters' is not valid JSON", str(response.data))
+
+        product = Product.objects.create(
+            product_name="B", product_code="B1", currency="INR"
+        )
+        response = self.record("put", id=product.id, section_definition="1")
+        self.assertEqual(response.status_code, 400)
+
+    def test_parsed_fields_are_derived_from_the_text(self):
+        product = Product.objects.create(
+            product_name="A", product_code="A1", currency="INR", parameters='{"a": 1}'
+        )
+        response = self.record(
+            "put",
+            id=product.id,
+            parameters_data={"a": 99},
+            definition_hash="bogus",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        response = self.client.get("/api/v1/product/definitions/", {"codes": "A1"})
+        [row] = response.data["products"]
+        self.assertEqual(row["parameters"], {"a": 1})
+        self.assertEqual(row["hash"], product.definition_hash)
+
+    def test_bulk_create_parses(self):
+        [product] = Product.objects.bulk_create(
+            [
+                Product(
+                    product_name="A",
+                    product_code="A1",
+                    currency="INR",
+                    parameters='{"b": 1, "a": 2}',
+                )
+            ]
+        )
+        stored = Product.objects.get(pk=product.pk)
+        self.assertEqual(stored.parameters_data, {"a": 2, "b": 1})
+        self.assertEqual(len(stored.definition_hash), 64)
+
+    def test_rows_with_legacy_invalid_text_stay_editable(self):
+        product = Product.objects.create(
+            product_name="A", product_code="A1", currency="INR"
+        )
+        # As left by the backfill migration for unparseable text.
+        Product.objects.filter(pk=product.pk).update(parameters="{nope")
+        product = Product.objects.get(pk=product.pk)
+        product.is_active = False
+        product.full_clean()
+        product.save()
+        response = self.record("put", id=product.id, product_name="Renamed")
+        self.assertEqual(response.status_code, 200, response.data)
+
+        product = Product.objects.get(pk=product.pk)
+        product.parameters = "{still nope"
+        with self.assertRaises(ValidationError):
+            product.save()
+
+
+@override_settings(
+    TENANTS={"travel": {"tables": ["product_product"]}, "wordings": {"tables": []}}
+)
+class TenantTests(TestCase):
+    def test_products_follow_the_table_allow_list(self):
+        client = APIClient()
+        for tenant, quotes_status, definitions_status in (
+            ("travel", 400, 200),
+            ("wordings", 404, 404),
+        ):
+            with self.subTest(tenant=tenant):
+                response = client.post(
+                    "/api/v1/product/quotes/",
+                    {"items": []},
+                    format="json",
+                    HTTP_X_TENANT=tenant,
+                )
+                self.assertEqual(response.status_code, quotes_status)
+                response = client.get(
+                    "/api/v1/product/definitions/",
+                    {"codes": "A1"},
+                    HTTP_X_TENANT=tenant,
+                )
+                self.assertEqual(response.status_code, definitions_status)
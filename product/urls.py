@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views import BatchQuoteView, ProductDefinitionsView
+
+urlpatterns = [
+    path("quotes/", BatchQuoteView.as_view(), name="product-quotes"),
+    path(
+        "definitions/",
+        ProductDefinitionsView.as_view(),
+        name="product-definitions",
+    ),
+]
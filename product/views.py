@@ -1,3 +1,53 @@
-from django.shortcuts import render
+from jsonformapp.tenancy import get_tenant, table_allowed
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .definitions import DefinitionError, fetch_definitions
+from .models import Product
+from .quotes import QuoteError, quote_many
+
+
+def _products_not_available(request):
+    """404 response when the request's tenant may not see the product table."""
+    table_name = Product._meta.db_table
+    if table_allowed(get_tenant(request), table_name):
+        return None
+    return Response(
+        {"error": f"Table {table_name} is not available."},
+        status=status.HTTP_404_NOT_FOUND,
+    )
+
+
+class BatchQuoteView(APIView):
+    """Fee quotes for many (product_code, amount) pairs in one call."""
+
+    def post(self, request, *args, **kwargs):
+        denied = _products_not_available(request)
+        if denied:
+            return denied
+        try:
+            results, errors = quote_many(request.data.get("items"))
+        except QuoteError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"results": results, "errors": errors}, status=status.HTTP_200_OK
+        )
+
+
+class ProductDefinitionsView(APIView):
+    """Parsed parameters/section_definition for ``?codes=A,B,...``."""
+
+    def get(self, request, *args, **kwargs):
+        denied = _products_not_available(request)
+        if denied:
+            return denied
+        try:
+            rows, missing = fetch_definitions(
+                request.query_params.get("codes", "").split(",")
+            )
+        except DefinitionError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"products": rows, "missing": missing}, status=status.HTTP_200_OK
+        )